@@ -0,0 +1,47 @@
+"""
+Measures how long ranking the replacements of a called-out shift takes, and how long indexing a solution takes.
+
+The schedule is synthetic demo data with every shift given to a random employee with its skill.
+Indexing happens once for every new best solution; the ranking happens for every call-out.
+
+Run from the employee-scheduling directory:
+
+    $ python benchmarks/callout.py --employees 500 --days 90
+"""
+import argparse
+import time as _t
+from random import Random
+
+from employee_scheduling.callout import CalloutRequest, ScheduleIndex
+
+from common import synthetic_schedule, assign_randomly
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=500)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--callouts', type=int, default=200, help='number of call-outs to time')
+    args = parser.parse_args()
+
+    random = Random(0)
+    schedule = assign_randomly(synthetic_schedule(args.employees, args.days), random)
+    start = _t.perf_counter()
+    index = ScheduleIndex(schedule)
+    index_time = _t.perf_counter() - start
+
+    times = []
+    for shift in random.choices(schedule.shifts, k=args.callouts):
+        start = _t.perf_counter()
+        for called_out in index.called_out_shifts(CalloutRequest(employee=shift.employee.name, shift=shift.id)):
+            index.replacements(called_out)
+        times.append(_t.perf_counter() - start)
+    times.sort()
+    print(f'{len(schedule.employees)} employees, {len(schedule.shifts)} shifts over {args.days} days')
+    print(f'Index: {index_time * 1000:.1f} ms')
+    print(f'Call-out: median {times[len(times) // 2] * 1000:.1f} ms, '
+          f'p95 {times[int(len(times) * 0.95)] * 1000:.1f} ms, max {times[-1] * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
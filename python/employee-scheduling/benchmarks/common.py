@@ -0,0 +1,67 @@
+"""
+Helpers shared by the benchmark scripts in this directory.
+"""
+import dataclasses
+import logging
+import re
+from dataclasses import replace
+from random import Random
+from typing import Callable
+
+from timefold.solver import SolverFactory, BestSolutionChangedEvent
+from timefold.solver.config import SolverConfig, TerminationConfig, Duration
+
+from employee_scheduling.domain import *
+from employee_scheduling.demo_data import DemoData, demo_data_to_parameters, generate_demo_data
+
+
+class SolverLogHandler(logging.Handler):
+    """Picks the move evaluation speed out of the solver's "Solving ended" log message."""
+    def __init__(self):
+        super().__init__()
+        self.move_evaluation_speed = None
+
+    def emit(self, record):
+        match = re.search(r'Solving ended: .*(?:move evaluation|score calculation) speed \((\d+)/sec\)',
+                          record.getMessage())
+        if match:
+            self.move_evaluation_speed = int(match.group(1))
+
+
+def synthetic_schedule(employee_count: int, days: int, seed: int = 37) -> EmployeeSchedule:
+    """Demo data with the locations, skills and distributions of LARGE, for more employees or days."""
+    parameters = replace(demo_data_to_parameters[DemoData.LARGE],
+                         employee_count=employee_count, days_in_schedule=days, random_seed=seed)
+    return generate_demo_data(parameters)
+
+
+def assign_randomly(schedule: EmployeeSchedule, random: Random) -> EmployeeSchedule:
+    """Gives every shift a random employee with its required skill, as a stand-in for a solved schedule."""
+    employees_with_skill: dict[str, list[Employee]] = {}
+    for employee in schedule.employees:
+        for skill in employee.skills:
+            employees_with_skill.setdefault(skill, []).append(employee)
+    for shift in schedule.shifts:
+        shift.employee = random.choice(employees_with_skill.get(shift.required_skill, schedule.employees))
+    return schedule
+
+
+def solve(solver_config: SolverConfig, schedule: EmployeeSchedule, seconds: float,
+          listener: Callable[[BestSolutionChangedEvent], None] = None) \
+        -> tuple[EmployeeSchedule, SolverLogHandler]:
+    """Solves schedule for the given time, calling listener with every new best solution."""
+    handler = SolverLogHandler()
+    logger = logging.getLogger('timefold.solver')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        solver = SolverFactory.create(dataclasses.replace(
+            solver_config,
+            termination_config=TerminationConfig(spent_limit=Duration(milliseconds=round(seconds * 1000)))
+        )).build_solver()
+        if listener is not None:
+            solver.add_event_listener(listener)
+        solution = solver.solve(schedule)
+    finally:
+        logger.removeHandler(handler)
+    return solution, handler
@@ -0,0 +1,108 @@
+"""
+Compares the move evaluation speed of the shift time constraints on datetimes and on precomputed minutes.
+
+The datetime variants are the no overlapping shifts, 10 hours between shifts and one shift per day constraints
+as they were before shifts carried their start and end as minutes; the other constraints are the same in both.
+Run from the employee-scheduling directory:
+
+    $ python benchmarks/shift_intervals.py --shifts 20000
+"""
+import argparse
+import dataclasses
+import math
+
+from timefold.solver.config import ScoreDirectorFactoryConfig
+from timefold.solver.score import constraint_provider, ConstraintFactory, Joiners, HardSoftDecimalScore
+
+from employee_scheduling.constraints import *
+from employee_scheduling.domain import *
+from employee_scheduling.solver import solver_config
+
+from common import synthetic_schedule, solve
+
+
+def datetime_no_overlapping_shifts(constraint_factory: ConstraintFactory):
+    return (constraint_factory
+            .for_each_unique_pair(Shift,
+                                  Joiners.equal(lambda shift: shift.employee.name),
+                                  Joiners.overlapping(lambda shift: shift.start, lambda shift: shift.end))
+            .penalize(HardSoftDecimalScore.ONE_HARD,
+                      lambda shift1, shift2:
+                      (min(shift1.end, shift2.end) - max(shift1.start, shift2.start)).total_seconds() // 60)
+            .as_constraint("Overlapping shift")
+            )
+
+
+def datetime_at_least_10_hours_between_two_shifts(constraint_factory: ConstraintFactory):
+    return (constraint_factory
+            .for_each(Shift)
+            .join(Shift,
+                  Joiners.equal(lambda shift: shift.employee.name),
+                  Joiners.less_than_or_equal(lambda shift: shift.end, lambda shift: shift.start)
+                  )
+            .filter(lambda first_shift, second_shift:
+                    (second_shift.start - first_shift.end).total_seconds() // (60 * 60) < 10)
+            .penalize(HardSoftDecimalScore.ONE_HARD,
+                      lambda first_shift, second_shift:
+                      600 - ((second_shift.start - first_shift.end).total_seconds() // 60))
+            .as_constraint("At least 10 hours between 2 shifts")
+            )
+
+
+def datetime_one_shift_per_day(constraint_factory: ConstraintFactory):
+    return (constraint_factory
+            .for_each_unique_pair(Shift,
+                                  Joiners.equal(lambda shift: shift.employee.name),
+                                  Joiners.equal(lambda shift: shift.start.date()))
+            .penalize(HardSoftDecimalScore.ONE_HARD)
+            .as_constraint("Max one shift per day")
+            )
+
+
+@constraint_provider
+def define_datetime_constraints(constraint_factory: ConstraintFactory):
+    return [
+        required_skill(constraint_factory),
+        datetime_no_overlapping_shifts(constraint_factory),
+        datetime_at_least_10_hours_between_two_shifts(constraint_factory),
+        datetime_one_shift_per_day(constraint_factory),
+        unavailable_employee(constraint_factory),
+        undesired_day_for_employee(constraint_factory),
+        desired_day_for_employee(constraint_factory),
+        balance_employee_shift_assignments(constraint_factory)
+    ]
+
+
+def schedule_with_shifts(shift_count: int, employee_count: int) -> EmployeeSchedule:
+    """A synthetic schedule with the given number of shifts, over as many days as that takes."""
+    sample = synthetic_schedule(employee_count, 28)
+    days = math.ceil(shift_count / len(sample.shifts) * 28 * 1.1)
+    schedule = synthetic_schedule(employee_count, days)
+    return EmployeeSchedule(employees=schedule.employees, shifts=schedule.shifts[:shift_count])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--shifts', type=int, default=20_000)
+    parser.add_argument('--employees', type=int, default=500)
+    args = parser.parse_args()
+
+    datetime_solver_config = dataclasses.replace(
+        solver_config,
+        score_director_factory_config=ScoreDirectorFactoryConfig(
+            constraint_provider_function=define_datetime_constraints
+        )
+    )
+    print(f'{args.shifts} shifts, {args.employees} employees, {args.seconds}s')
+    speeds = {}
+    for label, config in (('datetime', datetime_solver_config), ('minutes', solver_config)):
+        _, log = solve(config, schedule_with_shifts(args.shifts, args.employees), args.seconds)
+        speeds[label] = log.move_evaluation_speed
+        print(f'  {label:<9} {speeds[label] or 0:>10} moves/sec')
+    if speeds['datetime'] and speeds['minutes']:
+        print(f'  speedup   {speeds["minutes"] / speeds["datetime"]:>10.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares the move evaluation speed and the time to the first feasible solution with and without per-shift value ranges.
+
+Without them, every shift can go to any employee, as if no employee was filtered out for its skill or availability.
+Run from the employee-scheduling directory:
+
+    $ python benchmarks/value_ranges.py
+"""
+import argparse
+import time as _t
+
+from timefold.solver import BestSolutionChangedEvent
+
+from employee_scheduling.demo_data import DemoData, generate_demo_data
+from employee_scheduling.domain import *
+from employee_scheduling.solver import solver_config
+
+from common import synthetic_schedule, solve
+
+
+def use_all_employees(schedule: EmployeeSchedule) -> None:
+    for shift in schedule.shifts:
+        shift.available_employees = schedule.employees
+
+
+def run(schedule: EmployeeSchedule, filtered: bool, seconds: int) -> tuple[int | None, float | None]:
+    if not filtered:
+        use_all_employees(schedule)
+    time_to_feasible = None
+    start = _t.perf_counter()
+
+    def on_best_solution(event: BestSolutionChangedEvent):
+        nonlocal time_to_feasible
+        if time_to_feasible is None and event.is_new_best_solution_initialized and event.new_best_score.is_feasible:
+            time_to_feasible = _t.perf_counter() - start
+
+    _, log = solve(solver_config, schedule, seconds, on_best_solution)
+    return log.move_evaluation_speed, time_to_feasible
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=30)
+    parser.add_argument('--employees', type=int, default=1_000, help='employees in the synthetic schedule')
+    parser.add_argument('--days', type=int, default=28, help='days in the synthetic schedule')
+    args = parser.parse_args()
+
+    datasets = {
+        'LARGE': lambda: generate_demo_data(DemoData.LARGE),
+        f'{args.employees} employees': lambda: synthetic_schedule(args.employees, args.days),
+    }
+    print(f'{"dataset":<16} {"value range":<12} {"moves/sec":>10} {"feasible after":>15}')
+    for name, load in datasets.items():
+        for label, filtered in (('all', False), ('per shift', True)):
+            speed, time_to_feasible = run(load(), filtered, args.seconds)
+            feasible = f'{time_to_feasible:.2f}s' if time_to_feasible is not None else 'never'
+            print(f'{name:<16} {label:<12} {speed or 0:>10} {feasible:>15}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+from decimal import Decimal, Context
+from fractions import Fraction
+from typing import Annotated
+from pydantic import Field, model_validator
+
+from .domain import *
+
+DEFAULT_REPLACEMENT_COUNT = 10
+MIN_HOURS_BETWEEN_SHIFTS = 10
+# Timefold rounds the unfairness of a load balance to this many significant digits
+UNFAIRNESS_CONTEXT = Context(prec=6)
+
+
+class CalloutRequest(JsonDomainBase):
+    employee: str
+    # The shift the employee cannot work, by ID, or a date on which they cannot work any shift
+    shift: Annotated[str | None, Field(default=None)]
+    date: Annotated[date | None, Field(default=None)]
+
+    @model_validator(mode='after')
+    def check_shift_or_date(self) -> 'CalloutRequest':
+        if (self.shift is None) == (self.date is None):
+            raise ValueError('Either a shift or a date must be given.')
+        return self
+
+
+class Replacement(JsonDomainBase):
+    employee: str
+    # How the score changes if the shift goes from the employee who called out to this one
+    score_diff: Annotated[HardSoftDecimalScore, ScoreSerializer, ScoreValidator]
+
+
+class ShiftReplacements(JsonDomainBase):
+    shift: str
+    replacements: list[Replacement]
+
+
+class ScheduleIndex:
+    """
+    Indexes the assigned shifts of a schedule by employee and start date, so the score difference
+    of giving one shift to another employee only looks at that shift and the shifts of the two employees around it.
+    Skills and availability are looked up in the masks and maps the employees and shifts carry.
+    Build a new one for every solution; it does not follow changes to the schedule.
+    """
+    def __init__(self, schedule: EmployeeSchedule):
+        self.schedule = schedule
+        self.employee_by_name = {employee.name: employee for employee in schedule.employees}
+        self.shift_by_id = {shift.id: shift for shift in schedule.shifts}
+        self.shifts_by_day: dict[str, dict[date, list[Shift]]] = {employee.name: {}
+                                                                   for employee in schedule.employees}
+        self.shift_counts = {employee.name: 0 for employee in schedule.employees}
+        self.longest_shift = timedelta()
+        for shift in schedule.shifts:
+            self.longest_shift = max(self.longest_shift, shift.end - shift.start)
+            if shift.employee is not None:
+                self.shifts_by_day[shift.employee.name].setdefault(shift.start.date(), []).append(shift)
+                self.shift_counts[shift.employee.name] += 1
+        self._shift_count = sum(self.shift_counts.values())
+        self._sum_of_squares = sum(count * count for count in self.shift_counts.values())
+
+    def _nearby_shifts(self, employee_name: str, shift: Shift) -> list[Shift]:
+        """The other shifts of the employee that can overlap or be within 10 hours of shift."""
+        reach = timedelta(hours=MIN_HOURS_BETWEEN_SHIFTS)
+        first_day = (shift.start - reach - self.longest_shift).date()
+        last_day = (shift.end + reach).date()
+        by_day = self.shifts_by_day[employee_name]
+        return [other for offset in range((last_day - first_day).days + 1)
+                for other in by_day.get(first_day + timedelta(days=offset), ())
+                if other is not shift]
+
+    def _score_of(self, shift: Shift, employee_name: str) -> tuple[int, int]:
+        """The hard and soft score of the matches shift would be in if employee_name worked it, without balance."""
+        employee = self.employee_by_name[employee_name]
+        hard = soft = 0
+        if employee.skill_mask & shift.required_skill_bit == 0:
+            hard -= 1
+        for other in self._nearby_shifts(employee_name, shift):
+            if other.start_minute < shift.end_minute and shift.start_minute < other.end_minute:
+                hard -= min(shift.end_minute, other.end_minute) - max(shift.start_minute, other.start_minute)
+            else:
+                gap = (shift.start_minute - other.end_minute if other.end_minute <= shift.start_minute
+                       else other.start_minute - shift.end_minute)
+                if gap < MIN_HOURS_BETWEEN_SHIFTS * 60:
+                    hard -= MIN_HOURS_BETWEEN_SHIFTS * 60 - gap
+            if other.start_day == shift.start_day:
+                hard -= 1
+        hard -= availability_minutes(employee, shift, UNAVAILABLE)
+        soft -= availability_minutes(employee, shift, UNDESIRED)
+        soft += availability_minutes(employee, shift, DESIRED)
+        return hard, soft
+
+    def _unfairness(self, sum_of_squares: int) -> Decimal:
+        # The root of the squared deviations from the mean shift count, including employees without shifts
+        squared_deviation = Fraction(sum_of_squares) - Fraction(self._shift_count ** 2, len(self.shift_counts))
+        return (Decimal(squared_deviation.numerator) / Decimal(squared_deviation.denominator)).sqrt(UNFAIRNESS_CONTEXT)
+
+    def replacements(self, shift: Shift, count: int = DEFAULT_REPLACEMENT_COUNT) -> list[Replacement]:
+        """
+        The count employees whose taking over shift from its current employee changes the score the most
+        for the better, best first, with that change. Every constraint the shift is in is scored,
+        as well as the balance of the shift counts.
+        """
+        current = shift.employee.name
+        current_hard, current_soft = self._score_of(shift, current)
+        current_unfairness = self._unfairness(self._sum_of_squares)
+        candidates = []
+        for name, shift_count in self.shift_counts.items():
+            if name == current:
+                continue
+            hard, soft = self._score_of(shift, name)
+            # One shift less for the current employee and one more for this one
+            unfairness = self._unfairness(self._sum_of_squares - 2 * self.shift_counts[current] + 1 +
+                                          2 * shift_count + 1)
+            candidates.append((hard - current_hard,
+                               Decimal(soft - current_soft) - (unfairness - current_unfairness),
+                               name))
+        candidates.sort(key=lambda candidate: (-candidate[0], -candidate[1], candidate[2]))
+        return [Replacement(employee=name, score_diff=HardSoftDecimalScore.of(Decimal(hard), soft))
+                for hard, soft, name in candidates[:count]]
+
+    def called_out_shifts(self, request: CalloutRequest) -> list[Shift]:
+        """
+        The shifts the employee of request works and cannot: its shift, or every shift on its date.
+        Raises KeyError if the employee or shift does not exist, and ValueError if the shift is not theirs.
+        """
+        if request.employee not in self.employee_by_name:
+            raise KeyError(f'No employee with name ({request.employee}).')
+        if request.shift is not None:
+            if request.shift not in self.shift_by_id:
+                raise KeyError(f'No shift with ID ({request.shift}).')
+            shift = self.shift_by_id[request.shift]
+            if shift.employee is None or shift.employee.name != request.employee:
+                raise ValueError(f'The shift ({shift.id}) is not assigned to ({request.employee}).')
+            return [shift]
+        by_day = self.shifts_by_day[request.employee]
+        # Shifts that started the day before can end on the date
+        return sorted((shift for day in (request.date - timedelta(days=1), request.date)
+                       for shift in by_day.get(day, ())
+                       if request.date in (shift.start.date(), shift.end.date())),
+                      key=lambda shift: shift.start)
@@ -1,31 +1,10 @@
 from timefold.solver.score import (constraint_provider, ConstraintFactory, Joiners, HardSoftDecimalScore, ConstraintCollectors)
-from datetime import datetime, date
 
-from .domain import Employee, Shift
+from .domain import Employee, Shift, availability_minutes, UNAVAILABLE, UNDESIRED, DESIRED
 
 
 def get_minute_overlap(shift1: Shift, shift2: Shift) -> int:
-    return (min(shift1.end, shift2.end) - max(shift1.start, shift2.start)).total_seconds() // 60
-
-
-def is_overlapping_with_date(shift: Shift, dt: date) -> bool:
-    return shift.start.date() == dt or shift.end.date() == dt
-
-
-def overlapping_in_minutes(first_start_datetime: datetime, first_end_datetime: datetime,
-                           second_start_datetime: datetime, second_end_datetime: datetime) -> int:
-    latest_start = max(first_start_datetime, second_start_datetime)
-    earliest_end = min(first_end_datetime, second_end_datetime)
-    delta = (earliest_end - latest_start).total_seconds() / 60
-    return max(0, delta)
-
-
-def get_shift_overlapping_duration_in_minutes(shift: Shift, dt: date) -> int:
-    overlap = 0
-    start_date_time = datetime.combine(dt, datetime.max.time())
-    end_date_time = datetime.combine(dt, datetime.min.time())
-    overlap += overlapping_in_minutes(start_date_time, end_date_time, shift.start, shift.end)
-    return overlap
+    return min(shift1.end_minute, shift2.end_minute) - max(shift1.start_minute, shift2.start_minute)
 
 
 @constraint_provider
@@ -46,7 +25,7 @@ def define_constraints(constraint_factory: ConstraintFactory):
 
 def required_skill(constraint_factory: ConstraintFactory):
     return (constraint_factory.for_each(Shift)
-            .filter(lambda shift: shift.required_skill not in shift.employee.skills)
+            .filter(lambda shift: shift.employee.skill_mask & shift.required_skill_bit == 0)
             .penalize(HardSoftDecimalScore.ONE_HARD)
             .as_constraint("Missing required skill")
             )
@@ -56,7 +35,7 @@ def no_overlapping_shifts(constraint_factory: ConstraintFactory):
     return (constraint_factory
             .for_each_unique_pair(Shift,
                                   Joiners.equal(lambda shift: shift.employee.name),
-                                  Joiners.overlapping(lambda shift: shift.start, lambda shift: shift.end))
+                                  Joiners.overlapping(lambda shift: shift.start_minute, lambda shift: shift.end_minute))
             .penalize(HardSoftDecimalScore.ONE_HARD, get_minute_overlap)
             .as_constraint("Overlapping shift")
             )
@@ -67,13 +46,11 @@ def at_least_10_hours_between_two_shifts(constraint_factory: ConstraintFactory):
             .for_each(Shift)
             .join(Shift,
                   Joiners.equal(lambda shift: shift.employee.name),
-                  Joiners.less_than_or_equal(lambda shift: shift.end, lambda shift: shift.start)
+                  Joiners.less_than_or_equal(lambda shift: shift.end_minute, lambda shift: shift.start_minute)
                   )
-            .filter(lambda first_shift, second_shift:
-                    (second_shift.start - first_shift.end).total_seconds() // (60 * 60) < 10)
+            .filter(lambda first_shift, second_shift: second_shift.start_minute - first_shift.end_minute < 600)
             .penalize(HardSoftDecimalScore.ONE_HARD,
-                      lambda first_shift, second_shift:
-                      600 - ((second_shift.start - first_shift.end).total_seconds() // 60))
+                      lambda first_shift, second_shift: 600 - (second_shift.start_minute - first_shift.end_minute))
             .as_constraint("At least 10 hours between 2 shifts")
             )
 
@@ -82,7 +59,7 @@ def one_shift_per_day(constraint_factory: ConstraintFactory):
     return (constraint_factory
             .for_each_unique_pair(Shift,
                                   Joiners.equal(lambda shift: shift.employee.name),
-                                  Joiners.equal(lambda shift: shift.start.date()))
+                                  Joiners.equal(lambda shift: shift.start_day))
             .penalize(HardSoftDecimalScore.ONE_HARD)
             .as_constraint("Max one shift per day")
             )
@@ -90,34 +67,27 @@ def one_shift_per_day(constraint_factory: ConstraintFactory):
 
 def unavailable_employee(constraint_factory: ConstraintFactory):
     return (constraint_factory.for_each(Shift)
-            .join(Employee, Joiners.equal(lambda shift: shift.employee, lambda employee: employee))
-            .flatten_last(lambda employee: employee.unavailable_dates)
-            .filter(lambda shift, unavailable_date: is_overlapping_with_date(shift, unavailable_date))
+            .filter(lambda shift: availability_minutes(shift.employee, shift, UNAVAILABLE) > 0)
             .penalize(HardSoftDecimalScore.ONE_HARD,
-                      lambda shift, unavailable_date: get_shift_overlapping_duration_in_minutes(shift,
-                                                                                                unavailable_date))
+                      lambda shift: availability_minutes(shift.employee, shift, UNAVAILABLE))
             .as_constraint("Unavailable employee")
             )
 
 
 def undesired_day_for_employee(constraint_factory: ConstraintFactory):
     return (constraint_factory.for_each(Shift)
-            .join(Employee, Joiners.equal(lambda shift: shift.employee, lambda employee: employee))
-            .flatten_last(lambda employee: employee.undesired_dates)
-            .filter(lambda shift, undesired_date: is_overlapping_with_date(shift, undesired_date))
+            .filter(lambda shift: availability_minutes(shift.employee, shift, UNDESIRED) > 0)
             .penalize(HardSoftDecimalScore.ONE_SOFT,
-                      lambda shift, undesired_date: get_shift_overlapping_duration_in_minutes(shift, undesired_date))
+                      lambda shift: availability_minutes(shift.employee, shift, UNDESIRED))
             .as_constraint("Undesired day for employee")
             )
 
 
 def desired_day_for_employee(constraint_factory: ConstraintFactory):
     return (constraint_factory.for_each(Shift)
-            .join(Employee, Joiners.equal(lambda shift: shift.employee, lambda employee: employee))
-            .flatten_last(lambda employee: employee.desired_dates)
-            .filter(lambda shift, desired_date: is_overlapping_with_date(shift, desired_date))
+            .filter(lambda shift: availability_minutes(shift.employee, shift, DESIRED) > 0)
             .reward(HardSoftDecimalScore.ONE_SOFT,
-                    lambda shift, desired_date: get_shift_overlapping_duration_in_minutes(shift, desired_date))
+                    lambda shift: availability_minutes(shift.employee, shift, DESIRED))
             .as_constraint("Desired day for employee")
             )
 
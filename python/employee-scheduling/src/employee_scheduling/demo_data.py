@@ -151,8 +151,12 @@ def generate_demo_data(demo_data_or_parameters: DemoData | DemoDataParameters) -
         skills = []
         skills += random.sample(parameters.optional_skills, count)
         skills += random.sample(parameters.required_skills, 1)
+        name = name_permutations[i % len(name_permutations)]
+        if i >= len(name_permutations):
+            # There are more employees than names, so number the names that repeat
+            name = f'{name} {i // len(name_permutations) + 1}'
         employees.append(
-            Employee(name=name_permutations[i],
+            Employee(name=name,
                      skills=set(skills))
         )
 
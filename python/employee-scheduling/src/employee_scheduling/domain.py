@@ -1,19 +1,48 @@
 from timefold.solver import SolverStatus
 from timefold.solver.domain import *
 from timefold.solver.score import HardSoftDecimalScore
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta, timezone
 from typing import Annotated
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .json_serialization import *
 
 
+# Shift.start_minute and Shift.end_minute count the minutes since this, taken as UTC for times with a time zone
+EPOCH = datetime(1970, 1, 1)
+
+
+def minutes_since_epoch(moment: datetime) -> int:
+    epoch = EPOCH if moment.tzinfo is None else EPOCH.replace(tzinfo=timezone.utc)
+    return (moment - epoch) // timedelta(minutes=1)
+
+
+# The bits of the kinds of availability in Employee.availability_by_day
+UNAVAILABLE = 1
+UNDESIRED = 2
+DESIRED = 4
+
+
 class Employee(JsonDomainBase):
     name: Annotated[str, PlanningId]
     skills: Annotated[set[str], Field(default_factory=set)]
     unavailable_dates: Annotated[set[date], Field(default_factory=set)]
     undesired_dates: Annotated[set[date], Field(default_factory=set)]
     desired_dates: Annotated[set[date], Field(default_factory=set)]
+    # The bits of the skills, so a constraint can check a skill with one integer AND; see init_skill_bits
+    skill_mask: Annotated[int, Field(default=0, exclude=True, repr=False)]
+    # Date ordinal -> the bits of the kinds of availability the employee has on that date
+    availability_by_day: Annotated[dict[int, int], Field(default_factory=dict, exclude=True, repr=False)]
+
+    @model_validator(mode='after')
+    def init_availability_by_day(self) -> 'Employee':
+        self.availability_by_day = {}
+        for kind, dates in ((UNAVAILABLE, self.unavailable_dates),
+                            (UNDESIRED, self.undesired_dates),
+                            (DESIRED, self.desired_dates)):
+            for day in dates:
+                self.availability_by_day[day.toordinal()] = self.availability_by_day.get(day.toordinal(), 0) | kind
+        return self
 
 
 @planning_entity
@@ -23,15 +52,115 @@ class Shift(JsonDomainBase):
     end: datetime
     location: str
     required_skill: str
+    required_skill_bit: Annotated[int, Field(default=0, exclude=True, repr=False)]
+    # start and end as minutes since EPOCH and the ordinal of the start date, so constraints compare ints
+    start_minute: Annotated[int, Field(default=0, exclude=True, repr=False)]
+    end_minute: Annotated[int, Field(default=0, exclude=True, repr=False)]
+    start_day: Annotated[int, Field(default=0, exclude=True, repr=False)]
+    # Date ordinal -> the minutes of the shift on that date, for every date it overlaps
+    minutes_by_day: Annotated[dict[int, int], Field(default_factory=dict, exclude=True, repr=False)]
     employee: Annotated[Employee | None,
-                        PlanningVariable,
+                        PlanningVariable(value_range_provider_refs=['availableEmployees']),
                         Field(default=None)]
+    # Set when the owning EmployeeSchedule is loaded; see init_available_employees
+    available_employees: Annotated[list[Employee],
+                                   ValueRangeProvider(id='availableEmployees'),
+                                   Field(default_factory=list, exclude=True, repr=False)]
+
+    @model_validator(mode='after')
+    def init_minutes(self) -> 'Shift':
+        self.start_minute = minutes_since_epoch(self.start)
+        self.end_minute = minutes_since_epoch(self.end)
+        self.start_day = self.start.toordinal()
+        return self
+
+    @model_validator(mode='after')
+    def init_minutes_by_day(self) -> 'Shift':
+        # Days are those of the shift's own wall-clock time, also when it has a time zone
+        start = self.start.replace(tzinfo=None)
+        end = self.end.replace(tzinfo=None)
+        self.minutes_by_day = {}
+        day = start.date()
+        while day <= end.date():
+            day_start = datetime.combine(day, time.min)
+            overlap = min(end, day_start + timedelta(days=1)) - max(start, day_start)
+            if overlap > timedelta():
+                self.minutes_by_day[day.toordinal()] = overlap // timedelta(minutes=1)
+            day += timedelta(days=1)
+        return self
+
+
+def availability_minutes(employee: Employee, shift: Shift, kind: int) -> int:
+    """How many minutes of shift are on dates the employee has the given kind of availability."""
+    # Iterates over the keys rather than items(), which the solver does not translate to Java;
+    # it would call back into CPython, copying the shift and its employees, for every match
+    minutes = 0
+    for day in shift.minutes_by_day:
+        if employee.availability_by_day.get(day, 0) & kind:
+            minutes += shift.minutes_by_day[day]
+    return minutes
+
+
+def init_skill_bits(employees: list[Employee], shifts: list[Shift]) -> dict[str, int]:
+    """
+    Gives every skill of the employees and shifts a bit, in order of first appearance,
+    and sets the skill masks of the employees and the required skill bits of the shifts.
+    Returns the bit of every skill.
+    """
+    skill_bits: dict[str, int] = {}
+    for skills in [sorted(employee.skills) for employee in employees] + [[shift.required_skill] for shift in shifts]:
+        for skill in skills:
+            if skill not in skill_bits:
+                skill_bits[skill] = 1 << len(skill_bits)
+    for employee in employees:
+        employee.skill_mask = 0
+        for skill in employee.skills:
+            employee.skill_mask |= skill_bits[skill]
+    for shift in shifts:
+        shift.required_skill_bit = skill_bits[shift.required_skill]
+    return skill_bits
+
+
+def init_available_employees(employees: list[Employee], shifts: list[Shift]) -> None:
+    """
+    Gives every shift the employees that have its required skill and are not unavailable
+    on a day it overlaps, so the solver does not try the others.
+    A shift that no employee qualifies for can go to any of them, and a shift keeps its current employee,
+    which is replaced by the schedule's employee with the same name.
+    """
+    employee_by_name = {employee.name: employee for employee in employees}
+    employees_by_skill: dict[str, list[Employee]] = {}
+    for employee in employees:
+        for skill in employee.skills:
+            employees_by_skill.setdefault(skill, []).append(employee)
+    for shift in shifts:
+        if shift.employee is not None:
+            # A schedule loaded from JSON has a copy of the employee in every assigned shift
+            shift.employee = employee_by_name.get(shift.employee.name, shift.employee)
+        available = [employee for employee in employees_by_skill.get(shift.required_skill, ())
+                     if availability_minutes(employee, shift, UNAVAILABLE) == 0]
+        if not available:
+            available = list(employees)
+        elif shift.employee is not None and all(employee.name != shift.employee.name for employee in available):
+            available.append(shift.employee)
+        shift.available_employees = available
 
 
 @planning_solution
 class EmployeeSchedule(JsonDomainBase):
-    employees: Annotated[list[Employee], ProblemFactCollectionProperty, ValueRangeProvider]
+    employees: Annotated[list[Employee], ProblemFactCollectionProperty]
     shifts: Annotated[list[Shift], PlanningEntityCollectionProperty]
     score: Annotated[HardSoftDecimalScore | None,
                      PlanningScore, ScoreSerializer, ScoreValidator, Field(default=None)]
     solver_status: Annotated[SolverStatus | None, Field(default=None)]
+    # Skill name -> the bit that stands for it in the employees' skill masks and the shifts' required skill bits
+    skill_bits: Annotated[dict[str, int], Field(default_factory=dict, exclude=True, repr=False)]
+
+    @model_validator(mode='after')
+    def init_value_ranges(self) -> 'EmployeeSchedule':
+        self.skill_bits = init_skill_bits(self.employees, self.shifts)
+        for employee in self.employees:
+            # The dates can have changed since the employee was created, as they do in the demo data
+            employee.init_availability_by_day()
+        init_available_employees(self.employees, self.shifts)
+        return self
@@ -1,14 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
+from typing import Annotated
 from uuid import uuid4
 
 from .domain import EmployeeSchedule
+from .callout import DEFAULT_REPLACEMENT_COUNT, CalloutRequest, ScheduleIndex, ShiftReplacements
 from .demo_data import DemoData, generate_demo_data
 from .solver import solver_manager, solution_manager
 from .solver import solver_manager
 
 app = FastAPI(docs_url='/q/swagger-ui')
 data_sets: dict[str, EmployeeSchedule] = {}
+# The index of the latest solution of every schedule a call-out was made for
+schedule_indexes: dict[str, ScheduleIndex] = {}
 
 
 @app.get("/demo-data")
@@ -44,6 +48,34 @@ async def solve_timetable(schedule: EmployeeSchedule) -> str:
     return job_id
 
 
+def get_schedule_index(problem_id: str) -> ScheduleIndex:
+    if problem_id not in data_sets:
+        raise HTTPException(status_code=404, detail=f'No schedule with ID ({problem_id}).')
+    schedule = data_sets[problem_id]
+    index = schedule_indexes.get(problem_id)
+    if index is None or index.schedule is not schedule:
+        index = schedule_indexes[problem_id] = ScheduleIndex(schedule)
+    return index
+
+
+@app.post("/schedules/{problem_id}/callout")
+async def callout(problem_id: str, request: CalloutRequest,
+                  count: Annotated[int, Query(ge=1)] = DEFAULT_REPLACEMENT_COUNT) -> list[ShiftReplacements]:
+    """
+    Ranks the employees that could take over the shift, or the shifts on the date, of an employee who called out,
+    by how much the current best solution gets better or worse.
+    """
+    index = get_schedule_index(problem_id)
+    try:
+        shifts = index.called_out_shifts(request)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=e.args[0])
+    return [ShiftReplacements(shift=shift.id, replacements=index.replacements(shift, count))
+            for shift in shifts]
+
+
 @app.delete("/schedules/{problem_id}")
 async def stop_solving(problem_id: str) -> None:
     solver_manager.terminate_early(problem_id)
@@ -0,0 +1,90 @@
+from employee_scheduling.domain import *
+from employee_scheduling.callout import CalloutRequest, ScheduleIndex
+from employee_scheduling.demo_data import DemoData, generate_demo_data
+from employee_scheduling.rest_api import app, data_sets
+from employee_scheduling.solver import solution_manager
+
+from fastapi.testclient import TestClient
+from random import Random
+from uuid import uuid4
+
+client = TestClient(app)
+
+
+def assigned_schedule(seed: int) -> EmployeeSchedule:
+    """The SMALL demo data with every shift given to a random employee, about half of them with the right skill."""
+    random = Random(seed)
+    schedule = generate_demo_data(DemoData.SMALL)
+    for shift in schedule.shifts:
+        skilled = [employee for employee in schedule.employees if shift.required_skill in employee.skills]
+        shift.employee = random.choice(skilled if skilled and random.random() < 0.5 else schedule.employees)
+    return schedule
+
+
+def test_replacements_match_the_score_difference():
+    schedule = assigned_schedule(0)
+    index = ScheduleIndex(schedule)
+    before = solution_manager.update(schedule)
+    random = Random(1)
+    for shift in random.sample(schedule.shifts, 5):
+        caller = shift.employee
+        replacements = index.replacements(shift, count=len(schedule.employees))
+
+        assert len(replacements) == len(schedule.employees) - 1
+        assert [(replacement.score_diff.hard_score, replacement.score_diff.soft_score)
+                for replacement in replacements] == \
+            sorted(((replacement.score_diff.hard_score, replacement.score_diff.soft_score)
+                    for replacement in replacements), reverse=True)
+        for replacement in replacements:
+            shift.employee = index.employee_by_name[replacement.employee]
+            after = solution_manager.update(schedule)
+            assert (after.hard_score - before.hard_score, after.soft_score - before.soft_score) == \
+                (replacement.score_diff.hard_score, replacement.score_diff.soft_score), replacement.employee
+        shift.employee = caller
+
+
+def test_called_out_shifts():
+    schedule = assigned_schedule(2)
+    index = ScheduleIndex(schedule)
+    shift = schedule.shifts[-1]
+    employee = shift.employee.name
+    day = shift.start.date()
+
+    assert index.called_out_shifts(CalloutRequest(employee=employee, shift=shift.id)) == [shift]
+    assert [other.id for other in index.called_out_shifts(CalloutRequest(employee=employee, date=day))] == \
+        [other.id for other in sorted(schedule.shifts, key=lambda other: other.start)
+         if other.employee.name == employee and day in (other.start.date(), other.end.date())]
+
+
+def test_callout():
+    schedule = assigned_schedule(3)
+    job_id = str(uuid4())
+    data_sets[job_id] = schedule
+    shift = schedule.shifts[0]
+    other = next(employee for employee in schedule.employees if employee is not shift.employee)
+    try:
+        response = client.post(f'/schedules/{job_id}/callout?count=3',
+                               json={'employee': shift.employee.name, 'shift': shift.id})
+        assert response.status_code == 200
+        [replacements] = response.json()
+        assert replacements['shift'] == shift.id
+        assert len(replacements['replacements']) == 3
+        assert HardSoftDecimalScore.parse(replacements['replacements'][0]['scoreDiff']) is not None
+
+        response = client.post(f'/schedules/{job_id}/callout',
+                               json={'employee': shift.employee.name, 'date': shift.start.date().isoformat()})
+        assert response.status_code == 200
+        assert shift.id in {replacements['shift'] for replacements in response.json()}
+
+        assert client.post(f'/schedules/{job_id}/callout',
+                           json={'employee': other.name, 'shift': shift.id}).status_code == 409
+        assert client.post(f'/schedules/{job_id}/callout',
+                           json={'employee': 'Nobody', 'shift': shift.id}).status_code == 404
+        assert client.post(f'/schedules/{job_id}/callout',
+                           json={'employee': shift.employee.name}).status_code == 422
+        assert client.post(f'/schedules/{job_id}/callout?count=-1',
+                           json={'employee': shift.employee.name, 'shift': shift.id}).status_code == 422
+        assert client.post('/schedules/unknown/callout',
+                           json={'employee': shift.employee.name, 'shift': shift.id}).status_code == 404
+    finally:
+        del data_sets[job_id]
@@ -17,15 +17,18 @@ constraint_verifier = ConstraintVerifier.build(define_constraints, EmployeeSched
 
 def test_required_skill():
     employee = Employee(name="Amy")
+    shift = Shift(id="1", start=DAY_START_TIME, end=DAY_END_TIME, location="Location", required_skill="Skill", employee=employee)
+    # Loading a schedule gives the skills their bits
+    init_skill_bits([employee], [shift])
     (constraint_verifier.verify_that(required_skill)
-    .given(employee,
-           Shift(id="1", start=DAY_START_TIME, end=DAY_END_TIME, location="Location", required_skill="Skill", employee=employee))
+    .given(employee, shift)
     .penalizes(1))
     
     employee = Employee(name="Beth", skills={"Skill"})
+    shift = Shift(id="2", start=DAY_START_TIME, end=DAY_END_TIME, location="Location", required_skill="Skill", employee=employee)
+    init_skill_bits([employee], [shift])
     (constraint_verifier.verify_that(required_skill)
-    .given(employee,
-           Shift(id="2", start=DAY_START_TIME, end=DAY_END_TIME, location="Location", required_skill="Skill", employee=employee))
+    .given(employee, shift)
     .penalizes(0))
 
 
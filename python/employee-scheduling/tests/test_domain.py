@@ -0,0 +1,102 @@
+from employee_scheduling.domain import *
+
+from datetime import date, datetime, time, timedelta, timezone
+
+DAY_1 = date(2021, 2, 1)
+DAY_2 = date(2021, 2, 2)
+
+
+def test_available_employees():
+    amy = Employee(name="Amy", skills={"Nurse"})
+    beth = Employee(name="Beth", skills={"Nurse"}, unavailable_dates={DAY_2})
+    carl = Employee(name="Carl", skills={"Doctor"})
+    day_shift = Shift(id="1", start=datetime.combine(DAY_1, time(9)), end=datetime.combine(DAY_1, time(17)),
+                      location="Location", required_skill="Nurse")
+    night_shift = Shift(id="2", start=datetime.combine(DAY_1, time(22)), end=datetime.combine(DAY_2, time(6)),
+                        location="Location", required_skill="Nurse")
+    assigned_shift = Shift(id="3", start=datetime.combine(DAY_2, time(9)), end=datetime.combine(DAY_2, time(17)),
+                           location="Location", required_skill="Nurse", employee=carl)
+    unqualified_shift = Shift(id="4", start=datetime.combine(DAY_1, time(9)), end=datetime.combine(DAY_1, time(17)),
+                              location="Location", required_skill="Cardiology")
+
+    EmployeeSchedule(employees=[amy, beth, carl], shifts=[day_shift, night_shift, assigned_shift, unqualified_shift])
+
+    assert [employee.name for employee in day_shift.available_employees] == ["Amy", "Beth"]
+    assert [employee.name for employee in night_shift.available_employees] == ["Amy"]
+    assert [employee.name for employee in assigned_shift.available_employees] == ["Amy", "Carl"]
+    assert [employee.name for employee in unqualified_shift.available_employees] == ["Amy", "Beth", "Carl"]
+
+    day_shift.employee = amy
+    schedule = EmployeeSchedule.model_validate(
+        EmployeeSchedule(employees=[amy, beth, carl], shifts=[day_shift]).model_dump(by_alias=True))
+    [loaded_shift] = schedule.shifts
+    assert loaded_shift.employee is schedule.employees[0]
+    assert [employee.name for employee in loaded_shift.available_employees] == ["Amy", "Beth"]
+
+
+def test_skill_bits():
+    employee = Employee(name="Amy", skills={"Nurse", "Cardiology"})
+    shift = Shift(id="1", start=datetime.combine(DAY_1, time(9)), end=datetime.combine(DAY_1, time(17)),
+                  location="Location", required_skill="Cardiology")
+    other_shift = Shift(id="2", start=datetime.combine(DAY_1, time(9)), end=datetime.combine(DAY_1, time(17)),
+                        location="Location", required_skill="Doctor")
+
+    schedule = EmployeeSchedule(employees=[employee], shifts=[shift, other_shift])
+
+    assert schedule.skill_bits == {"Cardiology": 1, "Nurse": 2, "Doctor": 4}
+    assert employee.skill_mask == 3
+    assert employee.skill_mask & shift.required_skill_bit != 0
+    assert employee.skill_mask & other_shift.required_skill_bit == 0
+    assert "skillMask" not in employee.model_dump(by_alias=True)
+    assert "skillBits" not in schedule.model_dump(by_alias=True)
+    assert EmployeeSchedule.model_validate(schedule.model_dump(by_alias=True)).shifts[0].required_skill == "Cardiology"
+
+    other_schedule = EmployeeSchedule(employees=[Employee(name="Beth", skills={"Doctor"})], shifts=[])
+    assert other_schedule.skill_bits == {"Doctor": 1}
+
+
+def test_availability_minutes():
+    employee = Employee(name="Amy", unavailable_dates={DAY_2}, desired_dates={DAY_1, DAY_2})
+    night_shift = Shift(id="1", start=datetime.combine(DAY_1, time(22)), end=datetime.combine(DAY_2, time(6)),
+                        location="Location", required_skill="Nurse")
+    midnight_shift = Shift(id="2", start=datetime.combine(DAY_1, time(16)), end=datetime.combine(DAY_2, time(0)),
+                           location="Location", required_skill="Nurse")
+
+    assert night_shift.minutes_by_day == {DAY_1.toordinal(): 120, DAY_2.toordinal(): 360}
+    assert midnight_shift.minutes_by_day == {DAY_1.toordinal(): 480}
+    assert availability_minutes(employee, night_shift, UNAVAILABLE) == 360
+    assert availability_minutes(employee, night_shift, DESIRED) == 480
+    assert availability_minutes(employee, night_shift, UNDESIRED) == 0
+    assert availability_minutes(employee, midnight_shift, UNAVAILABLE) == 0
+
+    employee.undesired_dates.add(DAY_1)
+    EmployeeSchedule(employees=[employee], shifts=[night_shift])
+    assert availability_minutes(employee, night_shift, UNDESIRED) == 120
+
+
+def test_shift_minutes():
+    shift = Shift(id="1", start=datetime.combine(DAY_1, time(22)), end=datetime.combine(DAY_2, time(6)),
+                  location="Location", required_skill="Nurse")
+
+    assert shift.start_minute == (shift.start - datetime(1970, 1, 1)).total_seconds() // 60
+    assert shift.end_minute - shift.start_minute == 8 * 60
+    assert shift.start_day == DAY_1.toordinal()
+    assert "startMinute" not in shift.model_dump(by_alias=True)
+
+
+def test_time_zone_aware_shift():
+    zone = timezone(timedelta(hours=2))
+    employee = Employee(name="Amy", unavailable_dates={DAY_2})
+    shift = Shift(id="1", start=datetime.combine(DAY_1, time(22), zone), end=datetime.combine(DAY_2, time(6), zone),
+                  location="Location", required_skill="Nurse")
+
+    assert shift.minutes_by_day == {DAY_1.toordinal(): 120, DAY_2.toordinal(): 360}
+    assert availability_minutes(employee, shift, UNAVAILABLE) == 360
+    assert shift.start_minute == minutes_since_epoch(datetime.combine(DAY_1, time(20)))
+    assert shift.end_minute - shift.start_minute == 8 * 60
+    assert shift.start_day == DAY_1.toordinal()
+
+    utc_shift = Shift.model_validate({"id": "2", "start": "2024-01-01T08:00:00Z", "end": "2024-01-01T16:00:00Z",
+                                      "location": "Location", "requiredSkill": "Nurse"})
+    assert utc_shift.start_minute == minutes_since_epoch(datetime(2024, 1, 1, 8))
+    assert utc_shift.minutes_by_day == {date(2024, 1, 1).toordinal(): 480}
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the benchmark scripts in this directory.
+"""
+import dataclasses
+import logging
+import re
+from typing import Callable
+
+from timefold.solver import SolverFactory, BestSolutionChangedEvent
+from timefold.solver.config import SolverConfig, TerminationConfig, Duration
+
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_large_demo_data
+
+
+class SolverLogHandler(logging.Handler):
+    """Picks the move evaluation speed out of the solver's "Solving ended" log message."""
+    def __init__(self):
+        super().__init__()
+        self.move_evaluation_speed = None
+
+    def emit(self, record):
+        match = re.search(r'Solving ended: .*move evaluation speed \((\d+)/sec\)', record.getMessage())
+        if match:
+            self.move_evaluation_speed = int(match.group(1))
+
+
+def synthetic_plan(visit_count: int, vehicle_count: int = None, seed: int = 2,
+                   driving_time_matrix: bool = True) -> VehicleRoutePlan:
+    """A plan over the FIRENZE area with the given number of visits."""
+    properties = dataclasses.replace(DemoData.FIRENZE.value,
+                                     seed=seed,
+                                     visit_count=visit_count,
+                                     vehicle_count=vehicle_count or max(6, visit_count // 20))
+    return generate_large_demo_data(properties, driving_time_matrix=driving_time_matrix)
+
+
+def solve(solver_config: SolverConfig, route_plan: VehicleRoutePlan, seconds: float,
+          listener: Callable[[BestSolutionChangedEvent], None] = None) \
+        -> tuple[VehicleRoutePlan, SolverLogHandler]:
+    """Solves route_plan for the given time, calling listener with every new best solution."""
+    handler = SolverLogHandler()
+    logger = logging.getLogger('timefold.solver')
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        solver = SolverFactory.create(dataclasses.replace(
+            solver_config,
+            termination_config=TerminationConfig(spent_limit=Duration(milliseconds=round(seconds * 1000)))
+        )).build_solver()
+        if listener is not None:
+            solver.add_event_listener(listener)
+        solution = solver.solve(route_plan)
+    finally:
+        logger.removeHandler(handler)
+    return solution, handler
@@ -0,0 +1,72 @@
+"""
+Compares the memory per visit, clone time and move evaluation speed of the pydantic and the core domain.
+
+Memory is what the vehicles and visits of a plan hold, as traced by tracemalloc, without a driving time matrix,
+which both domains share. Clone time is how long copy.deepcopy of a solved plan takes, which, like cloning
+a best solution, copies every vehicle and visit and follows their references.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/core_domain.py --visits 1000 10000 50000 --seconds 10
+"""
+import argparse
+import copy
+import time as _t
+import tracemalloc
+from random import Random
+
+from vehicle_routing.domain import *
+from vehicle_routing.rest_api import to_core_route_plan
+from vehicle_routing.solver import solver_config, core_solver_config
+
+from common import synthetic_plan, solve
+
+
+def traced_size(build):
+    """What build returns and the bytes it still holds once it returned."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def clone_time(route_plan, runs: int) -> float:
+    start = _t.perf_counter()
+    for _ in range(runs):
+        copy.deepcopy(route_plan)
+    return (_t.perf_counter() - start) / runs
+
+
+def assign_random_routes(route_plan: VehicleRoutePlan, seed: int = 0) -> None:
+    visit_ids = [visit.id for visit in route_plan.visits]
+    Random(seed).shuffle(visit_ids)
+    route_plan.assign_routes({vehicle.id: visit_ids[i::len(route_plan.vehicles)]
+                              for i, vehicle in enumerate(route_plan.vehicles)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--visits', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='time every plan is solved for to measure the move evaluation speed; 0 to skip')
+    parser.add_argument('--runs', type=int, default=3, help='clones timed per plan')
+    args = parser.parse_args()
+
+    print(f'{"visits":>8} {"domain":<8} {"bytes/visit":>12} {"clone (ms)":>11} {"moves/sec":>10}')
+    for visit_count in args.visits:
+        route_plan, pydantic_size = traced_size(lambda: synthetic_plan(visit_count, driving_time_matrix=False))
+        assign_random_routes(route_plan)
+        core_route_plan, core_size = traced_size(lambda: to_core_route_plan(route_plan))
+        for label, plan, size, config in (('pydantic', route_plan, pydantic_size, solver_config),
+                                          ('core', core_route_plan, core_size, core_solver_config)):
+            clone_ms = clone_time(plan, args.runs) * 1000
+            speed = solve(config, plan, args.seconds)[1].move_evaluation_speed if args.seconds > 0 else None
+            print(f'{visit_count:>8} {label:<8} {size / visit_count:>12.0f} {clone_ms:>11.1f} '
+                  f'{"-" if speed is None else speed:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Solves Solomon and Gehring-Homberger instances and reports the gap to their best-known solutions.
+
+The instance files and the best-known solutions are not part of this repository; download the instances
+in the Solomon text format and list the best-known solutions in a CSV file with the columns
+instance, vehicles and distance (see vehicle_routing.solomon). The solver minimizes the distance
+with the vehicles it is given, so the gap compares distances; the vehicle counts are reported alongside.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/cvrptw.py instances/solomon/*.txt --best-known instances/best_known.csv --seconds 60
+"""
+import argparse
+import json
+import time as _t
+from pathlib import Path
+
+from timefold.solver import BestSolutionChangedEvent
+
+from vehicle_routing.savings import warm_start
+from vehicle_routing.solomon import load_instance, read_best_known, route_plan_distance
+from vehicle_routing.solver import solver_config
+
+from common import solve
+
+
+def run(path: Path, seconds: float, use_warm_start: bool, best_known: dict) -> dict:
+    route_plan = load_instance(path)
+    last_improvement = None
+    start = _t.perf_counter()
+
+    def on_best_solution(event: BestSolutionChangedEvent):
+        nonlocal last_improvement
+        last_improvement = _t.perf_counter() - start
+
+    if use_warm_start:
+        warm_start(route_plan)
+    solution, _ = solve(solver_config, route_plan, seconds, on_best_solution)
+    elapsed = _t.perf_counter() - start
+    distance = route_plan_distance(solution)
+    best = best_known.get(route_plan.name.upper())
+    return {
+        'instance': route_plan.name,
+        'visit_count': len(solution.visits),
+        'feasible': solution.score.is_feasible,
+        'unassigned_visit_count': sum(visit.vehicle is None for visit in solution.visits),
+        'vehicle_count': sum(1 for vehicle in solution.vehicles if vehicle.visits),
+        'distance': round(distance, 2),
+        'best_known_vehicle_count': best.vehicle_count if best is not None else None,
+        'best_known_distance': best.distance if best is not None else None,
+        'gap': round(distance / best.distance - 1, 4) if best is not None else None,
+        'time_to_best': round(last_improvement, 2) if last_improvement is not None else None,
+        'time': round(elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('instances', type=Path, nargs='+', help='instance files in the Solomon text format')
+    parser.add_argument('--best-known', type=Path, help='CSV file with the best-known solutions')
+    parser.add_argument('--seconds', type=float, default=60, help='time every instance is solved for')
+    parser.add_argument('--warm-start', action='store_true', help='start from savings routes')
+    parser.add_argument('--output', type=Path, help='JSON file to write the results to')
+    args = parser.parse_args()
+
+    best_known = read_best_known(args.best_known) if args.best_known is not None else {}
+    results = []
+    print(f'{"instance":<12} {"vehicles":>9} {"distance":>10} {"best":>10} {"gap":>7} '
+          f'{"feasible":>8} {"best at (s)":>11} {"time (s)":>8}')
+    for path in args.instances:
+        result = run(path, args.seconds, args.warm_start, best_known)
+        results.append(result)
+        vehicles = f"{result['vehicle_count']}/{result['best_known_vehicle_count'] or '-'}"
+        best = '-' if result['best_known_distance'] is None else f"{result['best_known_distance']:.2f}"
+        gap = '-' if result['gap'] is None else f"{result['gap']:.1%}"
+        print(f"{result['instance']:<12} {vehicles:>9} {result['distance']:>10.2f} {best:>10} {gap:>7} "
+              f"{'yes' if result['feasible'] else 'no':>8} {result['time_to_best'] or '-':>11} {result['time']:>8}")
+
+    gaps = [result['gap'] for result in results if result['gap'] is not None and result['feasible']]
+    if gaps:
+        print(f'Mean gap of {len(gaps)} feasible instances with a best-known solution: {sum(gaps) / len(gaps):.2%}')
+    if args.output is not None:
+        args.output.write_text(json.dumps({'seconds': args.seconds, 'runs': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares score calculation speed with the precomputed driving time matrix against the per-call formula,
+and times whole solves of synthetic plans, from loading the plan to getting the solution back.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/driving_time_matrix.py
+"""
+import argparse
+import time
+from typing import Callable
+
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.solver import solver_config
+
+from common import synthetic_plan, solve
+
+
+def use_formula(route_plan: VehicleRoutePlan):
+    for location in ([vehicle.home_location for vehicle in route_plan.vehicles] +
+                     [visit.location for visit in route_plan.visits]):
+        location.driving_time_matrix = None
+
+
+def assign_round_robin(route_plan: VehicleRoutePlan):
+    for vehicle in route_plan.vehicles:
+        vehicle.visits = []
+    for i, visit in enumerate(route_plan.visits):
+        vehicle = route_plan.vehicles[i % len(route_plan.vehicles)]
+        visit.vehicle = vehicle
+        visit.previous_visit = vehicle.visits[-1] if vehicle.visits else None
+        vehicle.visits.append(visit)
+
+
+def python_score_calculations_per_second(route_plan: VehicleRoutePlan, seconds: float) -> float:
+    """Evaluates everything the constraints read, the same way ConstraintVerifier and the REST API do."""
+    assign_round_robin(route_plan)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for vehicle in route_plan.vehicles:
+            for visit in vehicle.visits:
+                visit.update_arrival_time()
+            vehicle.calculate_total_demand()
+            vehicle.calculate_total_driving_time_seconds()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def solver_move_evaluation_speed(route_plan: VehicleRoutePlan, seconds: int) -> int:
+    _, log = solve(solver_config, route_plan, seconds)
+    return log.move_evaluation_speed
+
+
+def end_to_end_solve(create: Callable[[], VehicleRoutePlan], prepare: Callable[[VehicleRoutePlan], None],
+                     seconds: int) -> tuple[float, float, int]:
+    """
+    Returns the seconds to load the plan, the seconds from starting the solve until the solution is back
+    and the move evaluation speed.
+    """
+    start = time.perf_counter()
+    route_plan = create()
+    prepare(route_plan)
+    loaded = time.perf_counter()
+    _, log = solve(solver_config, route_plan, seconds)
+    return loaded - start, time.perf_counter() - loaded, log.move_evaluation_speed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solver-seconds', type=int, default=30)
+    parser.add_argument('--python-seconds', type=float, default=10)
+    parser.add_argument('--synthetic-visits', type=int, default=5_000)
+    parser.add_argument('--solve-visits', type=int, nargs='+', default=[1_000, 2_000])
+    args = parser.parse_args()
+
+    print('FIRENZE, solver move evaluation speed (/sec)')
+    for label, prepare in (('formula', use_formula), ('matrix', lambda route_plan: None)):
+        route_plan = generate_demo_data(DemoData.FIRENZE)
+        prepare(route_plan)
+        print(f'  {label:<8} {solver_move_evaluation_speed(route_plan, args.solver_seconds)}')
+
+    for name, create in (('FIRENZE', lambda: generate_demo_data(DemoData.FIRENZE)),
+                         (f'{args.synthetic_visits} visits', lambda: synthetic_plan(args.synthetic_visits))):
+        print(f'{name}, Python-side full score calculations (/sec)')
+        start = time.perf_counter()
+        route_plan = create()
+        print(f'  load + matrix build {time.perf_counter() - start:.2f}s')
+        print(f'  matrix   {python_score_calculations_per_second(route_plan, args.python_seconds):.2f}')
+        use_formula(route_plan)
+        print(f'  formula  {python_score_calculations_per_second(route_plan, args.python_seconds):.2f}')
+
+    for visit_count in args.solve_visits:
+        print(f'{visit_count} visits, {args.solver_seconds}s solve: load (s), solve wall clock (s), '
+              f'move evaluation speed (/sec)')
+        for label, prepare in (('formula', use_formula), ('matrix', lambda route_plan: None)):
+            load, wall_clock, speed = end_to_end_solve(lambda: synthetic_plan(visit_count), prepare,
+                                                       args.solver_seconds)
+            print(f'  {label:<8} {load:.2f} {wall_clock:.2f} {speed}')
+
+
+if __name__ == '__main__':
+    main()
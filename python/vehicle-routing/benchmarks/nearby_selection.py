@@ -0,0 +1,33 @@
+"""
+Compares the best score reached in a fixed time with and without restricting moves to nearby visits.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/nearby_selection.py
+"""
+import argparse
+
+from vehicle_routing.solver import solver_config, nearby_solver_config, init_nearby_visits, NEARBY_VISIT_COUNT
+
+from common import synthetic_plan, solve
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--visits', type=int, nargs='+', default=[1_000, 2_000])
+    parser.add_argument('--nearby-visit-count', type=int, default=NEARBY_VISIT_COUNT)
+    args = parser.parse_args()
+
+    for visit_count in args.visits:
+        print(f'{visit_count} visits, best score after {args.seconds}s')
+        solution, _ = solve(solver_config, synthetic_plan(visit_count), args.seconds)
+        print(f'  without index  {solution.score}')
+        route_plan = synthetic_plan(visit_count)
+        init_nearby_visits(route_plan, args.nearby_visit_count)
+        solution, _ = solve(nearby_solver_config, route_plan, args.seconds)
+        print(f'  k={args.nearby_visit_count:<11} {solution.score}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the time to the first feasible solution with and without the savings warm start.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/savings_warm_start.py
+"""
+import argparse
+import dataclasses
+import time
+
+from timefold.solver import SolverFactory
+from timefold.solver.config import TerminationConfig, Duration
+
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.savings import warm_start
+from vehicle_routing.solver import solver_config
+
+
+def time_to_first_feasible(dataset: DemoData, use_warm_start: bool, seconds: int) -> float | None:
+    solver = SolverFactory.create(dataclasses.replace(
+        solver_config,
+        termination_config=TerminationConfig(best_score_feasible=True, spent_limit=Duration(seconds=seconds))
+    )).build_solver()
+    route_plan = generate_demo_data(dataset)
+    start = time.perf_counter()
+    if use_warm_start:
+        warm_start(route_plan)
+    solution = solver.solve(route_plan)
+    elapsed = time.perf_counter() - start
+    return elapsed if solution.score.is_feasible else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=30, help='give up after this many seconds')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print('Time to first feasible solution (seconds, median of runs)')
+    for dataset in DemoData:
+        for label, use_warm_start in (('empty', False), ('savings', True)):
+            times = sorted(time_to_first_feasible(dataset, use_warm_start, args.seconds) or float('inf')
+                           for _ in range(args.runs))
+            print(f'  {dataset.name:<13} {label:<8} {times[len(times) // 2]:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Solves the demo data sets and synthetic plans under one or more solver configs and reports how solving went.
+
+For every data set and config, it records the score calculation speed, the best score over time,
+the time to the first feasible solution and the share of visit orderings the arc compatibility table prunes,
+and writes them to results.json and report.html in the output directory.
+With --baseline, the results are compared to an earlier results.json
+and the script exits with status 1 if any of them regressed.
+
+Run from the vehicle-routing directory:
+
+    $ python benchmarks/suite.py --configs default savings --datasets FIRENZE 1000
+    $ python benchmarks/suite.py --output-dir benchmarks/results/new --baseline benchmarks/results/old/results.json
+"""
+import argparse
+import html
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from timefold.solver import BestSolutionChangedEvent
+from timefold.solver.config import SolverConfig
+
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.savings import warm_start
+from vehicle_routing.arcs import ArcCompatibility
+from vehicle_routing.solver import solver_config, nearby_solver_config, init_nearby_visits
+
+from common import synthetic_plan, solve
+
+
+# Synthetic plans with more visits than this compute driving times per call instead of holding a matrix
+MATRIX_VISIT_LIMIT = 5_000
+# Relative change of a result that is still considered noise when comparing to a baseline
+DEFAULT_TOLERANCE = 0.1
+
+
+def _no_preparation(route_plan: VehicleRoutePlan) -> None:
+    pass
+
+
+# Name -> solver config and what is done to the route plan before solving it; timed with the solve
+CONFIGS: dict[str, tuple[SolverConfig, Callable[[VehicleRoutePlan], object]]] = {
+    'default': (solver_config, _no_preparation),
+    'savings': (solver_config, warm_start),
+    'nearby': (nearby_solver_config, init_nearby_visits),
+}
+
+
+def load_dataset(name: str) -> VehicleRoutePlan:
+    """A demo data set by name, or a synthetic plan if the name is a number of visits."""
+    if name.isdigit():
+        visit_count = int(name)
+        return synthetic_plan(visit_count, driving_time_matrix=visit_count <= MATRIX_VISIT_LIMIT)
+    return generate_demo_data(DemoData[name])
+
+
+def run(dataset: str, config_name: str, seconds: float) -> dict:
+    route_plan = load_dataset(dataset)
+    config, prepare = CONFIGS[config_name]
+    pruned_arc_share = ArcCompatibility(route_plan).pruned_share()
+    best_scores = []
+    start = time.perf_counter()
+
+    def on_best_solution(event: BestSolutionChangedEvent):
+        best_scores.append((round(time.perf_counter() - start, 3), event.new_best_score.hard_score,
+                            event.new_best_score.soft_score, event.is_new_best_solution_initialized))
+
+    prepare(route_plan)
+    solution, log = solve(config, route_plan, seconds, on_best_solution)
+    time_to_first_feasible = next((elapsed for elapsed, hard_score, _, initialized in best_scores
+                                   if initialized and hard_score == 0), None)
+    return {
+        'dataset': dataset,
+        'config': config_name,
+        'visit_count': len(route_plan.visits),
+        'vehicle_count': len(route_plan.vehicles),
+        'score_calculation_speed': log.move_evaluation_speed,
+        # Placements of a visit right after another that are late whatever the rest of the route
+        'pruned_arc_share': round(pruned_arc_share, 4),
+        'time_to_first_feasible': time_to_first_feasible,
+        'best_score': str(solution.score),
+        # Visits the construction heuristic had not assigned yet when the time ran out
+        'unassigned_visit_count': sum(visit.vehicle is None for visit in solution.visits),
+        'best_hard_score': solution.score.hard_score,
+        'best_soft_score': solution.score.soft_score,
+        'best_score_over_time': [[elapsed, hard_score, soft_score]
+                                 for elapsed, hard_score, soft_score, _ in best_scores],
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describes every run of results that did worse than the same data set and config in baseline."""
+    baseline_runs = {(run_['dataset'], run_['config']): run_ for run_ in baseline['runs']}
+    regressions = []
+    for run_ in results['runs']:
+        old = baseline_runs.get((run_['dataset'], run_['config']))
+        if old is None:
+            continue
+        name = f"{run_['dataset']}/{run_['config']}"
+        speed, old_speed = run_['score_calculation_speed'], old['score_calculation_speed']
+        if speed is not None and old_speed and speed < old_speed * (1 - tolerance):
+            regressions.append(f'{name}: score calculation speed dropped from {old_speed}/sec to {speed}/sec')
+        feasible, old_feasible = run_['time_to_first_feasible'], old['time_to_first_feasible']
+        if old_feasible is not None and feasible is None:
+            regressions.append(f'{name}: no feasible solution found, the baseline found one after {old_feasible}s')
+        elif old_feasible is not None and feasible > old_feasible * (1 + tolerance):
+            regressions.append(f'{name}: time to first feasible rose from {old_feasible}s to {feasible}s')
+        unassigned, old_unassigned = run_['unassigned_visit_count'], old['unassigned_visit_count']
+        if unassigned > old_unassigned:
+            regressions.append(f'{name}: {unassigned} visits left unassigned, {old_unassigned} in the baseline')
+        hard_score, soft_score = run_['best_hard_score'], run_['best_soft_score']
+        old_hard_score, old_soft_score = old['best_hard_score'], old['best_soft_score']
+        if (hard_score < old_hard_score or
+                hard_score == old_hard_score and soft_score < old_soft_score - abs(old_soft_score) * tolerance):
+            regressions.append(f"{name}: best score fell from {old['best_score']} to {run_['best_score']}")
+    return regressions
+
+
+def _chart(runs: list[dict], seconds: float, width: int = 640, height: int = 240) -> str:
+    """An SVG line chart of the best soft score over time of the runs, one line per config."""
+    points = [(elapsed, soft_score) for run_ in runs for elapsed, _, soft_score in run_['best_score_over_time']]
+    if not points:
+        return '<p>No solutions.</p>'
+    low = min(soft_score for _, soft_score in points)
+    high = max(soft_score for _, soft_score in points)
+    span = (high - low) or 1
+    # The construction heuristic can run past the time limit
+    duration = max(seconds, max(elapsed for elapsed, _ in points))
+    colours = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+    lines = []
+    for index, run_ in enumerate(runs):
+        steps = run_['best_score_over_time']
+        if not steps:
+            continue
+        # The best score holds until the next one, up to the end of the run
+        coordinates = []
+        for (elapsed, _, soft_score), following in zip(steps, steps[1:] + [[duration]]):
+            y = height - (soft_score - low) / span * (height - 20) - 10
+            coordinates += [(elapsed, y), (following[0], y)]
+        polyline = ' '.join(f'{elapsed / duration * width:.1f},{y:.1f}' for elapsed, y in coordinates)
+        colour = colours[index % len(colours)]
+        lines.append(f'<polyline fill="none" stroke="{colour}" stroke-width="2" points="{polyline}"/>'
+                     f'<text x="{width - 110}" y="{16 * (index + 1)}" fill="{colour}">'
+                     f'{html.escape(run_["config"])}</text>')
+    return (f'<svg width="{width}" height="{height}" style="border:1px solid #ccc">'
+            f'<text x="4" y="{height - 4}">{low}soft</text><text x="4" y="14">{high}soft</text>'
+            f'{"".join(lines)}</svg>')
+
+
+def write_report(path: Path, results: dict, regressions: Optional[list[str]]) -> None:
+    rows = ''.join(
+        f"<tr><td>{html.escape(run_['dataset'])}</td><td>{html.escape(run_['config'])}</td>"
+        f"<td>{run_['visit_count']}</td><td>{run_['vehicle_count']}</td>"
+        f"<td>{run_['score_calculation_speed']}</td>"
+        f"<td>{'-' if run_['time_to_first_feasible'] is None else run_['time_to_first_feasible']}</td>"
+        f"<td>{html.escape(run_['best_score'])}</td><td>{run_['unassigned_visit_count']}</td>"
+        f"<td>{run_.get('pruned_arc_share', '-')}</td></tr>"
+        for run_ in results['runs'])
+    charts = ''
+    for dataset in dict.fromkeys(run_['dataset'] for run_ in results['runs']):
+        runs = [run_ for run_ in results['runs'] if run_['dataset'] == dataset]
+        charts += f'<h2>{html.escape(dataset)}: best soft score over time</h2>{_chart(runs, results["seconds"])}'
+    comparison = ''
+    if regressions is not None:
+        items = ''.join(f'<li>{html.escape(regression)}</li>' for regression in regressions)
+        comparison = (f'<h2>Compared to the baseline</h2>'
+                      f'{f"<ul>{items}</ul>" if regressions else "<p>No regressions.</p>"}')
+    path.write_text(f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Vehicle routing benchmark</title>
+<style>body {{ font-family: sans-serif; }} td, th {{ padding: 2px 8px; text-align: right; }}</style></head>
+<body>
+<h1>Vehicle routing benchmark</h1>
+<p>{html.escape(results['created'])}, {results['seconds']}s per run</p>
+{comparison}
+<table>
+<tr><th>Data set</th><th>Config</th><th>Visits</th><th>Vehicles</th><th>Score calculation speed (/sec)</th>
+<th>Time to first feasible (s)</th><th>Best score</th><th>Unassigned visits</th><th>Pruned arcs</th></tr>
+{rows}
+</table>
+{charts}
+</body>
+</html>
+""")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--datasets', nargs='+', default=[dataset.name for dataset in DemoData] + ['1000'],
+                        help='demo data names, or numbers of visits for synthetic plans')
+    parser.add_argument('--configs', nargs='+', default=['default'], choices=list(CONFIGS))
+    parser.add_argument('--seconds', type=float, default=30, help='time every run is solved for')
+    parser.add_argument('--output-dir', type=Path, default=Path('benchmarks/results'))
+    parser.add_argument('--baseline', type=Path, help='results.json of an earlier run to compare to')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='relative change that is not counted as a regression')
+    args = parser.parse_args()
+
+    results = {'created': datetime.now().isoformat(timespec='seconds'), 'seconds': args.seconds, 'runs': []}
+    for dataset in args.datasets:
+        for config_name in args.configs:
+            run_ = run(dataset, config_name, args.seconds)
+            results['runs'].append(run_)
+            feasible = run_['time_to_first_feasible']
+            print(f"{dataset:<13} {config_name:<8} {run_['score_calculation_speed']}/sec, "
+                  f"first feasible {'never' if feasible is None else f'after {feasible}s'}, "
+                  f"best {run_['best_score']}, {run_['unassigned_visit_count']} unassigned, "
+                  f"{run_['pruned_arc_share']:.1%} of arcs pruned")
+
+    regressions = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline['seconds'] != args.seconds:
+            print(f"The baseline was solved for {baseline['seconds']}s per run, "
+                  f"so the results may differ by that alone.")
+        regressions = compare(results, baseline, args.tolerance)
+        print('Regressions:' if regressions else 'No regressions.')
+        for regression in regressions:
+            print(f'  {regression}')
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    (args.output_dir / 'results.json').write_text(json.dumps(results, indent=2))
+    write_report(args.output_dir / 'report.html', results, regressions)
+    print(f'Wrote {args.output_dir / "results.json"} and {args.output_dir / "report.html"}')
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+from .domain import *
+from .scorer import VectorizedScorer
+
+
+class VisitAggregation:
+    """
+    Merges visits at the same location into one stop, so the solver does not have to order visits
+    whose order does not change the driving time, such as the flats of an apartment block.
+
+    The visits of a stop are served back to back, earliest max end time first. A stop sums their demands
+    and service durations, and its time window is set so that every visit of the stop is on time
+    whenever the stop is: it starts no earlier than any visit could start, counting the service
+    of the visits before it, and ends no later than any visit must end, counting the service of the visits after it.
+    A visit only joins a stop if that window still fits the whole service,
+    and if the stop still fits in the largest vehicle.
+    Visits that already have a vehicle are not merged, so the routes and served visits of the vehicles are kept.
+    """
+    def __init__(self, route_plan: VehicleRoutePlan):
+        self.original = route_plan
+        self.visits_of_stop: dict[str, list[Visit]] = {}
+        max_capacity = max((vehicle.capacity for vehicle in route_plan.vehicles), default=0)
+        assigned = {visit.id for vehicle in route_plan.vehicles for visit in vehicle.visits}
+
+        visits_at: dict[tuple[float, float, Optional[str]], list[Visit]] = {}
+        for visit in route_plan.visits:
+            if visit.id in assigned:
+                self.visits_of_stop[visit.id] = [visit]
+            else:
+                key = (visit.location.latitude, visit.location.longitude, visit.location.id)
+                visits_at.setdefault(key, []).append(visit)
+        stop_windows: dict[str, tuple[datetime, datetime]] = {}
+        for visits in visits_at.values():
+            visits.sort(key=lambda visit: (visit.max_end_time, visit.min_start_time))
+            group: list[Visit] = []
+            window = None
+            for visit in visits:
+                extended = self._window(group + [visit])
+                if group and (sum(member.demand for member in group) + visit.demand > max_capacity or
+                              extended[0] + sum((member.service_duration for member in group),
+                                                visit.service_duration) > extended[1]):
+                    self.visits_of_stop[group[0].id] = group
+                    stop_windows[group[0].id] = window
+                    group = [visit]
+                    window = self._window(group)
+                else:
+                    group.append(visit)
+                    window = extended
+            self.visits_of_stop[group[0].id] = group
+            stop_windows[group[0].id] = window
+
+        stops = {}
+        for visit in route_plan.visits:
+            members = self.visits_of_stop.get(visit.id)
+            if members is None:
+                continue
+            if len(members) == 1:
+                stops[visit.id] = visit.model_copy()
+                continue
+            min_start_time, max_end_time = stop_windows[visit.id]
+            stops[visit.id] = visit.model_copy(update={
+                'name': f'{visit.name} and {len(members) - 1} more',
+                'demand': sum(member.demand for member in members),
+                'min_start_time': min_start_time,
+                'max_end_time': max_end_time,
+                'service_duration': sum((member.service_duration for member in members), timedelta()),
+            })
+        vehicles = [vehicle.model_copy() for vehicle in route_plan.vehicles]
+        self.route_plan = route_plan.model_copy(update={'vehicles': vehicles, 'visits': list(stops.values())})
+        self.route_plan.assign_routes({vehicle.id: [visit.id for visit in vehicle.visits]
+                                       for vehicle in route_plan.vehicles})
+
+    @staticmethod
+    def _window(visits: list[Visit]) -> tuple[datetime, datetime]:
+        """When the visits can start and must end, served back to back in order, for all to be on time."""
+        starts, ends = [], []
+        before = timedelta()
+        after = sum((visit.service_duration for visit in visits), timedelta())
+        for visit in visits:
+            after -= visit.service_duration
+            starts.append(visit.min_start_time - before)
+            ends.append(visit.max_end_time + after)
+            before += visit.service_duration
+        return max(starts), min(ends)
+
+    @property
+    def stop_count(self) -> int:
+        return len(self.route_plan.visits)
+
+    def expand(self, solution: VehicleRoutePlan) -> VehicleRoutePlan:
+        """
+        A copy of the original route plan with the routes of solution, a solution of route_plan,
+        where every stop is replaced by its visits. The score is recomputed for the individual visits,
+        as a late stop can be late by different amounts at its visits.
+        """
+        visits = [visit.model_copy() for visit in self.original.visits]
+        vehicles = [vehicle.model_copy() for vehicle in self.original.vehicles]
+        routes = {vehicle.id: [member.id for stop in vehicle.visits for member in self.visits_of_stop[stop.id]]
+                  for vehicle in solution.vehicles}
+        out = self.original.model_copy(update={'vehicles': vehicles, 'visits': visits})
+        out.assign_routes(routes)
+        if solution.score is not None:
+            out.score = VectorizedScorer(out).score_all([routes])[0]['score']
+        return out
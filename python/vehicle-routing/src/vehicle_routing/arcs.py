@@ -0,0 +1,84 @@
+from typing import Iterator, Optional
+import numpy as np
+
+from .domain import *
+
+
+# Rows of the compatibility table computed at once, which bounds the memory of the driving times in flight
+ARC_BLOCK_SIZE = 1_024
+
+
+class ArcCompatibility:
+    """
+    Which visits can directly follow which, judged by their time windows alone:
+    visit j cannot come right after visit i if leaving i at the earliest and driving straight to j
+    still finishes j after its max end time, so every route with i -> j is late at j.
+    i is left at the earliest after serving it from its min start time, or from the earliest vehicle departure
+    if that is later; the driving times to i are not counted, as they need not be the shortest way there.
+    Visits that are late wherever they are, because their time window is shorter than their service,
+    are compatible with every visit, as no placement of them is better than another.
+    Times are whole seconds after the earliest vehicle departure.
+    """
+    def __init__(self, route_plan: VehicleRoutePlan):
+        self.locations = [visit.location for visit in route_plan.visits]
+        if route_plan.vehicles:
+            reference = min(vehicle.departure_time for vehicle in route_plan.vehicles)
+        else:
+            reference = min((visit.min_start_time for visit in route_plan.visits), default=datetime.now())
+
+        def seconds(moments) -> np.ndarray:
+            return np.fromiter(((moment - reference) // timedelta(seconds=1) for moment in moments),
+                               dtype=np.int64, count=len(self.locations))
+
+        min_starts = seconds(visit.min_start_time for visit in route_plan.visits)
+        max_ends = seconds(visit.max_end_time for visit in route_plan.visits)
+        services = np.fromiter((visit.service_duration // timedelta(seconds=1) for visit in route_plan.visits),
+                               dtype=np.int64, count=len(self.locations))
+        self.earliest_departures = np.maximum(min_starts, 0) + services
+        # The latest arrival that still finishes the service in time
+        self.latest_arrivals = np.where(min_starts + services > max_ends, np.iinfo(np.int64).max // 2,
+                                        max_ends - services)
+
+    def between(self, origins: np.ndarray, destinations: np.ndarray,
+                driving_times: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Whether the visit at every index of destinations can directly follow the one at the same index of origins.
+        The driving times between them are looked up unless they are passed.
+        """
+        if driving_times is None:
+            driving_times = driving_times_of_pairs([self.locations[i] for i in origins.tolist()],
+                                                   [self.locations[j] for j in destinations.tolist()])
+        return self.earliest_departures[origins] + driving_times <= self.latest_arrivals[destinations]
+
+    def _blocks(self, block_size: int) -> Iterator[tuple[slice, np.ndarray]]:
+        for start in range(0, len(self.locations), block_size):
+            rows = slice(start, min(start + block_size, len(self.locations)))
+            driving_times = driving_times_between(self.locations[rows], self.locations)
+            yield rows, (self.earliest_departures[rows, np.newaxis] + driving_times <=
+                         self.latest_arrivals[np.newaxis, :])
+
+    def table(self, block_size: int = ARC_BLOCK_SIZE) -> np.ndarray:
+        """
+        A boolean array where [i, j] is whether visit j can directly follow visit i,
+        in the order of the visits of the route plan. It takes a byte per pair of visits.
+        """
+        out = np.empty((len(self.locations), len(self.locations)), dtype=bool)
+        for rows, compatible in self._blocks(block_size):
+            out[rows] = compatible
+        return out
+
+    def pruned_share(self, block_size: int = ARC_BLOCK_SIZE) -> float:
+        """
+        The share of placements of one visit right after another that can never be on time,
+        counted without keeping the table, so it also works for plans too large for one.
+        """
+        visit_count = len(self.locations)
+        if visit_count < 2:
+            return 0.0
+        incompatible = 0
+        for rows, compatible in self._blocks(block_size):
+            incompatible += int(compatible.size - np.count_nonzero(compatible))
+            # A visit following itself is not a placement
+            diagonal = np.arange(rows.start, rows.stop)
+            incompatible -= int(np.count_nonzero(~compatible[diagonal - rows.start, diagonal]))
+        return incompatible / (visit_count * (visit_count - 1))
@@ -1,6 +1,7 @@
 from timefold.solver.score import ConstraintFactory, HardSoftScore, constraint_provider
 
 from .domain import *
+from .core import CoreVehicle, CoreVisit
 
 VEHICLE_CAPACITY = "vehicleCapacity"
 MINIMIZE_TRAVEL_TIME = "minimizeTravelTime"
@@ -22,8 +23,8 @@ def define_constraints(factory: ConstraintFactory):
 ##############################################
 
 
-def vehicle_capacity(factory: ConstraintFactory):
-    return (factory.for_each(Vehicle)
+def vehicle_capacity(factory: ConstraintFactory, vehicle_class: type = Vehicle):
+    return (factory.for_each(vehicle_class)
             .filter(lambda vehicle: vehicle.calculate_total_demand() > vehicle.capacity)
             .penalize(HardSoftScore.ONE_HARD,
                       lambda vehicle: vehicle.calculate_total_demand() - vehicle.capacity)
@@ -31,8 +32,8 @@ def vehicle_capacity(factory: ConstraintFactory):
             )
 
 
-def service_finished_after_max_end_time(factory: ConstraintFactory):
-    return (factory.for_each(Visit)
+def service_finished_after_max_end_time(factory: ConstraintFactory, visit_class: type = Visit):
+    return (factory.for_each(visit_class)
             .filter(lambda visit: visit.is_service_finished_after_max_end_time())
             .penalize(HardSoftScore.ONE_HARD,
                       lambda visit: visit.service_finished_delay_in_minutes())
@@ -44,10 +45,26 @@ def service_finished_after_max_end_time(factory: ConstraintFactory):
 ##############################################
 
 
-def minimize_travel_time(factory: ConstraintFactory):
+def minimize_travel_time(factory: ConstraintFactory, vehicle_class: type = Vehicle):
     return (
-        factory.for_each(Vehicle)
+        factory.for_each(vehicle_class)
         .penalize(HardSoftScore.ONE_SOFT,
                   lambda vehicle: vehicle.calculate_total_driving_time_seconds())
         .as_constraint(MINIMIZE_TRAVEL_TIME)
     )
+
+
+##############################################
+# The same constraints on the compact core domain
+##############################################
+
+
+@constraint_provider
+def define_core_constraints(factory: ConstraintFactory):
+    return [
+        # Hard constraints
+        vehicle_capacity(factory, CoreVehicle),
+        service_finished_after_max_end_time(factory, CoreVisit),
+        # Soft constraints
+        minimize_travel_time(factory, CoreVehicle)
+    ]
@@ -0,0 +1,131 @@
+"""
+A compact version of the planning domain for large route plans, which the solver can work on
+instead of the models in vehicle_routing.domain.
+
+Its classes are plain dataclasses without validators or computed fields, times are whole seconds
+since the earliest vehicle departure, and co-located visits share one CoreLocation holding
+its index in the driving time matrix. The REST API converts between both domains;
+see rest_api.to_core_route_plan.
+
+Only locations are referenced by index. Visits and vehicles still reference each other as objects,
+because the solver maintains those references itself: it moves CoreVisit objects within
+the planning list variable and sets the vehicle and previous_visit shadow variables to objects.
+The classes are not slotted either, as the solver reads their state through __dict__.
+"""
+from timefold.solver.domain import *
+from timefold.solver.score import HardSoftScore
+
+from dataclasses import dataclass, field
+from typing import Annotated, Optional
+
+from .driving_time import DrivingTimeMatrix
+
+
+@dataclass
+class CoreLocation:
+    # -1 if the driving times are computed from the coordinates
+    index: int
+    latitude: float
+    longitude: float
+    # The same matrix as the Location this was converted from
+    driving_time_matrix: Optional[DrivingTimeMatrix] = None
+
+    def driving_time_to(self, other: 'CoreLocation') -> int:
+        if self.driving_time_matrix is not None and other.index >= 0:
+            return int(self.driving_time_matrix.seconds.get(self.index * self.driving_time_matrix.size + other.index))
+        return round((
+             (self.latitude - other.latitude) ** 2 +
+             (self.longitude - other.longitude) ** 2
+         ) ** 0.5 * 4_000)
+
+
+@planning_entity
+@dataclass
+class CoreVisit:
+    id: Annotated[str, PlanningId]
+    location: CoreLocation
+    demand: int
+    min_start_time: int
+    max_end_time: int
+    service_duration: int
+    vehicle: Annotated[Optional['CoreVehicle'],
+                       InverseRelationShadowVariable(source_variable_name='visits')] = field(default=None)
+    previous_visit: Annotated[Optional['CoreVisit'],
+                              PreviousElementShadowVariable(source_variable_name='visits')] = field(default=None)
+    arrival_time: Annotated[Optional[int],
+                            CascadingUpdateShadowVariable(target_method_name='update_arrival_time')] = \
+        field(default=None)
+    cumulative_demand: Annotated[Optional[int],
+                                 CascadingUpdateShadowVariable(target_method_name='update_arrival_time')] = \
+        field(default=None)
+    cumulative_driving_time_seconds: Annotated[
+        Optional[int],
+        CascadingUpdateShadowVariable(target_method_name='update_arrival_time')] = field(default=None)
+
+    def update_arrival_time(self):
+        if self.vehicle is None:
+            self.arrival_time = None
+            self.cumulative_demand = None
+            self.cumulative_driving_time_seconds = None
+        elif self.previous_visit is None:
+            driving_time_seconds = self.vehicle.home_location.driving_time_to(self.location)
+            self.arrival_time = self.vehicle.departure_time + driving_time_seconds
+            self.cumulative_demand = self.demand
+            self.cumulative_driving_time_seconds = driving_time_seconds
+        else:
+            driving_time_seconds = self.previous_visit.location.driving_time_to(self.location)
+            if self.previous_visit.arrival_time is None:
+                self.arrival_time = None
+            else:
+                self.arrival_time = self.previous_visit.calculate_departure_time() + driving_time_seconds
+            self.cumulative_demand = self.previous_visit.cumulative_demand + self.demand
+            self.cumulative_driving_time_seconds = (self.previous_visit.cumulative_driving_time_seconds +
+                                                    driving_time_seconds)
+
+    def calculate_departure_time(self) -> Optional[int]:
+        if self.arrival_time is None:
+            return None
+        return max(self.arrival_time, self.min_start_time) + self.service_duration
+
+    def is_service_finished_after_max_end_time(self) -> bool:
+        return self.arrival_time is not None and self.calculate_departure_time() > self.max_end_time
+
+    def service_finished_delay_in_minutes(self) -> int:
+        if self.arrival_time is None:
+            return 0
+        # Rounded up, as in Visit.service_finished_delay_in_minutes, but without floor division
+        # by a negative number, which the solver's translation of this method gets wrong
+        return (self.calculate_departure_time() - self.max_end_time + 59) // 60
+
+
+@planning_entity
+@dataclass
+class CoreVehicle:
+    id: Annotated[str, PlanningId]
+    capacity: int
+    home_location: CoreLocation
+    departure_time: int
+    visits: Annotated[list[CoreVisit], PlanningListVariable] = field(default_factory=list)
+    # See Vehicle.pinned_visit_count
+    pinned_visit_count: Annotated[int, PlanningPinToIndex] = field(default=0)
+    out_of_service: Annotated[bool, PlanningPin] = field(default=False)
+
+    def calculate_total_demand(self) -> int:
+        if len(self.visits) == 0:
+            return 0
+        return self.visits[-1].cumulative_demand
+
+    def calculate_total_driving_time_seconds(self) -> int:
+        if len(self.visits) == 0:
+            return 0
+        last_visit = self.visits[-1]
+        return (last_visit.cumulative_driving_time_seconds +
+                last_visit.location.driving_time_to(self.home_location))
+
+
+@planning_solution
+@dataclass
+class CoreRoutePlan:
+    vehicles: Annotated[list[CoreVehicle], PlanningEntityCollectionProperty]
+    visits: Annotated[list[CoreVisit], PlanningEntityCollectionProperty, ValueRangeProvider]
+    score: Annotated[Optional[HardSoftScore], PlanningScore] = field(default=None)
@@ -3,6 +3,7 @@ from datetime import date, datetime, time, timedelta
 from enum import Enum
 from random import Random
 from dataclasses import dataclass
+import numpy as np
 
 from .domain import *
 
@@ -78,6 +79,27 @@ class DemoData(Enum):
                                            longitude=11.290195))
 
 
+class LargeDemoData(Enum):
+    """
+    Synthetic instances for load and scaling tests, in the PHILADELPHIA area.
+    Generate them with generate_large_demo_data.
+    """
+    VISITS_1K = _DemoDataProperties(10, 1_000, 100, time(7, 30),
+                                    1, 3, 20, 40,
+                                    DemoData.PHILADELPHIA.value.south_west_corner,
+                                    DemoData.PHILADELPHIA.value.north_east_corner)
+
+    VISITS_10K = _DemoDataProperties(11, 10_000, 500, time(7, 30),
+                                     1, 3, 40, 60,
+                                     DemoData.PHILADELPHIA.value.south_west_corner,
+                                     DemoData.PHILADELPHIA.value.north_east_corner)
+
+    VISITS_50K = _DemoDataProperties(12, 50_000, 900, time(7, 30),
+                                     1, 3, 100, 150,
+                                     DemoData.PHILADELPHIA.value.south_west_corner,
+                                     DemoData.PHILADELPHIA.value.north_east_corner)
+
+
 def doubles(random: Random, start: float, end: float) -> Generator[float, None, None]:
     while True:
         yield random.uniform(start, end)
@@ -151,5 +173,71 @@ def generate_demo_data(demo_data_enum: DemoData) -> VehicleRoutePlan:
                             visits=visits)
 
 
+def generate_large_demo_data(demo_data: DemoData | LargeDemoData | _DemoDataProperties, *,
+                             day: Optional[date] = None,
+                             driving_time_matrix: bool = True) -> VehicleRoutePlan:
+    """
+    Generates a route plan like generate_demo_data, with every kind of value drawn for all vehicles
+    or visits at once from a NumPy generator seeded with the properties' seed,
+    so the same properties and day always give the same plan.
+    The vehicles depart and the visits are due on day, tomorrow by default.
+    The visits and vehicles are not validated, as all their values are generated with the right types.
+
+    The driving time matrix holds a row per location, so it takes O(locations^2) memory;
+    with driving_time_matrix=False, driving times are computed from the coordinates on every call instead,
+    which is the only option for the largest instances.
+    """
+    properties = demo_data if isinstance(demo_data, _DemoDataProperties) else demo_data.value
+    random = np.random.default_rng(properties.seed)
+    south_west = (properties.south_west_corner.latitude, properties.south_west_corner.longitude)
+    north_east = (properties.north_east_corner.latitude, properties.north_east_corner.longitude)
+    if day is None:
+        day = date.today() + timedelta(days=1)
+
+    vehicle_coordinates = random.uniform(south_west, north_east, size=(properties.vehicle_count, 2)).tolist()
+    vehicle_capacities = random.integers(properties.min_vehicle_capacity, properties.max_vehicle_capacity,
+                                         size=properties.vehicle_count, endpoint=True).tolist()
+    departure_time = datetime.combine(day, properties.vehicle_start_time)
+    vehicles = [Vehicle.model_construct(id=str(i),
+                                        capacity=capacity,
+                                        home_location=Location.model_construct(latitude=latitude,
+                                                                               longitude=longitude),
+                                        departure_time=departure_time)
+                for i, ((latitude, longitude), capacity) in enumerate(zip(vehicle_coordinates, vehicle_capacities))]
+
+    visit_count = properties.visit_count
+    visit_coordinates = random.uniform(south_west, north_east, size=(visit_count, 2)).tolist()
+    demands = random.integers(properties.min_demand, properties.max_demand, size=visit_count,
+                              endpoint=True).tolist()
+    service_durations = [timedelta(minutes=minutes) for minutes in
+                         random.choice(SERVICE_DURATION_MINUTES, size=visit_count).tolist()]
+    morning_windows = (random.random(size=visit_count) > 0.5).tolist()
+    first_names = random.choice(FIRST_NAMES, size=visit_count).tolist()
+    last_names = random.choice(LAST_NAMES, size=visit_count).tolist()
+    windows = {
+        True: (datetime.combine(day, MORNING_WINDOW_START), datetime.combine(day, MORNING_WINDOW_END)),
+        False: (datetime.combine(day, AFTERNOON_WINDOW_START), datetime.combine(day, AFTERNOON_WINDOW_END)),
+    }
+    visits = [Visit.model_construct(id=str(i),
+                                    name=f'{first_name} {last_name}',
+                                    location=Location.model_construct(latitude=latitude, longitude=longitude),
+                                    demand=demand,
+                                    min_start_time=windows[morning_window][0],
+                                    max_end_time=windows[morning_window][1],
+                                    service_duration=service_duration)
+              for i, ((latitude, longitude), demand, service_duration, morning_window, first_name, last_name)
+              in enumerate(zip(visit_coordinates, demands, service_durations, morning_windows,
+                               first_names, last_names))]
+
+    route_plan = VehicleRoutePlan.model_construct(name="demo",
+                                                  south_west_corner=properties.south_west_corner,
+                                                  north_east_corner=properties.north_east_corner,
+                                                  vehicles=vehicles,
+                                                  visits=visits)
+    if driving_time_matrix:
+        route_plan.use_driving_time_provider(driving_time_providers[DEFAULT_DRIVING_TIME_PROVIDER])
+    return route_plan
+
+
 def tomorrow_at(local_time: time) -> datetime:
     return datetime.combine(date.today(), local_time)
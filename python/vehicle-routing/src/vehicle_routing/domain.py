@@ -3,33 +3,119 @@ from timefold.solver.score import HardSoftScore
 from timefold.solver.domain import *
 
 from datetime import datetime, timedelta
-from typing import Annotated, Optional
-from pydantic import Field, computed_field, BeforeValidator
+from typing import Annotated, Any, Optional
+from pydantic import Field, InstanceOf, computed_field, BeforeValidator, ValidationInfo, model_validator
+import numpy as np
 
 from .json_serialization import *
+from .driving_time import (DrivingTimeMatrix, DrivingTimeProvider, EuclideanDrivingTimeProvider,
+                           DEFAULT_DRIVING_TIME_PROVIDER, driving_time_providers)
 
 
-LocationValidator = BeforeValidator(lambda location: location if isinstance(location, Location)
-                                    else Location(latitude=location[0], longitude=location[1]))
+def validate_location(location: Any) -> 'Location':
+    if isinstance(location, Location):
+        return location
+    if isinstance(location, dict):
+        return Location.model_validate(location)
+    return Location(latitude=location[0], longitude=location[1],
+                    id=location[2] if len(location) > 2 else None)
+
+
+LocationValidator = BeforeValidator(validate_location)
 
 
 class Location(JsonDomainBase):
     latitude: float
     longitude: float
+    # Only needed to match a location to a MatrixFileDrivingTimeProvider by ID
+    id: Annotated[Optional[str], Field(default=None)]
+    # Both are set when the owning VehicleRoutePlan is loaded; see init_driving_time_matrix.
+    # The matrix is shared by all the locations of the plan, and index is the row and column of this one.
+    index: Annotated[Optional[int], Field(default=None, exclude=True)]
+    driving_time_matrix: Annotated[Optional[InstanceOf[DrivingTimeMatrix]], Field(default=None, exclude=True)]
 
     def driving_time_to(self, other: 'Location') -> int:
+        if self.driving_time_matrix is not None and other.index is not None:
+            return int(self.driving_time_matrix.seconds.get(self.index * self.driving_time_matrix.size + other.index))
         return round((
              (self.latitude - other.latitude) ** 2 +
              (self.longitude - other.longitude) ** 2
          ) ** 0.5 * 4_000)
 
     def __str__(self):
+        if self.id is not None:
+            return f'[{self.latitude}, {self.longitude}, {self.id}]'
         return f'[{self.latitude}, {self.longitude}]'
 
     def __repr__(self):
         return f'Location({self.latitude}, {self.longitude})'
 
 
+def init_driving_time_matrix(locations: list[Location], provider: DrivingTimeProvider) -> DrivingTimeMatrix:
+    """
+    Asks the provider for a driving time matrix covering the distinct locations
+    and attaches it to every Location object, along with the index of its location in it.
+    """
+    distinct_by_key: dict[tuple[float, float, Optional[str]], int] = {}
+    distinct_locations: list[Location] = []
+    distinct_of_location = []
+    for location in locations:
+        key = (location.latitude, location.longitude, location.id)
+        if key not in distinct_by_key:
+            distinct_by_key[key] = len(distinct_locations)
+            distinct_locations.append(location)
+        distinct_of_location.append(distinct_by_key[key])
+
+    matrix, indices = provider.shared_driving_time_matrix(distinct_locations)
+    indices = indices.tolist()
+    for location, distinct in zip(locations, distinct_of_location):
+        location.index = indices[distinct]
+        location.driving_time_matrix = matrix
+    return matrix
+
+
+def _shared_driving_time_matrix(locations: list[Location]) -> Optional[DrivingTimeMatrix]:
+    """The driving time matrix of all the locations, if they have the same one."""
+    matrices = {id(location.driving_time_matrix): location.driving_time_matrix for location in locations}
+    if len(matrices) == 1 and all(location.index is not None for location in locations):
+        return next(iter(matrices.values()))
+    return None
+
+
+def driving_times_between(origins: list[Location], destinations: list[Location]) -> np.ndarray:
+    """
+    Returns the driving times from every origin (rows) to every destination (columns),
+    read from the driving time matrix of the locations when they share one.
+    """
+    matrix = _shared_driving_time_matrix(origins + destinations)
+    if matrix is not None:
+        rows = np.array([origin.index for origin in origins], dtype=np.intp)
+        columns = np.array([destination.index for destination in destinations], dtype=np.intp)
+        return matrix.array[np.ix_(rows, columns)].astype(np.int64)
+    if all(origin.driving_time_matrix is None for origin in origins):
+        # The formula of Location.driving_time_to, for all pairs at once
+        origin_coordinates = np.array([(origin.latitude, origin.longitude) for origin in origins],
+                                      dtype=np.float64).reshape(-1, 1, 2)
+        destination_coordinates = np.array([(destination.latitude, destination.longitude)
+                                            for destination in destinations], dtype=np.float64).reshape(1, -1, 2)
+        squares = (origin_coordinates - destination_coordinates) ** 2
+        return np.round((squares[..., 0] + squares[..., 1]) ** 0.5 * 4_000).astype(np.int64)
+    return np.array([[origin.driving_time_to(destination) for destination in destinations] for origin in origins],
+                    dtype=np.int64).reshape(len(origins), len(destinations))
+
+
+def driving_times_of_pairs(origins: list[Location], destinations: list[Location]) -> np.ndarray:
+    """
+    Returns the driving time from every origin to the destination at the same position.
+    """
+    matrix = _shared_driving_time_matrix(origins + destinations)
+    if matrix is not None:
+        return matrix.array[[origin.index for origin in origins],
+                            [destination.index for destination in destinations]].astype(np.int64)
+    return np.fromiter((origin.driving_time_to(destination) for origin, destination in zip(origins, destinations)),
+                       dtype=np.int64, count=len(origins))
+
+
 @planning_entity
 class Visit(JsonDomainBase):
     id: Annotated[str, PlanningId]
@@ -52,16 +138,40 @@ class Visit(JsonDomainBase):
         Optional[datetime],
         CascadingUpdateShadowVariable(target_method_name='update_arrival_time'),
         Field(default=None)]
+    # Demand and driving time of this visit and every visit before it on the same route,
+    # so the vehicle totals can be read from its last visit
+    cumulative_demand: Annotated[
+        Optional[int],
+        CascadingUpdateShadowVariable(target_method_name='update_arrival_time'),
+        Field(default=None)]
+    cumulative_driving_time_seconds: Annotated[
+        Optional[int],
+        CascadingUpdateShadowVariable(target_method_name='update_arrival_time'),
+        Field(default=None)]
+
+    # Set only when nearby selection is enabled; see vehicle_routing.solver.init_nearby_visits
+    nearby_visit_ids: Annotated[Optional[set[str]], Field(default=None, exclude=True)]
 
     def update_arrival_time(self):
-        if self.vehicle is None or (self.previous_visit is not None and self.previous_visit.arrival_time is None):
+        if self.vehicle is None:
             self.arrival_time = None
+            self.cumulative_demand = None
+            self.cumulative_driving_time_seconds = None
         elif self.previous_visit is None:
-            self.arrival_time = (self.vehicle.departure_time +
-                                 timedelta(seconds=self.vehicle.home_location.driving_time_to(self.location)))
+            driving_time_seconds = self.vehicle.home_location.driving_time_to(self.location)
+            self.arrival_time = self.vehicle.departure_time + timedelta(seconds=driving_time_seconds)
+            self.cumulative_demand = self.demand
+            self.cumulative_driving_time_seconds = driving_time_seconds
         else:
-            self.arrival_time = (self.previous_visit.calculate_departure_time() +
-                                 timedelta(seconds=self.previous_visit.location.driving_time_to(self.location)))
+            driving_time_seconds = self.previous_visit.location.driving_time_to(self.location)
+            if self.previous_visit.arrival_time is None:
+                self.arrival_time = None
+            else:
+                self.arrival_time = (self.previous_visit.calculate_departure_time() +
+                                     timedelta(seconds=driving_time_seconds))
+            self.cumulative_demand = self.previous_visit.cumulative_demand + self.demand
+            self.cumulative_driving_time_seconds = (self.previous_visit.cumulative_driving_time_seconds +
+                                                    driving_time_seconds)
 
     def calculate_departure_time(self):
         if self.arrival_time is None:
@@ -121,6 +231,17 @@ class Vehicle(JsonDomainBase):
     visits: Annotated[list[Visit],
                       PlanningListVariable,
                       IdListSerializer, VisitListValidator, Field(default_factory=list)]
+    # The first served_visit_count visits are done, so the solver keeps them at the start of the route.
+    # A vehicle that is out of service keeps the visits it has and is given no others; see vehicle_routing.replan.
+    served_visit_count: Annotated[int, Field(default=0, ge=0)]
+    out_of_service: Annotated[bool, PlanningPin, Field(default=False)]
+    # The solver only accepts a pin index of 0 on a vehicle that is pinned as a whole
+    pinned_visit_count: Annotated[int, PlanningPinToIndex, Field(default=0, exclude=True)]
+
+    @model_validator(mode='after')
+    def init_pinned_visit_count(self) -> 'Vehicle':
+        self.pinned_visit_count = 0 if self.out_of_service else self.served_visit_count
+        return self
 
     @computed_field
     @property
@@ -141,23 +262,16 @@ class Vehicle(JsonDomainBase):
         return self.calculate_total_driving_time_seconds()
 
     def calculate_total_demand(self) -> int:
-        total_demand = 0
-        for visit in self.visits:
-            total_demand += visit.demand
-        return total_demand
+        if len(self.visits) == 0:
+            return 0
+        return self.visits[-1].cumulative_demand
 
     def calculate_total_driving_time_seconds(self) -> int:
         if len(self.visits) == 0:
             return 0
-        total_driving_time_seconds = 0
-        previous_location = self.home_location
-
-        for visit in self.visits:
-            total_driving_time_seconds += previous_location.driving_time_to(visit.location)
-            previous_location = visit.location
-
-        total_driving_time_seconds += previous_location.driving_time_to(self.home_location)
-        return total_driving_time_seconds
+        last_visit = self.visits[-1]
+        return (last_visit.cumulative_driving_time_seconds +
+                last_visit.location.driving_time_to(self.home_location))
 
     def __str__(self):
         return self.id
@@ -178,6 +292,69 @@ class VehicleRoutePlan(JsonDomainBase):
                      ScoreSerializer, ScoreValidator, Field(default=None)]
     solver_status: Annotated[Optional[SolverStatus],
                              Field(default=None)]
+    # Set on the route plans served by the REST API; see vehicle_routing.versions
+    version: Annotated[Optional[int],
+                       Field(default=None)]
+
+    @model_validator(mode='after')
+    def init_locations(self, info: ValidationInfo) -> 'VehicleRoutePlan':
+        # A different provider can be passed in the validation context,
+        # see json_to_vehicle_route_plan
+        provider = (info.context or {}).get('driving_time_provider',
+                                            driving_time_providers[DEFAULT_DRIVING_TIME_PROVIDER])
+        self.use_driving_time_provider(provider)
+        return self
+
+    def use_driving_time_provider(self, provider: DrivingTimeProvider) -> None:
+        init_driving_time_matrix([vehicle.home_location for vehicle in self.vehicles] +
+                                 [visit.location for visit in self.visits],
+                                 provider)
+
+    def use_known_driving_times(self, location: Location, provider: DrivingTimeProvider) -> None:
+        """
+        Gives a location that is not part of this plan yet, such as that of a visit added while solving,
+        the driving times of a location of this plan with the same coordinates and ID,
+        otherwise those of provider, which must be the provider this plan was loaded with.
+        Raises ValueError if the driving time matrix of this plan has no driving times for the location.
+        """
+        locations = [vehicle.home_location for vehicle in self.vehicles] + [visit.location for visit in self.visits]
+        key = (location.latitude, location.longitude, location.id)
+        for known in locations:
+            if (known.latitude, known.longitude, known.id) == key:
+                location.index = known.index
+                location.driving_time_matrix = known.driving_time_matrix
+                return
+        if isinstance(provider, EuclideanDrivingTimeProvider):
+            # A location without a matrix gets the same straight-line driving times from its coordinates
+            return
+        matrix, rows = provider.shared_driving_time_matrix([location])
+        if matrix is not _shared_driving_time_matrix(locations):
+            raise ValueError(f'The location ({location}) is not in the driving time matrix of the route plan '
+                             f'({self.name}).')
+        location.index = int(rows[0])
+        location.driving_time_matrix = matrix
+
+    def assign_routes(self, routes: dict[str, list[str]]) -> None:
+        """
+        Gives every vehicle the visits listed under its ID in routes, in order,
+        and updates the shadow variables the solver would maintain. Other visits are left unassigned.
+        """
+        visit_by_id = {visit.id: visit for visit in self.visits}
+        for visit in self.visits:
+            visit.vehicle = visit.previous_visit = visit.next_visit = None
+        for vehicle in self.vehicles:
+            vehicle.visits = [visit_by_id[visit_id] for visit_id in routes.get(vehicle.id, [])]
+            previous_visit = None
+            for visit in vehicle.visits:
+                visit.vehicle = vehicle
+                visit.previous_visit = previous_visit
+                if previous_visit is not None:
+                    previous_visit.next_visit = visit
+                visit.update_arrival_time()
+                previous_visit = visit
+        for visit in self.visits:
+            if visit.vehicle is None:
+                visit.update_arrival_time()
 
     @computed_field
     @property
@@ -0,0 +1,153 @@
+from abc import ABC, abstractmethod
+from os import PathLike
+from pathlib import Path
+from typing import Protocol, Optional, Sequence
+import numpy as np
+from timefold.solver._timefold_java_interop import ensure_init
+
+
+# The solver reads DrivingTimeMatrix.seconds with a Java int index
+MAX_DRIVING_TIME_MATRIX_SIZE = 46_340
+
+
+class LocationLike(Protocol):
+    latitude: float
+    longitude: float
+    id: Optional[str]
+
+
+class DrivingTimeMatrix:
+    """
+    A square matrix of driving times in seconds, shared by every Location it covers;
+    see Location.driving_time_to.
+
+    The solver reads it from ``seconds``, a Java int array of the rows one after the other,
+    so starting a solve neither converts nor copies it, and it takes 4 bytes per entry.
+    ``array`` is the same matrix as a NumPy array, for vectorized lookups in Python.
+    """
+    size: int
+    array: np.ndarray
+    seconds: object
+
+    def __init__(self, array: np.ndarray):
+        if array.ndim != 2 or array.shape[0] != array.shape[1]:
+            raise ValueError(f'A driving time matrix must be square, but it has shape {array.shape}.')
+        if len(array) > MAX_DRIVING_TIME_MATRIX_SIZE:
+            raise ValueError(f'A driving time matrix can have at most {MAX_DRIVING_TIME_MATRIX_SIZE} locations, '
+                             f'but it has {len(array)}.')
+        ensure_init()
+        from jpype import JArray, JInt
+        # The solver can only call public methods of a Java object, which an int[] has none of
+        from java.util.concurrent.atomic import AtomicIntegerArray
+        self.size = len(array)
+        self.array = array
+        self.seconds = AtomicIntegerArray(JArray(JInt)(np.ascontiguousarray(array, dtype=np.int32).reshape(-1)))
+
+    def __deepcopy__(self, memo) -> 'DrivingTimeMatrix':
+        # Read-only, so copies of a route plan keep sharing it
+        return self
+
+    def __reduce__(self):
+        # The Java array cannot be pickled, so a worker process rebuilds it; see vehicle_routing.partition
+        return DrivingTimeMatrix, (np.asarray(self.array),)
+
+
+class DrivingTimeProvider(ABC):
+    """
+    Supplies the driving time in seconds between the locations of a route plan.
+    """
+    @abstractmethod
+    def driving_time_matrix(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        """
+        Returns a square integer matrix where entry [i, j] is the driving time in seconds
+        from locations[i] to locations[j].
+        """
+        ...
+
+    def shared_driving_time_matrix(self, locations: Sequence[LocationLike]) -> tuple[DrivingTimeMatrix, np.ndarray]:
+        """
+        Returns a DrivingTimeMatrix covering the locations and the index of every location in it.
+        By default, that is a new matrix of driving_time_matrix(locations), with the locations in order.
+        """
+        return DrivingTimeMatrix(self.driving_time_matrix(locations)), np.arange(len(locations))
+
+
+class EuclideanDrivingTimeProvider(DrivingTimeProvider):
+    """
+    Straight-line distance between the coordinates, at 4000 seconds per degree.
+    """
+    def driving_time_matrix(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        coordinates = np.array([(location.latitude, location.longitude) for location in locations],
+                               dtype=np.float64).reshape(-1, 2)
+        deltas = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        return np.rint(np.sqrt(np.sum(deltas ** 2, axis=-1)) * 4_000).astype(np.int32)
+
+
+class MatrixFileDrivingTimeProvider(DrivingTimeProvider):
+    """
+    Reads driving times from a precomputed int32 matrix stored in a .npy file or in a raw file of
+    little-endian int32 values in row-major order.
+
+    The file is memory-mapped read-only, and the solver reads it from a single DrivingTimeMatrix
+    that every route plan loaded with this provider shares, so register one provider per file.
+    That DrivingTimeMatrix holds one copy of the whole file in the Java heap;
+    lookups in Python read the mapped file itself.
+    Row and column i of the matrix belong to the location with either ``location_ids[i]``
+    (matched against Location.id) or ``coordinates[i]`` (matched against (latitude, longitude)).
+    """
+    path: Path
+    matrix: np.ndarray
+    shared_matrix: DrivingTimeMatrix
+
+    def __init__(self, path: str | PathLike, *,
+                 location_ids: Optional[Sequence[str]] = None,
+                 coordinates: Optional[Sequence[tuple[float, float]]] = None):
+        if (location_ids is None) == (coordinates is None):
+            raise ValueError('Exactly one of location_ids or coordinates must be given.')
+        keys = list(location_ids) if location_ids is not None else [tuple(c) for c in coordinates]
+        self.path = Path(path)
+        if self.path.suffix == '.npy':
+            self.matrix = np.load(self.path, mmap_mode='r')
+        else:
+            self.matrix = np.memmap(self.path, dtype='<i4', mode='r', shape=(len(keys), len(keys)))
+        if self.matrix.shape != (len(keys), len(keys)):
+            raise ValueError(f'The matrix in ({self.path}) has shape {self.matrix.shape}, '
+                             f'but {len(keys)} locations were given.')
+        if not np.issubdtype(self.matrix.dtype, np.integer):
+            raise ValueError(f'The matrix in ({self.path}) has dtype ({self.matrix.dtype}), '
+                             f'but it must be an integer type.')
+        self._match_by_id = location_ids is not None
+        self._row_by_key = {key: row for row, key in enumerate(keys)}
+        self.shared_matrix = DrivingTimeMatrix(self.matrix)
+
+    def _row_of(self, location: LocationLike) -> int:
+        key = location.id if self._match_by_id else (location.latitude, location.longitude)
+        try:
+            return self._row_by_key[key]
+        except KeyError:
+            raise ValueError(f'The location ({location}) is not in the driving time matrix ({self.path}).') from None
+
+    def _rows_of(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        return np.array([self._row_of(location) for location in locations], dtype=np.intp)
+
+    def driving_time_matrix(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        rows = self._rows_of(locations)
+        return np.asarray(self.matrix[np.ix_(rows, rows)], dtype=np.int32)
+
+    def shared_driving_time_matrix(self, locations: Sequence[LocationLike]) -> tuple[DrivingTimeMatrix, np.ndarray]:
+        # The whole file, with the locations at their rows in it, instead of a copy of their rows and columns
+        return self.shared_matrix, self._rows_of(locations)
+
+
+DEFAULT_DRIVING_TIME_PROVIDER = 'euclidean'
+driving_time_providers: dict[str, DrivingTimeProvider] = {
+    DEFAULT_DRIVING_TIME_PROVIDER: EuclideanDrivingTimeProvider()
+}
+
+
+def register_driving_time_provider(name: str, provider: DrivingTimeProvider) -> None:
+    """
+    Makes the provider selectable by name, for example with the drivingTimeProvider query parameter
+    of the REST API. Register a MatrixFileDrivingTimeProvider once per file so all jobs share its matrix.
+    """
+    driving_time_providers[name] = provider
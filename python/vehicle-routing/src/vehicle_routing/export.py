@@ -0,0 +1,80 @@
+from typing import Optional
+import numpy as np
+
+from .domain import *
+
+# pyarrow is only needed for exports; install it with the "export" extra
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+EXPORT_MEDIA_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def export_available() -> bool:
+    return pa is not None
+
+
+def _datetimes(moments: list[Optional[datetime]]) -> np.ndarray:
+    return np.array([moment if moment is not None else np.datetime64('NaT') for moment in moments],
+                    dtype='datetime64[us]')
+
+
+def route_plan_table(route_plan: VehicleRoutePlan) -> 'pa.Table':
+    """
+    A table with a row per visit, in route order per vehicle, followed by the unassigned visits.
+    The columns are read from the fields of the visits, so none of the computed fields are evaluated:
+    start of service and departure are derived from the arrival time in bulk, and the driving time
+    from the previous stop from the cumulative driving time.
+    """
+    visits = [visit for vehicle in route_plan.vehicles for visit in vehicle.visits]
+    sequences = [index for vehicle in route_plan.vehicles for index in range(len(vehicle.visits))]
+    assigned = set(map(id, visits))
+    unassigned = [visit for visit in route_plan.visits if id(visit) not in assigned]
+    assigned_count = len(visits)
+    visits += unassigned
+
+    arrivals = _datetimes([visit.arrival_time for visit in visits])
+    starts = np.maximum(arrivals, _datetimes([visit.min_start_time for visit in visits]))
+    departures = starts + np.array([visit.service_duration for visit in visits], dtype='timedelta64[us]')
+    cumulative_driving_times = np.array([visit.cumulative_driving_time_seconds or 0 for visit in visits],
+                                        dtype=np.int64)
+    is_first = np.array([visit.previous_visit is None for visit in visits], dtype=bool)
+    driving_times = cumulative_driving_times - np.where(is_first, 0, np.roll(cumulative_driving_times, 1))
+    missing = np.arange(len(visits)) >= assigned_count
+    no_arrival = np.isnat(arrivals)
+
+    return pa.table({
+        'visit_id': pa.array([visit.id for visit in visits], type=pa.string()),
+        'vehicle_id': pa.array([visit.vehicle.id if visit.vehicle is not None else None for visit in visits],
+                               type=pa.string()),
+        'sequence': pa.array(np.array(sequences + [0] * len(unassigned), dtype=np.int32), mask=missing),
+        'arrival_time': pa.array(arrivals, mask=no_arrival),
+        'start_service_time': pa.array(starts, mask=no_arrival),
+        'departure_time': pa.array(departures, mask=no_arrival),
+        'driving_time_seconds_from_previous_standstill': pa.array(driving_times, mask=missing),
+        'demand': pa.array(np.array([visit.demand for visit in visits], dtype=np.int64)),
+    })
+
+
+def export_route_plan(route_plan: VehicleRoutePlan, export_format: str) -> 'pa.Buffer':
+    """
+    Writes route_plan_table in export_format, one of EXPORT_MEDIA_TYPES.
+    Raises RuntimeError if pyarrow is not installed.
+    """
+    if not export_available():
+        raise RuntimeError('Exporting route plans requires pyarrow; install vehicle_routing[export].')
+    table = route_plan_table(route_plan)
+    sink = pa.BufferOutputStream()
+    if export_format == 'parquet':
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
@@ -48,7 +48,11 @@ def make_id_list_item_validator(key: str):
 LocationSerializer = PlainSerializer(lambda location: [
     location.latitude,
     location.longitude,
-], return_type=list[float])
+] if location.id is None else [
+    location.latitude,
+    location.longitude,
+    location.id,
+], return_type=list)
 ScoreSerializer = PlainSerializer(lambda score: str(score), return_type=str)
 IdSerializer = PlainSerializer(lambda item: item.id if item is not None else None, return_type=str | None)
 IdListSerializer = PlainSerializer(lambda items: [item.id for item in items], return_type=list)
@@ -0,0 +1,78 @@
+from math import ceil, sqrt
+import numpy as np
+
+
+class GridIndex:
+    """
+    Buckets points into a uniform grid of square cells, sized so that a cell holds a handful of points,
+    to find the nearest neighbours of every point without comparing all pairs.
+    """
+    coordinates: np.ndarray
+    cell_size: float
+
+    def __init__(self, coordinates: np.ndarray, points_per_cell: int = 8):
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        point_count = len(self.coordinates)
+        if point_count == 0:
+            self.cell_size = 1.0
+            self._cells = np.zeros((0, 2), dtype=np.int64)
+            self._points_by_cell = {}
+            return
+
+        self._origin = self.coordinates.min(axis=0)
+        extent = np.maximum(self.coordinates.max(axis=0) - self._origin, 1e-9)
+        cell_count = max(1.0, point_count / points_per_cell)
+        self.cell_size = float(max(sqrt(extent[0] * extent[1] / cell_count), extent.max() / ceil(cell_count)))
+        self._cells = np.floor((self.coordinates - self._origin) / self.cell_size).astype(np.int64)
+
+        order = np.lexsort((self._cells[:, 1], self._cells[:, 0]))
+        sorted_cells = self._cells[order]
+        boundaries = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)) + 1
+        self._points_by_cell = {
+            (int(cell[0]), int(cell[1])): points
+            for cell, points in zip(sorted_cells[np.r_[0, boundaries]], np.split(order, boundaries))
+        }
+
+    def _points_in_ring(self, cell: tuple[int, int], radius: int) -> list[np.ndarray]:
+        x, y = cell
+        if radius == 0:
+            ring = [(x, y)]
+        else:
+            ring = ([(x + dx, y - radius) for dx in range(-radius, radius + 1)] +
+                    [(x + dx, y + radius) for dx in range(-radius, radius + 1)] +
+                    [(x - radius, y + dy) for dy in range(-radius + 1, radius)] +
+                    [(x + radius, y + dy) for dy in range(-radius + 1, radius)])
+        return [self._points_by_cell[ring_cell] for ring_cell in ring if ring_cell in self._points_by_cell]
+
+    def k_nearest(self, k: int) -> np.ndarray:
+        """
+        Returns an array of shape (point count, min(k, point count - 1)) where row i holds the indices
+        of the points nearest to point i, nearest first, excluding i itself.
+        """
+        point_count = len(self.coordinates)
+        k = max(0, min(k, point_count - 1))
+        out = np.empty((point_count, k), dtype=np.int64)
+        if k == 0:
+            return out
+
+        for cell, points in self._points_by_cell.items():
+            candidates = []
+            candidate_count = 0
+            radius = 0
+            while True:
+                for ring_points in self._points_in_ring(cell, radius):
+                    candidates.append(ring_points)
+                    candidate_count += len(ring_points)
+                # Every point outside the searched square is at least radius cells away
+                if candidate_count > k:
+                    candidate_array = np.concatenate(candidates)
+                    distances = np.linalg.norm(self.coordinates[points][:, np.newaxis, :] -
+                                               self.coordinates[candidate_array][np.newaxis, :, :], axis=-1)
+                    distances[candidate_array[np.newaxis, :] == points[:, np.newaxis]] = np.inf
+                    nearest = np.argsort(distances, axis=1, kind='stable')[:, :k]
+                    kth_distance = np.take_along_axis(distances, nearest[:, -1:], axis=1).max()
+                    if kth_distance <= radius * self.cell_size or candidate_count == point_count:
+                        out[points] = candidate_array[nearest]
+                        break
+                radius += 1
+        return out
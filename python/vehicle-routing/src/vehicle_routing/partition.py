@@ -0,0 +1,190 @@
+from timefold.solver import SolverFactory
+from timefold.solver.config import TerminationConfig, Duration
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Sequence
+import multiprocessing
+import numpy as np
+
+from .domain import *
+from .driving_time import DrivingTimeProvider, LocationLike
+from .solver import nearby_solver_config, init_nearby_visits
+from .savings import warm_start
+
+
+# Time every partition is solved for, and time the merged plan is refined for afterward
+PARTITION_SPENT_LIMIT = Duration(seconds=20)
+REFINEMENT_SPENT_LIMIT = Duration(seconds=10)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def kmeans(coordinates: np.ndarray, cluster_count: int, *, seed: int = 0,
+           max_iterations: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clusters the points with k-means++ seeding followed by Lloyd's algorithm.
+    Returns the cluster of every point and the centroid of every cluster.
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if not 1 <= cluster_count <= len(coordinates):
+        raise ValueError(f'The cluster count ({cluster_count}) must be between 1 and '
+                         f'the number of points ({len(coordinates)}).')
+    random = np.random.default_rng(seed)
+
+    centroids = np.empty((cluster_count, 2))
+    centroids[0] = coordinates[random.integers(len(coordinates))]
+    squared_distances = np.sum((coordinates - centroids[0]) ** 2, axis=1)
+    for cluster in range(1, cluster_count):
+        total = squared_distances.sum()
+        chosen = (random.choice(len(coordinates), p=squared_distances / total) if total > 0
+                  else random.integers(len(coordinates)))
+        centroids[cluster] = coordinates[chosen]
+        squared_distances = np.minimum(squared_distances, np.sum((coordinates - centroids[cluster]) ** 2, axis=1))
+
+    labels = np.full(len(coordinates), -1)
+    for _ in range(max_iterations):
+        distances = np.sum((coordinates[:, np.newaxis, :] - centroids[np.newaxis, :, :]) ** 2, axis=-1)
+        new_labels = distances.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=cluster_count)
+        for axis in range(2):
+            centroids[:, axis] = np.bincount(labels, weights=coordinates[:, axis], minlength=cluster_count)
+        centroids[counts > 0] /= counts[counts > 0, np.newaxis]
+        # Restart an empty cluster at the point farthest from its centroid
+        for cluster in np.flatnonzero(counts == 0):
+            farthest = distances[np.arange(len(coordinates)), labels].argmax()
+            centroids[cluster] = coordinates[farthest]
+            labels[farthest] = cluster
+            distances[farthest] = 0
+    return labels, centroids
+
+
+def allocate_vehicles(route_plan: VehicleRoutePlan, labels: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Gives every cluster the vehicle whose home is closest to it, then hands out the other vehicles
+    one by one to the cluster with the largest demand not yet covered by its vehicles' capacity.
+    Returns the cluster of every vehicle.
+    """
+    cluster_count = len(centroids)
+    if cluster_count > len(route_plan.vehicles):
+        raise ValueError(f'The partition count ({cluster_count}) must not exceed '
+                         f'the number of vehicles ({len(route_plan.vehicles)}).')
+    homes = np.array([(vehicle.home_location.latitude, vehicle.home_location.longitude)
+                      for vehicle in route_plan.vehicles])
+    capacities = np.array([vehicle.capacity for vehicle in route_plan.vehicles])
+    distances = np.sum((homes[:, np.newaxis, :] - centroids[np.newaxis, :, :]) ** 2, axis=-1)
+    uncovered_demand = np.bincount(labels, weights=[visit.demand for visit in route_plan.visits],
+                                   minlength=cluster_count)
+
+    vehicle_clusters = np.full(len(route_plan.vehicles), -1)
+    for step in range(len(route_plan.vehicles)):
+        cluster = step if step < cluster_count else int(uncovered_demand.argmax())
+        free_distances = np.where(vehicle_clusters < 0, distances[:, cluster], np.inf)
+        vehicle = int(free_distances.argmin())
+        vehicle_clusters[vehicle] = cluster
+        uncovered_demand[cluster] -= capacities[vehicle]
+    return vehicle_clusters
+
+
+class _ParentDrivingTimeProvider(DrivingTimeProvider):
+    """
+    Driving times between the locations of a partition, read from the route plan it was cut from,
+    so a partition uses whichever provider that plan was loaded with.
+    """
+    def __init__(self, parent_locations: Sequence[Location]):
+        self._parent_by_key = {(location.latitude, location.longitude, location.id): location
+                               for location in parent_locations}
+
+    def driving_time_matrix(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        parents = [self._parent_by_key[(location.latitude, location.longitude, location.id)]
+                   for location in locations]
+        return driving_times_between(parents, parents).astype(np.int32)
+
+
+def partition_route_plan(route_plan: VehicleRoutePlan, partition_count: int) -> list[VehicleRoutePlan]:
+    """
+    Splits the route plan into partition_count independent route plans with unassigned visits,
+    by clustering the visits geographically and sharing the vehicles out between the clusters.
+    The partitions hold copies of the vehicles and visits, so solving them leaves route_plan untouched.
+    """
+    labels, centroids = kmeans(np.array([(visit.location.latitude, visit.location.longitude)
+                                         for visit in route_plan.visits]), partition_count)
+    vehicle_clusters = allocate_vehicles(route_plan, labels, centroids)
+    provider = _ParentDrivingTimeProvider([vehicle.home_location for vehicle in route_plan.vehicles] +
+                                          [visit.location for visit in route_plan.visits])
+
+    def copy_location(location: Location) -> Location:
+        return Location(latitude=location.latitude, longitude=location.longitude, id=location.id)
+
+    partitions = []
+    for cluster in range(partition_count):
+        vehicles = [Vehicle(id=vehicle.id,
+                            capacity=vehicle.capacity,
+                            home_location=copy_location(vehicle.home_location),
+                            departure_time=vehicle.departure_time)
+                    for vehicle, vehicle_cluster in zip(route_plan.vehicles, vehicle_clusters)
+                    if vehicle_cluster == cluster]
+        visits = [Visit(id=visit.id,
+                        name=visit.name,
+                        location=copy_location(visit.location),
+                        demand=visit.demand,
+                        min_start_time=visit.min_start_time,
+                        max_end_time=visit.max_end_time,
+                        service_duration=visit.service_duration)
+                  for visit, label in zip(route_plan.visits, labels)
+                  if label == cluster]
+        partitions.append(VehicleRoutePlan.model_validate({
+            'name': f'{route_plan.name} ({cluster + 1}/{partition_count})',
+            'south_west_corner': route_plan.south_west_corner,
+            'north_east_corner': route_plan.north_east_corner,
+            'vehicles': vehicles,
+            'visits': visits,
+        }, context={'driving_time_provider': provider}))
+    return partitions
+
+
+def solve_partition(partition: VehicleRoutePlan, spent_limit: Duration,
+                    use_warm_start: bool = False) -> dict[str, list[str]]:
+    """
+    Solves one partition and returns the IDs of the visits of every vehicle, in order.
+    Runs in a worker process, so it only sends IDs back instead of the solved plan.
+    """
+    if use_warm_start:
+        warm_start(partition)
+    init_nearby_visits(partition)
+    solver = SolverFactory.create(replace(nearby_solver_config,
+                                          termination_config=TerminationConfig(spent_limit=spent_limit))
+                                  ).build_solver()
+    solution = solver.solve(partition)
+    return {vehicle.id: [visit.id for visit in vehicle.visits] for vehicle in solution.vehicles}
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Forking a process that runs a JVM is unsafe, so every worker starts its own interpreter and JVM.
+        # The pool is kept so that start-up cost is only paid once.
+        _process_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+    return _process_pool
+
+
+def solve_partitioned(route_plan: VehicleRoutePlan, partition_count: int,
+                      spent_limit: Duration = PARTITION_SPENT_LIMIT,
+                      use_warm_start: bool = False) -> VehicleRoutePlan:
+    """
+    Solves the partitions of route_plan in parallel worker processes
+    and merges their routes back into route_plan, which is returned.
+    With use_warm_start, every partition starts from savings routes; see vehicle_routing.savings.
+    The merged plan is meant as the starting point of a short solve over the whole plan,
+    which can move visits across partition borders.
+    """
+    partitions = partition_route_plan(route_plan, partition_count)
+    routes = {}
+    for partition_routes in _get_process_pool().map(solve_partition, partitions,
+                                                    [spent_limit] * len(partitions),
+                                                    [use_warm_start] * len(partitions)):
+        routes.update(partition_routes)
+    route_plan.assign_routes(routes)
+    return route_plan
@@ -0,0 +1,94 @@
+from typing import Annotated, Optional
+from pydantic import Field
+import numpy as np
+
+from .domain import *
+
+
+DEMAND_EXCEEDS_CAPACITY = "demandExceedsCapacity"
+MAX_END_TIME_UNREACHABLE = "maxEndTimeUnreachable"
+NO_VEHICLE_MEETS_BOTH = "noVehicleMeetsDemandAndMaxEndTime"
+
+
+class UnservableVisit(JsonDomainBase):
+    visit_id: str
+    reasons: list[str]
+    # When the service could finish at the earliest, with the best-placed vehicle driving there directly
+    earliest_service_end_time: Optional[datetime] = None
+
+
+class PrecheckReport(JsonDomainBase):
+    feasible: bool
+    unservable_visits: list[UnservableVisit]
+    vehicle_count: int
+    total_demand: int
+    total_capacity: int
+    capacity_shortfall: int
+    # The fewest vehicles whose capacities add up to the total demand, or None if all of them do not suffice
+    minimum_vehicle_count: Annotated[Optional[int], Field(default=None)]
+
+
+def precheck(route_plan: VehicleRoutePlan) -> PrecheckReport:
+    """
+    Finds reasons why no solution of the route plan can be feasible, without solving it.
+    A visit is unservable if no vehicle has the capacity for it and can drive there directly
+    to finish its service before its max end time; the fleet falls short if its total capacity
+    is below the total demand. Passing these checks does not guarantee a feasible solution.
+    """
+    vehicles = route_plan.vehicles
+    visits = route_plan.visits
+    capacities = np.array([vehicle.capacity for vehicle in vehicles], dtype=np.int64)
+    demands = np.array([visit.demand for visit in visits], dtype=np.int64)
+    total_demand = int(demands.sum())
+    total_capacity = int(capacities.sum())
+
+    if total_demand > total_capacity:
+        minimum_vehicle_count = None
+    else:
+        # Largest vehicles first; the count is one past the first position where they cover the demand
+        covered_demand = np.concatenate(([0], np.cumsum(np.sort(capacities)[::-1])))
+        minimum_vehicle_count = int(np.searchsorted(covered_demand, total_demand))
+
+    unservable_visits = []
+    if visits and vehicles:
+        reference = min(vehicle.departure_time for vehicle in vehicles)
+
+        def seconds(moments) -> np.ndarray:
+            return np.array([(moment - reference) // timedelta(seconds=1) for moment in moments], dtype=np.int64)
+
+        departures = seconds(vehicle.departure_time for vehicle in vehicles)
+        min_starts = seconds(visit.min_start_time for visit in visits)
+        max_ends = seconds(visit.max_end_time for visit in visits)
+        services = np.array([visit.service_duration // timedelta(seconds=1) for visit in visits], dtype=np.int64)
+        # Driving time from every vehicle home (rows) to every visit (columns)
+        driving_times = driving_times_between([vehicle.home_location for vehicle in vehicles],
+                                              [visit.location for visit in visits])
+
+        service_ends = np.maximum(departures[:, np.newaxis] + driving_times, min_starts) + services
+        in_time = service_ends <= max_ends
+        has_capacity = capacities[:, np.newaxis] >= demands
+        servable = np.any(in_time & has_capacity, axis=0)
+        earliest_service_ends = service_ends.min(axis=0)
+
+        for visit_index in np.flatnonzero(~servable).tolist():
+            reasons = []
+            if not has_capacity[:, visit_index].any():
+                reasons.append(DEMAND_EXCEEDS_CAPACITY)
+            if not in_time[:, visit_index].any():
+                reasons.append(MAX_END_TIME_UNREACHABLE)
+            if not reasons:
+                reasons.append(NO_VEHICLE_MEETS_BOTH)
+            unservable_visits.append(UnservableVisit(
+                visit_id=visits[visit_index].id,
+                reasons=reasons,
+                earliest_service_end_time=reference + timedelta(seconds=int(earliest_service_ends[visit_index]))
+            ))
+
+    capacity_shortfall = max(0, total_demand - total_capacity)
+    return PrecheckReport(feasible=not unservable_visits and capacity_shortfall == 0,
+                          unservable_visits=unservable_visits,
+                          vehicle_count=len(vehicles),
+                          total_demand=total_demand,
+                          total_capacity=total_capacity,
+                          capacity_shortfall=capacity_shortfall,
+                          minimum_vehicle_count=minimum_vehicle_count)
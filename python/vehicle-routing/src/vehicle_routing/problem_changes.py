@@ -0,0 +1,62 @@
+from timefold.solver import ProblemChange, ProblemChangeDirector
+
+from .domain import *
+
+
+def _working_score_director(problem_change_director: ProblemChangeDirector):
+    """The score director of the solver's working solution, which ProblemChangeDirector does not expose."""
+    java_director = problem_change_director._delegate
+    field = java_director.getClass().getDeclaredField('scoreDirector')
+    field.setAccessible(True)
+    return field.get(java_director)
+
+
+class AddVisitProblemChange(ProblemChange[VehicleRoutePlan]):
+    """
+    Adds an unassigned visit to a route plan that is being solved.
+    The solver keeps its current routes and inserts the visit into one of them.
+    Does nothing if the route plan already has a visit with the same ID.
+    """
+    visit: Visit
+
+    def __init__(self, visit: Visit):
+        self.visit = visit
+
+    def do_change(self, route_plan: VehicleRoutePlan, problem_change_director: ProblemChangeDirector) -> None:
+        # The REST API only checks the last best solution, which may not include earlier changes yet
+        if any(str(visit.id) == self.visit.id for visit in route_plan.visits):
+            return
+        problem_change_director.add_entity(self.visit, lambda visit: route_plan.visits.append(visit))
+
+
+class RemoveVisitProblemChange(ProblemChange[VehicleRoutePlan]):
+    """
+    Removes a visit from a route plan that is being solved, taking it off its vehicle's route first.
+    Does nothing if the visit was already removed.
+    """
+    visit_id: str
+
+    def __init__(self, visit_id: str):
+        self.visit_id = visit_id
+
+    def do_change(self, route_plan: VehicleRoutePlan, problem_change_director: ProblemChangeDirector) -> None:
+        # The modifiers run on the solver's working objects, so they find the visit by position
+        # rather than by comparing Visit objects
+        plan_visit_ids = [str(visit.id) for visit in route_plan.visits]
+        if self.visit_id not in plan_visit_ids:
+            return
+        plan_index = plan_visit_ids.index(self.visit_id)
+        visit = route_plan.visits[plan_index]
+        vehicle = visit.vehicle
+        if vehicle is not None:
+            route_index = [str(route_visit.id) for route_visit in vehicle.visits].index(self.visit_id)
+            # change_variable fails on a list variable in this Timefold version,
+            # so the score director is told about the list change the way the solver's own moves do;
+            # that makes the solver update the shadow variables of the rest of the route
+            score_director = _working_score_director(problem_change_director)
+            score_director.beforeListVariableChanged(vehicle, 'visits', route_index, route_index + 1)
+            problem_change_director.change_problem_property(
+                vehicle, lambda working_vehicle: working_vehicle.visits.pop(route_index))
+            score_director.afterListVariableChanged(vehicle, 'visits', route_index, route_index)
+            problem_change_director.update_shadow_variables()
+        problem_change_director.remove_entity(visit, lambda working_visit: route_plan.visits.pop(plan_index))
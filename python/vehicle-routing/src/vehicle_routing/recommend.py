@@ -0,0 +1,114 @@
+from typing import Annotated
+import numpy as np
+
+from .domain import *
+
+
+DEFAULT_RECOMMENDATION_COUNT = 5
+MICROSECONDS_PER_SECOND = 1_000_000
+MICROSECONDS_PER_MINUTE = 60 * MICROSECONDS_PER_SECOND
+
+
+class InsertionRecommendation(JsonDomainBase):
+    vehicle_id: str
+    # Position in the vehicle's visits the new visit would take
+    index: int
+    arrival_time: datetime
+    score_diff: Annotated[HardSoftScore, ScoreSerializer]
+
+
+def _late_minutes(departure: int, max_end: int) -> int:
+    # Rounded up, as in Visit.service_finished_delay_in_minutes
+    return -((departure - max_end) // -MICROSECONDS_PER_MINUTE) if departure > max_end else 0
+
+
+def recommend_insertions(route_plan: VehicleRoutePlan, visit: Visit,
+                         count: int = DEFAULT_RECOMMENDATION_COUNT) -> list[InsertionRecommendation]:
+    """
+    Finds the count best places to insert a new visit into the routes of route_plan, without solving.
+    Every position of every vehicle that is in service, after its served visits, is a candidate.
+    Candidates where the vehicle lacks the capacity or the new visit would finish after its max end time
+    are dropped, unless no candidate is left. The score difference of the others is computed exactly:
+    the extra driving time, capacity excess and lateness, including the lateness of the visits after it
+    that would start later.
+    """
+    vehicles = [vehicle for vehicle in route_plan.vehicles if not vehicle.out_of_service]
+    if not vehicles:
+        return []
+    reference = min(vehicle.departure_time for vehicle in vehicles)
+
+    def microseconds(moment: datetime) -> int:
+        return (moment - reference) // timedelta(microseconds=1)
+
+    # One candidate per vehicle and index, with what comes before and after the new visit there
+    candidate_vehicles, candidate_indices = [], []
+    previous_locations, next_locations, previous_departures = [], [], []
+    for vehicle_index, vehicle in enumerate(vehicles):
+        route = vehicle.visits
+        for index in range(vehicle.pinned_visit_count, len(route) + 1):
+            candidate_vehicles.append(vehicle_index)
+            candidate_indices.append(index)
+            if index == 0:
+                previous_locations.append(vehicle.home_location)
+                previous_departures.append(microseconds(vehicle.departure_time))
+            else:
+                previous_locations.append(route[index - 1].location)
+                previous_departures.append(microseconds(route[index - 1].calculate_departure_time()))
+            next_locations.append(route[index].location if index < len(route) else vehicle.home_location)
+    if not candidate_vehicles:
+        return []
+    candidate_vehicles = np.array(candidate_vehicles, dtype=np.intp)
+    driving_times_to = driving_times_between(previous_locations, [visit.location])[:, 0]
+    driving_times_from = driving_times_between([visit.location], next_locations)[0]
+    driving_times_skipped = driving_times_of_pairs(previous_locations, next_locations)
+
+    arrivals = np.array(previous_departures, dtype=np.int64) + driving_times_to * MICROSECONDS_PER_SECOND
+    departures = (np.maximum(arrivals, microseconds(visit.min_start_time)) +
+                  visit.service_duration // timedelta(microseconds=1))
+    late_by = departures - microseconds(visit.max_end_time)
+    late_minutes = np.where(late_by > 0, -(late_by // -MICROSECONDS_PER_MINUTE), 0)
+    total_demands = np.array([vehicle.calculate_total_demand() for vehicle in vehicles], dtype=np.int64)
+    capacities = np.array([vehicle.capacity for vehicle in vehicles], dtype=np.int64)
+    excess_demands = (np.maximum(total_demands + visit.demand - capacities, 0) -
+                      np.maximum(total_demands - capacities, 0))[candidate_vehicles]
+
+    kept = np.flatnonzero((late_minutes == 0) & (excess_demands == 0))
+    if len(kept) == 0:
+        kept = np.arange(len(candidate_vehicles))
+
+    # The visits after the new one start later, until waiting for a min start time absorbs the delay
+    route_times: dict[int, list[tuple[int, int, int, int]]] = {}
+    tail_late_minutes = np.zeros(len(kept), dtype=np.int64)
+    for position, candidate in enumerate(kept.tolist()):
+        vehicle_index = int(candidate_vehicles[candidate])
+        if vehicle_index not in route_times:
+            route_times[vehicle_index] = [(microseconds(route_visit.arrival_time),
+                                           microseconds(route_visit.min_start_time),
+                                           route_visit.service_duration // timedelta(microseconds=1),
+                                           microseconds(route_visit.max_end_time))
+                                          for route_visit in vehicles[vehicle_index].visits]
+        times = route_times[vehicle_index]
+        index = candidate_indices[candidate]
+        if index == len(times):
+            continue
+        next_arrival = int(departures[candidate]) + int(driving_times_from[candidate]) * MICROSECONDS_PER_SECOND
+        delay = next_arrival - times[index][0]
+        late_minutes_diff = 0
+        for arrival, min_start, service, max_end in times[index:]:
+            old_departure = max(arrival, min_start) + service
+            new_departure = max(arrival + delay, min_start) + service
+            late_minutes_diff += _late_minutes(new_departure, max_end) - _late_minutes(old_departure, max_end)
+            delay = new_departure - old_departure
+            if delay == 0:
+                break
+        tail_late_minutes[position] = late_minutes_diff
+
+    hard_score_diffs = -(excess_demands[kept] + late_minutes[kept] + tail_late_minutes)
+    soft_score_diffs = -(driving_times_to[kept] + driving_times_from[kept] - driving_times_skipped[kept])
+    # Best hard score first, then best soft score
+    best = np.lexsort((-soft_score_diffs, -hard_score_diffs))[:count]
+    return [InsertionRecommendation(vehicle_id=vehicles[int(candidate_vehicles[kept[i]])].id,
+                                    index=candidate_indices[kept[i]],
+                                    arrival_time=reference + timedelta(microseconds=int(arrivals[kept[i]])),
+                                    score_diff=HardSoftScore.of(int(hard_score_diffs[i]), int(soft_score_diffs[i])))
+            for i in best.tolist()]
@@ -0,0 +1,30 @@
+from timefold.solver.config import TerminationConfig, Duration
+
+from .domain import *
+
+
+# Only the unserved visits are moved, so a re-plan converges much faster than a solve from scratch
+REPLAN_TERMINATION = TerminationConfig(spent_limit=Duration(seconds=10),
+                                       unimproved_spent_limit=Duration(seconds=2))
+
+
+def prepare_replan(route_plan: VehicleRoutePlan) -> VehicleRoutePlan:
+    """
+    Readies a route plan that is partly carried out for solving again.
+    The first served_visit_count visits of every vehicle stay where they are.
+    Vehicles that are out of service keep their served visits and drop the rest,
+    which are left unassigned for the solver to hand to the other vehicles.
+    Returns route_plan.
+
+    Raises ValueError if a vehicle has served more visits than it has.
+    """
+    routes = {}
+    for vehicle in route_plan.vehicles:
+        if vehicle.served_visit_count > len(vehicle.visits):
+            raise ValueError(f'The vehicle ({vehicle.id}) has a served visit count ({vehicle.served_visit_count}) '
+                             f'above its number of visits ({len(vehicle.visits)}).')
+        visits = vehicle.visits[:vehicle.served_visit_count] if vehicle.out_of_service else vehicle.visits
+        routes[vehicle.id] = [visit.id for visit in visits]
+        vehicle.init_pinned_visit_count()
+    route_plan.assign_routes(routes)
+    return route_plan
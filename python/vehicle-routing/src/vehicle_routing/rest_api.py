@@ -1,15 +1,45 @@
-from fastapi import FastAPI, Depends, Request
+from fastapi import FastAPI, Depends, Request, Response, Query, HTTPException
 from fastapi.staticfiles import StaticFiles
+from timefold.solver.config import SolverConfigOverride, TerminationConfig
+from typing import Literal
+from datetime import date
 from uuid import uuid4
+import asyncio
+import logging
 
 from .domain import *
 from .score_analysis import *
-from .demo_data import DemoData, generate_demo_data
-from .solver import solver_manager, solution_manager
+from .demo_data import DemoData, LargeDemoData, generate_demo_data, generate_large_demo_data
+from .driving_time import DrivingTimeProvider, DEFAULT_DRIVING_TIME_PROVIDER, driving_time_providers
+from .solver import solver_manager, solution_manager, core_solver_manager, init_nearby_visits
+from .core import CoreLocation, CoreRoutePlan, CoreVehicle, CoreVisit
+from .partition import solve_partitioned, REFINEMENT_SPENT_LIMIT
+from .savings import warm_start as savings_warm_start
+from .problem_changes import AddVisitProblemChange, RemoveVisitProblemChange
+from .precheck import PrecheckReport, precheck
+from .scorer import VectorizedScorer
+from .versions import RoutePlanDiff, RoutePlanVersions
+from .replan import REPLAN_TERMINATION, prepare_replan
+from .export import EXPORT_MEDIA_TYPES, export_available, export_route_plan
+from .recommend import DEFAULT_RECOMMENDATION_COUNT, InsertionRecommendation, recommend_insertions
+from .aggregation import VisitAggregation
 
 
+logger = logging.getLogger(__name__)
 app = FastAPI(docs_url='/q/swagger-ui')
 data_sets: dict[str, VehicleRoutePlan] = {}
+# Jobs whose partitions are being solved, before the solver manager takes over
+partitioned_jobs: set[str] = set()
+# Jobs solved on the compact core domain by the core solver manager
+compact_jobs: set[str] = set()
+# Jobs whose co-located visits are solved as one stop each
+aggregated_jobs: set[str] = set()
+# The JSON of the latest route plan of every job and the solver status it was serialized with
+json_snapshots: dict[str, tuple[SolverStatus, bytes]] = {}
+# The numbered route plans of every job, to send clients only what changed
+route_versions: dict[str, RoutePlanVersions] = {}
+# The driving time provider the route plan of every job was loaded with
+job_driving_time_providers: dict[str, DrivingTimeProvider] = {}
 
 
 @app.get("/demo-data")
@@ -18,25 +48,69 @@ async def demo_data_list():
 
 
 @app.get("/demo-data/{dataset_id}", response_model_exclude_none=True)
-async def get_demo_data(dataset_id: str) -> VehicleRoutePlan:
+async def get_demo_data(dataset_id: str, day: Annotated[Optional[date], Query(alias='date')] = None) \
+        -> VehicleRoutePlan:
+    if dataset_id in LargeDemoData.__members__:
+        # The driving times are computed again by whoever solves the plan, so no matrix is built here
+        return generate_large_demo_data(LargeDemoData[dataset_id], day=day, driving_time_matrix=False)
+    if dataset_id not in DemoData.__members__:
+        raise HTTPException(status_code=404, detail=f'No demo data with ID ({dataset_id}).')
     demo_data = generate_demo_data(getattr(DemoData, dataset_id))
     return demo_data
 
 
-@app.get("/route-plans/{problem_id}", response_model_exclude_none=True)
-async def get_route(problem_id: str) -> VehicleRoutePlan:
-    route = data_sets[problem_id]
-    return route.model_copy(update={
-        'solver_status': solver_manager.get_solver_status(problem_id),
-    })
+def get_solver_status(problem_id: str) -> SolverStatus:
+    if problem_id in partitioned_jobs:
+        return SolverStatus.SOLVING_ACTIVE
+    if problem_id in compact_jobs:
+        return core_solver_manager.get_solver_status(problem_id)
+    return solver_manager.get_solver_status(problem_id)
+
+
+def take_json_snapshot(problem_id: str) -> bytes:
+    solver_status = get_solver_status(problem_id)
+    version, route = route_versions[problem_id].latest()
+    snapshot = route.model_copy(update={
+        'solver_status': solver_status,
+        'version': version,
+    }).model_dump_json(by_alias=True, exclude_none=True).encode()
+    json_snapshots[problem_id] = (solver_status, snapshot)
+    return snapshot
+
+
+@app.get("/route-plans/{problem_id}", response_model=VehicleRoutePlan | RoutePlanDiff,
+         response_model_exclude_none=True)
+async def get_route(problem_id: str,
+                    since: Annotated[Optional[int], Query(ge=0)] = None) -> Response:
+    if problem_id not in route_versions:
+        raise HTTPException(status_code=404, detail=f'No route plan with ID ({problem_id}).')
+    if since is not None:
+        # Only the vehicles and visits that changed after the version the client has
+        try:
+            diff = route_versions[problem_id].diff(since, get_solver_status(problem_id))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(content=diff.model_dump_json(by_alias=True, exclude_none=True),
+                        media_type='application/json')
+    # Serializing evaluates every computed field of every visit and vehicle,
+    # so the JSON is only recomputed when the route plan or the solver status changed
+    solver_status, snapshot = json_snapshots.get(problem_id, (None, None))
+    if snapshot is None or solver_status != get_solver_status(problem_id):
+        snapshot = take_json_snapshot(problem_id)
+    return Response(content=snapshot, media_type='application/json')
 
 
 def update_route(problem_id: str, route: VehicleRoutePlan):
     global data_sets
     data_sets[problem_id] = route
+    route_versions.setdefault(problem_id, RoutePlanVersions()).update(route)
+    # Called on the solver's thread, so GET requests are served from the snapshot without serializing
+    take_json_snapshot(problem_id)
 
 
-def json_to_vehicle_route_plan(json: dict) -> VehicleRoutePlan:
+def json_to_vehicle_route_plan(json: dict,
+                               driving_time_provider: DrivingTimeProvider =
+                               driving_time_providers[DEFAULT_DRIVING_TIME_PROVIDER]) -> VehicleRoutePlan:
     visits = {
         visit['id']: visit for visit in json.get('visits', [])
     }
@@ -64,24 +138,269 @@ def json_to_vehicle_route_plan(json: dict) -> VehicleRoutePlan:
 
     return VehicleRoutePlan.model_validate(json, context={
         'visits': visits,
-        'vehicles': vehicles
+        'vehicles': vehicles,
+        'driving_time_provider': driving_time_provider
     })
 
 
-async def setup_context(request: Request) -> VehicleRoutePlan:
+def to_core_route_plan(route: VehicleRoutePlan) -> CoreRoutePlan:
+    """
+    The route plan in the compact core domain, with its current routes.
+    Times become whole seconds since the earliest departure of a vehicle,
+    and every distinct location becomes one CoreLocation shared by the vehicles and visits there.
+    """
+    reference = min((vehicle.departure_time for vehicle in route.vehicles),
+                    default=min((visit.min_start_time for visit in route.visits), default=datetime.now()))
+
+    def seconds(moment: datetime) -> int:
+        return (moment - reference) // timedelta(seconds=1)
+
+    core_locations: dict[tuple[float, float, Optional[str]], CoreLocation] = {}
+
+    def core_location(location: Location) -> CoreLocation:
+        key = (location.latitude, location.longitude, location.id)
+        if key not in core_locations:
+            if location.index is not None and location.driving_time_matrix is not None:
+                core_locations[key] = CoreLocation(location.index, location.latitude, location.longitude,
+                                                   location.driving_time_matrix)
+            else:
+                core_locations[key] = CoreLocation(-1, location.latitude, location.longitude)
+        return core_locations[key]
+
+    visits = {visit.id: CoreVisit(id=visit.id,
+                                  location=core_location(visit.location),
+                                  demand=visit.demand,
+                                  min_start_time=seconds(visit.min_start_time),
+                                  max_end_time=seconds(visit.max_end_time),
+                                  service_duration=visit.service_duration // timedelta(seconds=1))
+              for visit in route.visits}
+    vehicles = [CoreVehicle(id=vehicle.id,
+                            capacity=vehicle.capacity,
+                            home_location=core_location(vehicle.home_location),
+                            departure_time=seconds(vehicle.departure_time),
+                            visits=[visits[visit.id] for visit in vehicle.visits],
+                            pinned_visit_count=vehicle.pinned_visit_count,
+                            out_of_service=vehicle.out_of_service)
+                for vehicle in route.vehicles]
+    for vehicle in vehicles:
+        previous_visit = None
+        for visit in vehicle.visits:
+            visit.vehicle = vehicle
+            visit.previous_visit = previous_visit
+            visit.update_arrival_time()
+            previous_visit = visit
+    return CoreRoutePlan(vehicles=vehicles, visits=list(visits.values()), score=route.score)
+
+
+def from_core_route_plan(route: VehicleRoutePlan, solution: CoreRoutePlan) -> VehicleRoutePlan:
+    """
+    A copy of route with the routes and score of solution, which was converted from it by to_core_route_plan.
+    route itself is not modified.
+    """
+    visits = [visit.model_copy() for visit in route.visits]
+    vehicles = [vehicle.model_copy() for vehicle in route.vehicles]
+    result = route.model_copy(update={'vehicles': vehicles, 'visits': visits, 'score': solution.score})
+    result.assign_routes({vehicle.id: [visit.id for visit in vehicle.visits] for vehicle in solution.vehicles})
+    return result
+
+
+def get_driving_time_provider(driving_time_provider: Annotated[str, Query(alias='drivingTimeProvider')] =
+                              DEFAULT_DRIVING_TIME_PROVIDER) -> DrivingTimeProvider:
+    if driving_time_provider not in driving_time_providers:
+        raise HTTPException(status_code=400,
+                            detail=f'Unknown driving time provider ({driving_time_provider}).')
+    return driving_time_providers[driving_time_provider]
+
+
+async def setup_context(request: Request,
+                        driving_time_provider: Annotated[DrivingTimeProvider, Depends(get_driving_time_provider)]) \
+        -> VehicleRoutePlan:
     json = await request.json()
-    return json_to_vehicle_route_plan(json)
+    return json_to_vehicle_route_plan(json, driving_time_provider)
+
+
+def restrict_to_nearby_visits(job_id: str, route: VehicleRoutePlan) -> float:
+    """
+    Restricts the moves of the solver to nearby visits (see init_nearby_visits)
+    and logs the share of the nearest visits it skips because the visit would always be late after them.
+    """
+    pruned_share = init_nearby_visits(route)
+    logger.info(f'Route plan ({job_id}): {pruned_share:.1%} of the nearest visits are pruned as always late.')
+    return pruned_share
+
+
+def solve_partitioned_and_refine(job_id: str, route: VehicleRoutePlan, partitions: int, warm_start: bool):
+    try:
+        # route is already published, so the partitions are merged into a copy
+        # that is only published once every partition is solved
+        merged = route.model_copy(update={'vehicles': [vehicle.model_copy() for vehicle in route.vehicles],
+                                          'visits': [visit.model_copy() for visit in route.visits]})
+        solve_partitioned(merged, partitions, use_warm_start=warm_start)
+        update_route(job_id, merged)
+        if job_id in partitioned_jobs:
+            (solver_manager.solve_builder()
+             .with_problem_id(job_id)
+             .with_problem(merged)
+             .with_best_solution_consumer(lambda solution: update_route(job_id, solution))
+             .with_config_override(SolverConfigOverride(
+                termination_config=TerminationConfig(spent_limit=REFINEMENT_SPENT_LIMIT)))
+             .run())
+    finally:
+        partitioned_jobs.discard(job_id)
 
 
 @app.post("/route-plans")
-async def solve_route(route: Annotated[VehicleRoutePlan, Depends(setup_context)]) -> str:
+async def solve_route(route: Annotated[VehicleRoutePlan, Depends(setup_context)],
+                      driving_time_provider: Annotated[DrivingTimeProvider, Depends(get_driving_time_provider)],
+                      partitions: Annotated[Optional[int], Query(ge=1)] = None,
+                      warm_start: Annotated[bool, Query(alias='warmStart')] = False,
+                      compact: bool = False,
+                      aggregate: bool = False) -> str:
+    if partitions is not None and partitions > min(len(route.vehicles), len(route.visits)):
+        raise HTTPException(status_code=400,
+                            detail=f'The partition count ({partitions}) must not exceed the number '
+                                   f'of vehicles ({len(route.vehicles)}) or visits ({len(route.visits)}).')
+    if (compact or aggregate) and partitions is not None and partitions > 1:
+        raise HTTPException(status_code=400,
+                            detail='Compact or aggregated route plans cannot be solved in partitions.')
     job_id = str(uuid4())
+    job_driving_time_providers[job_id] = driving_time_provider
+    if aggregate:
+        # The solver works on one stop per group of co-located visits; clients get the individual visits
+        aggregation = VisitAggregation(route)
+        aggregated_jobs.add(job_id)
+        solved, publish = aggregation.route_plan, aggregation.expand
+    else:
+        solved, publish = route, lambda solution: solution
+    if compact:
+        # The solver works on the core domain; every best solution is converted back for the clients
+        data_sets[job_id] = route
+        route_versions[job_id] = RoutePlanVersions()
+        if warm_start:
+            savings_warm_start(solved)
+        route_versions[job_id].update(publish(solved))
+        compact_jobs.add(job_id)
+        core_solver_manager.solve_and_listen(job_id, to_core_route_plan(solved),
+                                             lambda solution: update_route(
+                                                 job_id, publish(from_core_route_plan(solved, solution))))
+        return job_id
+    restrict_to_nearby_visits(job_id, solved)
     data_sets[job_id] = route
-    solver_manager.solve_and_listen(job_id, route,
-                                    lambda solution: update_route(job_id, solution))
+    route_versions[job_id] = RoutePlanVersions()
+    if partitions is not None and partitions > 1:
+        # Solve geographic partitions in parallel, then refine the merged plan as a whole
+        route_versions[job_id].update(route)
+        partitioned_jobs.add(job_id)
+        asyncio.get_running_loop().run_in_executor(None, solve_partitioned_and_refine,
+                                                   job_id, route, partitions, warm_start)
+        return job_id
+    if warm_start:
+        # Start from savings routes instead of empty vehicles
+        savings_warm_start(solved)
+    route_versions[job_id].update(publish(solved))
+    solver_manager.solve_and_listen(job_id, solved,
+                                    lambda solution: update_route(job_id, publish(solution)))
     return job_id
 
 
+@app.post("/route-plans/replan")
+async def replan_route(route: Annotated[VehicleRoutePlan, Depends(setup_context)],
+                       driving_time_provider: Annotated[DrivingTimeProvider, Depends(get_driving_time_provider)]) \
+        -> str:
+    # Only the visits after the served ones are moved, so a short solve is enough
+    try:
+        prepare_replan(route)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job_id = str(uuid4())
+    job_driving_time_providers[job_id] = driving_time_provider
+    restrict_to_nearby_visits(job_id, route)
+    data_sets[job_id] = route
+    route_versions[job_id] = RoutePlanVersions()
+    route_versions[job_id].update(route)
+    (solver_manager.solve_builder()
+     .with_problem_id(job_id)
+     .with_problem(route)
+     .with_best_solution_consumer(lambda solution: update_route(job_id, solution))
+     .with_config_override(SolverConfigOverride(termination_config=REPLAN_TERMINATION))
+     .run())
+    return job_id
+
+
+def get_solving_route(problem_id: str) -> VehicleRoutePlan:
+    if problem_id not in data_sets:
+        raise HTTPException(status_code=404, detail=f'No route plan with ID ({problem_id}).')
+    if (problem_id in partitioned_jobs or problem_id in compact_jobs or problem_id in aggregated_jobs or
+            solver_manager.get_solver_status(problem_id) == SolverStatus.NOT_SOLVING):
+        raise HTTPException(status_code=409,
+                            detail=f'The route plan ({problem_id}) is not being solved by the solver manager.')
+    return data_sets[problem_id]
+
+
+def use_known_driving_times(problem_id: str, route: VehicleRoutePlan, visit: Visit) -> None:
+    try:
+        route.use_known_driving_times(visit.location, job_driving_time_providers.get(
+            problem_id, driving_time_providers[DEFAULT_DRIVING_TIME_PROVIDER]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/route-plans/{problem_id}/visits")
+async def add_visit(problem_id: str, request: Request) -> None:
+    route = get_solving_route(problem_id)
+    json = await request.json()
+    for key in ('vehicle', 'previousVisit', 'nextVisit'):
+        json.pop(key, None)
+    visit = Visit.model_validate(json)
+    if any(existing.id == visit.id for existing in route.visits):
+        raise HTTPException(status_code=409,
+                            detail=f'The route plan ({problem_id}) already has a visit with ID ({visit.id}).')
+    use_known_driving_times(problem_id, route, visit)
+    solver_manager.add_problem_change(problem_id, AddVisitProblemChange(visit))
+
+
+@app.get("/route-plans/{problem_id}/export")
+async def export_route(problem_id: str,
+                       export_format: Annotated[Literal['parquet', 'arrow'], Query(alias='format')] = 'parquet') \
+        -> Response:
+    if problem_id not in route_versions:
+        raise HTTPException(status_code=404, detail=f'No route plan with ID ({problem_id}).')
+    if not export_available():
+        raise HTTPException(status_code=501,
+                            detail='Exporting route plans requires pyarrow; install vehicle_routing[export].')
+    _, route = route_versions[problem_id].latest()
+    return Response(content=export_route_plan(route, export_format).to_pybytes(),
+                    media_type=EXPORT_MEDIA_TYPES[export_format])
+
+
+@app.post("/route-plans/{problem_id}/recommend")
+async def recommend_visit_insertions(problem_id: str, request: Request,
+                                     count: Annotated[int, Query(ge=1)] = DEFAULT_RECOMMENDATION_COUNT) \
+        -> list[InsertionRecommendation]:
+    if problem_id not in data_sets:
+        raise HTTPException(status_code=404, detail=f'No route plan with ID ({problem_id}).')
+    # The latest best solution, which is never modified once published
+    route = data_sets[problem_id]
+    json = await request.json()
+    for key in ('vehicle', 'previousVisit', 'nextVisit'):
+        json.pop(key, None)
+    visit = Visit.model_validate(json)
+    if any(existing.id == visit.id for existing in route.visits):
+        raise HTTPException(status_code=409,
+                            detail=f'The route plan ({problem_id}) already has a visit with ID ({visit.id}).')
+    use_known_driving_times(problem_id, route, visit)
+    return recommend_insertions(route, visit, count)
+
+
+@app.delete("/route-plans/{problem_id}/visits/{visit_id}")
+async def remove_visit(problem_id: str, visit_id: str) -> None:
+    route = get_solving_route(problem_id)
+    if all(visit.id != visit_id for visit in route.visits):
+        raise HTTPException(status_code=404,
+                            detail=f'The route plan ({problem_id}) has no visit with ID ({visit_id}).')
+    solver_manager.add_problem_change(problem_id, RemoveVisitProblemChange(visit_id))
+
+
 @app.put("/route-plans/analyze")
 async def analyze_route(route: Annotated[VehicleRoutePlan, Depends(setup_context)]) \
         -> dict['str', list[ConstraintAnalysisDTO]]:
@@ -100,9 +419,38 @@ async def analyze_route(route: Annotated[VehicleRoutePlan, Depends(setup_context
     ) for constraint in solution_manager.analyze(route).constraint_analyses]}
 
 
+async def get_candidates(request: Request) -> list[dict[str, list[str]]]:
+    json = await request.json()
+    return json.get('candidates', [])
+
+
+@app.put("/route-plans/what-if")
+async def what_if_routes(route: Annotated[VehicleRoutePlan, Depends(setup_context)],
+                         candidates: Annotated[list[dict[str, list[str]]], Depends(get_candidates)]) \
+        -> list[CandidateScoreDTO]:
+    try:
+        scores = VectorizedScorer(route).score_all(candidates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [CandidateScoreDTO(
+        score=score.pop('score'),
+        constraints=score
+    ) for score in scores]
+
+
+@app.post("/route-plans/precheck")
+async def precheck_route(route: Annotated[VehicleRoutePlan, Depends(setup_context)]) -> PrecheckReport:
+    return precheck(route)
+
+
 @app.delete("/route-plans/{problem_id}")
 async def stop_solving(problem_id: str) -> None:
-    solver_manager.terminate_early(problem_id)
+    # A partitioned job that is stopped before its partitions are solved is not refined afterward
+    partitioned_jobs.discard(problem_id)
+    if problem_id in compact_jobs:
+        core_solver_manager.terminate_early(problem_id)
+    else:
+        solver_manager.terminate_early(problem_id)
 
 
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
@@ -0,0 +1,133 @@
+from typing import Optional
+import numpy as np
+
+from .domain import *
+from .nearby import GridIndex
+from .arcs import ArcCompatibility
+
+
+# Savings are only computed between a visit and this many of its nearest visits
+SAVINGS_NEIGHBOUR_COUNT = 50
+
+
+class _RouteTimes:
+    """
+    Times in whole seconds after the earliest vehicle departure,
+    so the time window checks of candidate routes only do integer arithmetic.
+    """
+    def __init__(self, route_plan: VehicleRoutePlan):
+        self.start = min(vehicle.departure_time for vehicle in route_plan.vehicles)
+        self.ready = [self.seconds(visit.min_start_time) for visit in route_plan.visits]
+        self.due = [self.seconds(visit.max_end_time) for visit in route_plan.visits]
+        self.service = [visit.service_duration // timedelta(seconds=1) for visit in route_plan.visits]
+        self.locations = [visit.location for visit in route_plan.visits]
+
+    def seconds(self, moment: datetime) -> int:
+        return (moment - self.start) // timedelta(seconds=1)
+
+    def is_feasible(self, route: list[int], departure: int, first_driving_time: int) -> bool:
+        """Whether every visit of the route is finished before its max end time."""
+        clock = departure + first_driving_time
+        previous = None
+        for visit in route:
+            if previous is not None:
+                clock += self.locations[previous].driving_time_to(self.locations[visit])
+            clock = max(clock, self.ready[visit]) + self.service[visit]
+            if clock > self.due[visit]:
+                return False
+            previous = visit
+        return True
+
+
+def build_savings_routes(route_plan: VehicleRoutePlan,
+                         neighbour_count: int = SAVINGS_NEIGHBOUR_COUNT) -> dict[str, list[str]]:
+    """
+    Builds routes with the Clarke-Wright savings algorithm, adapted to vehicles with different homes:
+    the cost of serving a visit on its own is measured from and to the nearest vehicle home.
+    Two routes are only merged if the result fits in the largest vehicle
+    and finishes every visit within its time window when leaving at the earliest departure time.
+    The routes are then handed to the vehicles, largest demand first, each to the vehicle
+    with enough capacity and the shortest detour that still meets the time windows.
+    Visits on routes that no vehicle can drive are left out, for the solver to insert.
+
+    Returns the IDs of the visits of every vehicle, in order; see VehicleRoutePlan.assign_routes.
+    """
+    visits = route_plan.visits
+    visit_count = len(visits)
+    if visit_count == 0 or len(route_plan.vehicles) == 0:
+        return {}
+    times = _RouteTimes(route_plan)
+    homes = [vehicle.home_location for vehicle in route_plan.vehicles]
+    demands = np.array([visit.demand for visit in visits])
+    max_capacity = max(vehicle.capacity for vehicle in route_plan.vehicles)
+    earliest_departure = min(times.seconds(vehicle.departure_time) for vehicle in route_plan.vehicles)
+
+    visit_locations = [visit.location for visit in visits]
+    from_home = driving_times_between(homes, visit_locations).T
+    to_home = driving_times_between(visit_locations, homes)
+    nearest_from_home = from_home.min(axis=1)
+    nearest_to_home = to_home.min(axis=1)
+
+    # Saving of driving i -> j directly instead of i -> home and home -> j, for the nearest neighbours j of i
+    neighbours = GridIndex(np.array([(visit.location.latitude, visit.location.longitude)
+                                     for visit in visits])).k_nearest(neighbour_count)
+    origins = np.repeat(np.arange(visit_count), neighbours.shape[1])
+    destinations = neighbours.ravel()
+    driving_times = driving_times_of_pairs([visit_locations[i] for i in origins.tolist()],
+                                           [visit_locations[j] for j in destinations.tolist()])
+    # Joining routes with an arc that is late whenever it is driven can never pass the time window check
+    compatible = ArcCompatibility(route_plan).between(origins, destinations, driving_times)
+    origins, destinations, driving_times = origins[compatible], destinations[compatible], driving_times[compatible]
+    savings = nearest_to_home[origins] + nearest_from_home[destinations] - driving_times
+    order = np.argsort(-savings, kind='stable')
+    order = order[savings[order] > 0]
+
+    routes: dict[int, list[int]] = {visit: [visit] for visit in range(visit_count)}
+    route_of = list(range(visit_count))
+    route_demand = {visit: int(demands[visit]) for visit in range(visit_count)}
+    for origin, destination in zip(origins[order].tolist(), destinations[order].tolist()):
+        origin_route, destination_route = route_of[origin], route_of[destination]
+        # Only the last visit of one route can be joined to the first visit of another
+        if (origin_route == destination_route or routes[origin_route][-1] != origin
+                or routes[destination_route][0] != destination):
+            continue
+        demand = route_demand[origin_route] + route_demand[destination_route]
+        if demand > max_capacity:
+            continue
+        merged = routes[origin_route] + routes[destination_route]
+        if not times.is_feasible(merged, earliest_departure, int(nearest_from_home[merged[0]])):
+            continue
+        routes[origin_route] = merged
+        route_demand[origin_route] = demand
+        for visit in routes.pop(destination_route):
+            route_of[visit] = origin_route
+
+    out: dict[str, list[str]] = {}
+    free_vehicles = list(range(len(route_plan.vehicles)))
+    for route_id in sorted(routes, key=lambda route_id: -route_demand[route_id]):
+        route = routes[route_id]
+        best_vehicle: Optional[int] = None
+        best_detour = 0
+        for vehicle_index in free_vehicles:
+            vehicle = route_plan.vehicles[vehicle_index]
+            detour = int(from_home[route[0], vehicle_index] + to_home[route[-1], vehicle_index])
+            if (vehicle.capacity >= route_demand[route_id]
+                    and (best_vehicle is None or detour < best_detour)
+                    and times.is_feasible(route, times.seconds(vehicle.departure_time),
+                                          int(from_home[route[0], vehicle_index]))):
+                best_vehicle, best_detour = vehicle_index, detour
+        if best_vehicle is not None:
+            free_vehicles.remove(best_vehicle)
+            out[route_plan.vehicles[best_vehicle].id] = [visits[visit].id for visit in route]
+        if not free_vehicles:
+            break
+    return out
+
+
+def warm_start(route_plan: VehicleRoutePlan) -> VehicleRoutePlan:
+    """
+    Assigns the visits of route_plan to its vehicles with the savings algorithm,
+    so the solver starts from these routes instead of empty ones. Returns route_plan.
+    """
+    route_plan.assign_routes(build_savings_routes(route_plan))
+    return route_plan
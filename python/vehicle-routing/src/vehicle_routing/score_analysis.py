@@ -17,3 +17,9 @@ class ConstraintAnalysisDTO:
     weight: Annotated[HardSoftScore, ScoreSerializer]
     matches: list[MatchAnalysisDTO]
     score: Annotated[HardSoftScore, ScoreSerializer]
+
+
+@dataclass
+class CandidateScoreDTO:
+    score: Annotated[HardSoftScore, ScoreSerializer]
+    constraints: dict[str, Annotated[HardSoftScore, ScoreSerializer]]
@@ -0,0 +1,149 @@
+from timefold.solver.score import HardSoftScore
+from typing import Sequence
+import numpy as np
+
+from .domain import *
+from .driving_time import DEFAULT_DRIVING_TIME_PROVIDER, driving_time_providers
+from .constraints import VEHICLE_CAPACITY, SERVICE_FINISHED_AFTER_MAX_END_TIME, MINIMIZE_TRAVEL_TIME
+
+
+MICROSECONDS_PER_SECOND = 1_000_000
+MICROSECONDS_PER_MINUTE = 60 * MICROSECONDS_PER_SECOND
+
+
+class VectorizedScorer:
+    """
+    Scores many route assignments of the same route plan at once, with the same result as the constraints
+    in vehicle_routing.constraints. An assignment maps vehicle IDs to the IDs of their visits, in order;
+    vehicles that are not in it drive no route and visits that are not in it are left unassigned.
+
+    All the routes of all the assignments are laid out in flat arrays, one element per visit.
+    Times are in microseconds since the earliest departure, so they match the datetime arithmetic
+    of Visit.update_arrival_time exactly.
+    """
+    def __init__(self, route_plan: VehicleRoutePlan):
+        vehicles = route_plan.vehicles
+        visits = route_plan.visits
+        self._vehicle_index = {vehicle.id: index for index, vehicle in enumerate(vehicles)}
+        self._visit_index = {visit.id: index for index, visit in enumerate(visits)}
+
+        locations = [vehicle.home_location for vehicle in vehicles] + [visit.location for visit in visits]
+        if len({id(location.driving_time_matrix) for location in locations}) > 1 or any(
+                location.index is None or location.driving_time_matrix is None for location in locations):
+            init_driving_time_matrix(locations, driving_time_providers[DEFAULT_DRIVING_TIME_PROVIDER])
+        # Legs are looked up in the matrix shared by the locations, without copying it
+        self._matrix = locations[0].driving_time_matrix.array if locations else np.zeros((0, 0), dtype=np.int32)
+
+        reference = min((vehicle.departure_time for vehicle in vehicles), default=datetime(2000, 1, 1))
+
+        def microseconds(moments) -> np.ndarray:
+            return np.array([(moment - reference) // timedelta(microseconds=1) for moment in moments],
+                            dtype=np.int64)
+
+        self._home_locations = np.array([vehicle.home_location.index for vehicle in vehicles], dtype=np.intp)
+        self._capacities = np.array([vehicle.capacity for vehicle in vehicles], dtype=np.int64)
+        self._departures = microseconds(vehicle.departure_time for vehicle in vehicles)
+        self._visit_locations = np.array([visit.location.index for visit in visits], dtype=np.intp)
+        self._demands = np.array([visit.demand for visit in visits], dtype=np.int64)
+        self._min_starts = microseconds(visit.min_start_time for visit in visits)
+        self._max_ends = microseconds(visit.max_end_time for visit in visits)
+        self._services = np.array([visit.service_duration // timedelta(microseconds=1) for visit in visits],
+                                  dtype=np.int64)
+
+    def _driving_times(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        return self._matrix[origins, destinations].astype(np.int64)
+
+    def _flatten(self, assignments: Sequence[dict[str, list[str]]]) \
+            -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the visit of every element, and the vehicle, assignment and first element of every route.
+        """
+        visits, route_vehicles, route_assignments, route_lengths = [], [], [], []
+        for assignment_index, assignment in enumerate(assignments):
+            assigned = set()
+            for vehicle_id, visit_ids in assignment.items():
+                if vehicle_id not in self._vehicle_index:
+                    raise ValueError(f'Assignment {assignment_index} has an unknown vehicle ({vehicle_id}).')
+                for visit_id in visit_ids:
+                    if visit_id not in self._visit_index:
+                        raise ValueError(f'Assignment {assignment_index} has an unknown visit ({visit_id}).')
+                    if visit_id in assigned:
+                        raise ValueError(f'Assignment {assignment_index} has visit ({visit_id}) more than once.')
+                    assigned.add(visit_id)
+                if visit_ids:
+                    visits.extend(self._visit_index[visit_id] for visit_id in visit_ids)
+                    route_vehicles.append(self._vehicle_index[vehicle_id])
+                    route_assignments.append(assignment_index)
+                    route_lengths.append(len(visit_ids))
+        route_lengths = np.array(route_lengths, dtype=np.intp)
+        route_starts = np.concatenate(([0], np.cumsum(route_lengths)[:-1])).astype(np.intp)
+        return (np.array(visits, dtype=np.intp), np.array(route_vehicles, dtype=np.intp),
+                np.array(route_assignments, dtype=np.intp), route_starts)
+
+    def penalties(self, assignments: Sequence[dict[str, list[str]]]) -> np.ndarray:
+        """
+        Returns an array with a row per assignment, holding the match weight totals of the
+        vehicle capacity, service finished after max end time and minimize travel time constraints.
+        """
+        out = np.zeros((len(assignments), 3), dtype=np.int64)
+        visits, route_vehicles, route_assignments, route_starts = self._flatten(assignments)
+        if len(visits) == 0:
+            return out
+        element_count = len(visits)
+        route_count = len(route_starts)
+        is_first = np.zeros(element_count, dtype=bool)
+        is_first[route_starts] = True
+        route_of_element = np.cumsum(is_first) - 1
+        route_ends = np.concatenate((route_starts[1:], [element_count])) - 1
+        vehicles = route_vehicles[route_of_element]
+        locations = self._visit_locations[visits]
+
+        # Driving legs into every visit, from the vehicle's home for the first visit of a route
+        previous_locations = np.where(is_first, self._home_locations[vehicles], np.roll(locations, 1))
+        legs = self._driving_times(previous_locations, locations)
+        legs_home = self._driving_times(locations[route_ends], self._home_locations[route_vehicles])
+
+        # Arrival without waiting: departure plus all legs and earlier services on the route
+        services = self._services[visits]
+        steps = legs * MICROSECONDS_PER_SECOND + np.where(is_first, 0, np.roll(services, 1))
+        running_total = np.cumsum(steps)
+        route_offsets = (running_total - steps)[route_starts]
+        arrivals_without_waiting = self._departures[vehicles] + running_total - route_offsets[route_of_element]
+
+        # Waiting for min start times delays everything after it on the route:
+        # the delay is the largest (min start - arrival without waiting) so far, if positive.
+        # Routes are kept apart in the running maximum by adding a growing offset per route.
+        early_by = self._min_starts[visits] - arrivals_without_waiting
+        route_spacing = int(early_by.max() - early_by.min()) + 1
+        spaced = early_by - early_by.min() + route_of_element * route_spacing
+        delays = np.maximum(np.maximum.accumulate(spaced) - route_of_element * route_spacing + early_by.min(), 0)
+        departures = arrivals_without_waiting + delays + services
+
+        late_by = departures - self._max_ends[visits]
+        # Minutes, rounded up, as in Visit.service_finished_delay_in_minutes
+        late_minutes = np.where(late_by > 0, -(late_by // -MICROSECONDS_PER_MINUTE), 0)
+        route_demands = np.bincount(route_of_element, weights=self._demands[visits],
+                                    minlength=route_count).astype(np.int64)
+        excess_demands = np.maximum(route_demands - self._capacities[route_vehicles], 0)
+
+        assignment_of_element = route_assignments[route_of_element]
+        out[:, 0] = np.bincount(route_assignments, weights=excess_demands, minlength=len(assignments))
+        out[:, 1] = np.bincount(assignment_of_element, weights=late_minutes, minlength=len(assignments))
+        out[:, 2] = (np.bincount(assignment_of_element, weights=legs, minlength=len(assignments)) +
+                     np.bincount(route_assignments, weights=legs_home, minlength=len(assignments)))
+        return out
+
+    def score_all(self, assignments: Sequence[dict[str, list[str]]]) -> list[dict[str, HardSoftScore]]:
+        """
+        Returns the score of every assignment under the key 'score',
+        next to the score of every constraint under its name.
+        """
+        out = []
+        for capacity, lateness, driving_time in self.penalties(assignments).tolist():
+            out.append({
+                'score': HardSoftScore.of(-capacity - lateness, -driving_time),
+                VEHICLE_CAPACITY: HardSoftScore.of(-capacity, 0),
+                SERVICE_FINISHED_AFTER_MAX_END_TIME: HardSoftScore.of(-lateness, 0),
+                MINIMIZE_TRAVEL_TIME: HardSoftScore.of(0, -driving_time),
+            })
+        return out
@@ -0,0 +1,131 @@
+"""
+Reads the capacitated vehicle routing instances with time windows of Solomon (100 customers)
+and of Gehring and Homberger (200 to 1000 customers), which share one text format:
+
+    C101
+
+    VEHICLE
+    NUMBER     CAPACITY
+      25         200
+
+    CUSTOMER
+    CUST NO.  XCOORD.   YCOORD.    DEMAND   READY TIME  DUE DATE   SERVICE   TIME
+        0      40         50          0          0       1236          0
+        1      45         68         10        912        967         90
+
+Customer 0 is the depot. Driving from one customer to another takes as many time units as the
+Euclidean distance between them, and a time unit becomes SECONDS_PER_UNIT seconds.
+"""
+from os import PathLike
+from pathlib import Path
+from typing import Sequence
+from dataclasses import dataclass
+from datetime import date, time
+import csv
+import numpy as np
+
+from .domain import *
+from .driving_time import DrivingTimeProvider, LocationLike
+
+
+SECONDS_PER_UNIT = 60
+
+
+class InstanceDrivingTimeProvider(DrivingTimeProvider):
+    """Euclidean distance between the coordinates of an instance, at SECONDS_PER_UNIT seconds per unit."""
+    def driving_time_matrix(self, locations: Sequence[LocationLike]) -> np.ndarray:
+        coordinates = np.array([(location.latitude, location.longitude) for location in locations],
+                               dtype=np.float64).reshape(-1, 2)
+        deltas = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        return np.rint(np.sqrt(np.sum(deltas ** 2, axis=-1)) * SECONDS_PER_UNIT).astype(np.int32)
+
+
+@dataclass
+class BestKnownSolution:
+    vehicle_count: int
+    distance: float
+
+
+def _numeric_rows(lines: list[str]) -> list[list[float]]:
+    rows = []
+    for line in lines:
+        fields = line.split()
+        try:
+            rows.append([float(field) for field in fields])
+        except ValueError:
+            continue
+    return [row for row in rows if row]
+
+
+def load_instance(path: str | PathLike, start: Optional[datetime] = None) -> VehicleRoutePlan:
+    """
+    Reads the instance in the file at path into a route plan named after the instance,
+    with every vehicle at the depot and time 0 at start, or at midnight today if start is None.
+    A customer must start its service by its due date, so that becomes a max end time
+    of the due date plus its service time. The due date of the depot is not enforced,
+    as vehicles have no latest arrival time.
+    Raises ValueError if the file is not in the format above.
+    """
+    path = Path(path)
+    lines = path.read_text().splitlines()
+    headers = [line.strip().upper() for line in lines]
+    try:
+        name = next(line.strip() for line in lines if line.strip())
+        vehicle_section, customer_section = headers.index('VEHICLE'), headers.index('CUSTOMER')
+    except (StopIteration, ValueError):
+        raise ValueError(f'The file ({path}) has no VEHICLE and CUSTOMER sections.') from None
+    vehicle_rows = _numeric_rows(lines[vehicle_section + 1:customer_section])
+    customer_rows = _numeric_rows(lines[customer_section + 1:])
+    if len(vehicle_rows) != 1 or len(vehicle_rows[0]) != 2:
+        raise ValueError(f'The VEHICLE section of ({path}) must have one row with the number and capacity.')
+    if not customer_rows or any(len(row) != 7 for row in customer_rows):
+        raise ValueError(f'The CUSTOMER section of ({path}) must have rows of 7 numbers, the depot first.')
+
+    start = start if start is not None else datetime.combine(date.today(), time.min)
+
+    def at(units: float) -> datetime:
+        return start + timedelta(seconds=round(units * SECONDS_PER_UNIT))
+
+    vehicle_count, capacity = (int(value) for value in vehicle_rows[0])
+    (_, depot_x, depot_y, _, depot_ready, _, _), *customers = customer_rows
+    depot = Location.model_construct(latitude=depot_x, longitude=depot_y)
+    vehicles = [Vehicle.model_construct(id=str(i),
+                                        capacity=capacity,
+                                        home_location=depot,
+                                        departure_time=at(depot_ready))
+                for i in range(vehicle_count)]
+    visits = [Visit.model_construct(id=str(int(number)),
+                                    name=f'Customer {int(number)}',
+                                    location=Location.model_construct(latitude=x, longitude=y),
+                                    demand=int(demand),
+                                    min_start_time=at(ready),
+                                    max_end_time=at(due + service),
+                                    service_duration=timedelta(seconds=round(service * SECONDS_PER_UNIT)))
+              for number, x, y, demand, ready, due, service in customers]
+
+    coordinates = np.array([(row[1], row[2]) for row in customer_rows])
+    route_plan = VehicleRoutePlan.model_construct(
+        name=name,
+        south_west_corner=Location.model_construct(latitude=float(coordinates[:, 0].min()),
+                                                   longitude=float(coordinates[:, 1].min())),
+        north_east_corner=Location.model_construct(latitude=float(coordinates[:, 0].max()),
+                                                   longitude=float(coordinates[:, 1].max())),
+        vehicles=vehicles,
+        visits=visits)
+    route_plan.use_driving_time_provider(InstanceDrivingTimeProvider())
+    return route_plan
+
+
+def read_best_known(path: str | PathLike) -> dict[str, BestKnownSolution]:
+    """
+    Reads the best-known solutions from a CSV file with the columns instance, vehicles and distance,
+    such as "C101,10,828.94", keyed by instance name in upper case.
+    """
+    with open(path, newline='') as file:
+        return {row['instance'].strip().upper(): BestKnownSolution(int(row['vehicles']), float(row['distance']))
+                for row in csv.DictReader(file)}
+
+
+def route_plan_distance(route_plan: VehicleRoutePlan) -> float:
+    """The total distance driven in the units of the instance, as the best-known solutions report it."""
+    return sum(vehicle.calculate_total_driving_time_seconds() for vehicle in route_plan.vehicles) / SECONDS_PER_UNIT
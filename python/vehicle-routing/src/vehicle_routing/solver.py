@@ -1,9 +1,78 @@
-from timefold.solver import SolverManager, SolutionManager
-from timefold.solver.config import (SolverConfig, ScoreDirectorFactoryConfig,
-                                    TerminationConfig, Duration)
+from timefold.solver import SolverManager, SolverFactory, SolutionManager
+from timefold.solver.config import SolverConfig, ScoreDirectorFactoryConfig, TerminationConfig, Duration
+from timefold.solver._timefold_java_interop import ensure_init, get_class, register_java_class
+from dataclasses import replace
+from typing import Callable
 
 from .domain import *
-from .constraints import define_constraints
+from .core import CoreRoutePlan, CoreVehicle, CoreVisit
+from .constraints import define_constraints, define_core_constraints
+from .nearby import GridIndex
+from .arcs import ArcCompatibility
+
+
+# How many of its nearest visits a visit can be placed after in list change moves, or swapped with
+NEARBY_VISIT_COUNT = 40
+
+
+def init_nearby_visits(route_plan: VehicleRoutePlan, nearby_visit_count: Optional[int] = None) -> float:
+    """
+    Restricts the list change and swap moves of nearby_solver_config for every visit
+    to its nearby_visit_count (by default NEARBY_VISIT_COUNT) nearest visits,
+    found with a grid index over the visit coordinates, and of those to the ones it can directly follow
+    without being late; see vehicle_routing.arcs.ArcCompatibility.
+    Returns the share of the nearest visits that were left out for being late.
+    """
+    if nearby_visit_count is None:
+        nearby_visit_count = NEARBY_VISIT_COUNT
+    index = GridIndex(np.array([(visit.location.latitude, visit.location.longitude)
+                                for visit in route_plan.visits]))
+    nearest = index.k_nearest(nearby_visit_count)
+    # A moved visit is placed right after the nearby visit, so that one is the origin of the arc
+    compatible = ArcCompatibility(route_plan).between(
+        nearest.ravel(), np.repeat(np.arange(len(route_plan.visits)), nearest.shape[1])).reshape(nearest.shape)
+    for visit, nearest_visits, nearest_compatible in zip(route_plan.visits, nearest, compatible):
+        visit.nearby_visit_ids = {route_plan.visits[i].id for i in nearest_visits[nearest_compatible]}
+    return 1 - float(compatible.mean()) if compatible.size else 0.0
+
+
+def accept_nearby_list_change(score_director, move) -> bool:
+    """Whether a list change move places the moved visit first or right after one of its nearby visits."""
+    if not hasattr(move, 'getMovedValue'):
+        return True
+    visit = move.getMovedValue()
+    if visit.nearby_visit_ids is None:
+        return True
+    vehicle = move.getDestinationEntity()
+    # The destination index counts the visits after the moved one has been taken out
+    index = move.getDestinationIndex()
+    if vehicle is move.getSourceEntity() and move.getSourceIndex() < index:
+        index += 1
+    # Past the end of the route, the solver skips the move as not doable
+    if index == 0 or index > len(vehicle.visits):
+        return True
+    return vehicle.visits[index - 1].id in visit.nearby_visit_ids
+
+
+def accept_nearby_list_swap(score_director, move) -> bool:
+    """Whether a list swap move swaps a visit with one of its nearby visits."""
+    if not hasattr(move, 'getLeftValue'):
+        return True
+    visit = move.getLeftValue()
+    return visit.nearby_visit_ids is None or move.getRightValue().id in visit.nearby_visit_ids
+
+
+def selection_filter_class_name(accept: Callable[[Any, Any], bool]) -> str:
+    """
+    Compiles accept into a Java SelectionFilter class and returns its name,
+    for the filterClass of a move selector in an XML solver config.
+    """
+    ensure_init()
+    from _jpyinterpreter import translate_python_bytecode_to_java_bytecode, generate_proxy_class_for_translated_function
+    from ai.timefold.solver.core.impl.heuristic.selector.common.decorator import SelectionFilter
+    java_class = generate_proxy_class_for_translated_function(
+        SelectionFilter, translate_python_bytecode_to_java_bytecode(accept, SelectionFilter))
+    return get_class(register_java_class(accept, java_class)).getName()
 
 
 solver_config = SolverConfig(
@@ -16,6 +85,36 @@ solver_config = SolverConfig(
         spent_limit=Duration(seconds=30)
     )
 )
+# Creating the factory compiles the domain classes, which the move filters refer to
+solver_factory = SolverFactory.create(solver_config)
 
-solver_manager = SolverManager.create(solver_config)
+# The default local search moves of solver_config, with the list change and swap moves filtered
+# by init_nearby_visits. The k-opt moves are left as they are.
+nearby_solver_config = replace(solver_config, xml_source_text=f'''<?xml version="1.0" encoding="UTF-8"?>
+<solver xmlns="https://timefold.ai/xsd/solver">
+  <constructionHeuristic/>
+  <localSearch>
+    <unionMoveSelector>
+      <listChangeMoveSelector>
+        <filterClass>{selection_filter_class_name(accept_nearby_list_change)}</filterClass>
+      </listChangeMoveSelector>
+      <listSwapMoveSelector>
+        <filterClass>{selection_filter_class_name(accept_nearby_list_swap)}</filterClass>
+      </listSwapMoveSelector>
+      <kOptListMoveSelector/>
+    </unionMoveSelector>
+  </localSearch>
+</solver>''')
+solver_manager = SolverManager.create(nearby_solver_config)
 solution_manager = SolutionManager.create(solver_manager)
+
+# Solves route plans converted to the compact core domain; see vehicle_routing.core
+core_solver_config = SolverConfig(
+    solution_class=CoreRoutePlan,
+    entity_class_list=[CoreVehicle, CoreVisit],
+    score_director_factory_config=ScoreDirectorFactoryConfig(
+        constraint_provider_function=define_core_constraints
+    ),
+    termination_config=solver_config.termination_config
+)
+core_solver_manager = SolverManager.create(SolverFactory.create(core_solver_config))
@@ -0,0 +1,90 @@
+from typing import Annotated, Optional
+from pydantic import Field
+import threading
+
+from .domain import *
+
+
+class RoutePlanDiff(JsonDomainBase):
+    version: int
+    score: Annotated[Optional[HardSoftScore], ScoreSerializer, Field(default=None)]
+    solver_status: Annotated[Optional[SolverStatus], Field(default=None)]
+    # The vehicles whose visits or arrival times changed, and every visit that changed
+    vehicles: list[Vehicle]
+    visits: list[Visit]
+    # Visits that were taken out of the route plan, such as cancelled ones
+    removed_visit_ids: list[str]
+
+
+def _visit_fingerprint(visit: Visit) -> tuple:
+    # Everything else in the JSON of a visit is fixed or follows from these
+    return (visit.vehicle.id if visit.vehicle is not None else None,
+            visit.previous_visit.id if visit.previous_visit is not None else None,
+            visit.next_visit.id if visit.next_visit is not None else None,
+            visit.arrival_time, visit.cumulative_demand, visit.cumulative_driving_time_seconds)
+
+
+class RoutePlanVersions:
+    """
+    Numbers the route plans of a job, such as its best solutions, and remembers in which version
+    every vehicle and visit last changed, so clients that have one version can be sent only what changed since.
+    A route plan that is modified after it is passed to update, unlike a best solution,
+    must be passed to update again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._route_plan: Optional[VehicleRoutePlan] = None
+        self._vehicle_fingerprints: dict[str, tuple[str, ...]] = {}
+        self._vehicle_versions: dict[str, int] = {}
+        self._visit_fingerprints: dict[str, tuple] = {}
+        self._visit_versions: dict[str, int] = {}
+        self._removed_visit_versions: dict[str, int] = {}
+
+    def update(self, route_plan: VehicleRoutePlan) -> int:
+        """Makes route_plan the latest version and returns its number."""
+        visit_fingerprints = {visit.id: _visit_fingerprint(visit) for visit in route_plan.visits}
+        with self._lock:
+            version = self._version + 1
+            changed_visits = set()
+            for visit_id, fingerprint in visit_fingerprints.items():
+                if self._visit_fingerprints.get(visit_id) != fingerprint:
+                    changed_visits.add(visit_id)
+                    self._visit_versions[visit_id] = version
+                    self._removed_visit_versions.pop(visit_id, None)
+            for visit_id in self._visit_fingerprints.keys() - visit_fingerprints.keys():
+                del self._visit_versions[visit_id]
+                self._removed_visit_versions[visit_id] = version
+            for vehicle in route_plan.vehicles:
+                fingerprint = tuple(visit.id for visit in vehicle.visits)
+                if (self._vehicle_fingerprints.get(vehicle.id) != fingerprint or
+                        not changed_visits.isdisjoint(fingerprint)):
+                    self._vehicle_fingerprints[vehicle.id] = fingerprint
+                    self._vehicle_versions[vehicle.id] = version
+            self._visit_fingerprints = visit_fingerprints
+            self._route_plan = route_plan
+            self._version = version
+        return version
+
+    def latest(self) -> tuple[int, VehicleRoutePlan]:
+        with self._lock:
+            return self._version, self._route_plan
+
+    def diff(self, since: int, solver_status: Optional[SolverStatus] = None) -> RoutePlanDiff:
+        """
+        What changed after version since up to the latest version.
+        Raises ValueError if since is newer than the latest version.
+        """
+        with self._lock:
+            if not 0 <= since <= self._version:
+                raise ValueError(f'The version ({since}) must be between 0 and the latest version ({self._version}).')
+            route_plan = self._route_plan
+            return RoutePlanDiff(
+                version=self._version,
+                score=route_plan.score,
+                solver_status=solver_status,
+                vehicles=[vehicle for vehicle in route_plan.vehicles if self._vehicle_versions[vehicle.id] > since],
+                visits=[visit for visit in route_plan.visits if self._visit_versions[visit.id] > since],
+                removed_visit_ids=[visit_id for visit_id, version in self._removed_visit_versions.items()
+                                   if version > since]
+            )
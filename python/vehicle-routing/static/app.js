@@ -4,6 +4,8 @@ let optimizing = false;
 let demoDataId = null;
 let scheduleId = null;
 let loadedRoutePlan = null;
+// The route plan ID loadedRoutePlan was fetched with, so later refreshes only fetch what changed since
+let loadedScheduleId = null;
 let newVisit = null;
 let visitMarker = null;
 const solveButton = $('#solveButton');
@@ -400,8 +402,18 @@ function refreshRoutePlan() {
         path = "/demo-data/" + demoDataId;
     }
 
+    const fetchedScheduleId = scheduleId;
+    const since = scheduleId !== null && scheduleId === loadedScheduleId ? loadedRoutePlan.version : null;
+    if (since != null) {
+        path += "?since=" + since;
+    }
+
     $.getJSON(path, function (routePlan) {
+        if (since != null) {
+            routePlan = mergeRoutePlanDiff(loadedRoutePlan, routePlan);
+        }
         loadedRoutePlan = routePlan;
+        loadedScheduleId = fetchedScheduleId;
         refreshSolvingButtons(routePlan.solverStatus != null && routePlan.solverStatus !== "NOT_SOLVING");
         renderRoutes(routePlan);
         renderTimelines(routePlan);
@@ -412,6 +424,26 @@ function refreshRoutePlan() {
     });
 }
 
+function mergeRoutePlanDiff(routePlan, diff) {
+    const removedVisitIds = new Set(diff.removedVisitIds);
+    const changedVisitByIdMap = new Map(diff.visits.map(visit => [visit.id, visit]));
+    const knownVisitIds = new Set(routePlan.visits.map(visit => visit.id));
+    const changedVehicleByIdMap = new Map(diff.vehicles.map(vehicle => [vehicle.id, vehicle]));
+    const vehicles = routePlan.vehicles.map(vehicle => changedVehicleByIdMap.get(vehicle.id) || vehicle);
+    return {
+        ...routePlan,
+        version: diff.version,
+        score: diff.score,
+        solverStatus: diff.solverStatus,
+        vehicles: vehicles,
+        visits: routePlan.visits
+            .filter(visit => !removedVisitIds.has(visit.id))
+            .map(visit => changedVisitByIdMap.get(visit.id) || visit)
+            .concat(diff.visits.filter(visit => !knownVisitIds.has(visit.id))),
+        totalDrivingTimeSeconds: vehicles.reduce((total, vehicle) => total + vehicle.totalDrivingTimeSeconds, 0)
+    };
+}
+
 function stopSolving() {
     $.delete("/route-plans/" + scheduleId, function () {
         refreshSolvingButtons(false);
@@ -0,0 +1,66 @@
+from vehicle_routing.domain import *
+from vehicle_routing.aggregation import VisitAggregation
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.scorer import VectorizedScorer
+
+from test_scorer import random_routes
+from random import Random
+
+
+def dense_plan(random: Random) -> VehicleRoutePlan:
+    """The PHILADELPHIA demo data with every visit moved to the location of one of 10 visits."""
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    blocks = route_plan.visits[:10]
+    for visit in route_plan.visits[10:]:
+        visit.location = random.choice(blocks).location
+    return route_plan
+
+
+def test_merges_co_located_visits_with_compatible_windows():
+    route_plan = dense_plan(Random(0))
+    aggregation = VisitAggregation(route_plan)
+
+    assert aggregation.stop_count < len(route_plan.visits)
+    assert sorted(visit.id for members in aggregation.visits_of_stop.values() for visit in members) == \
+        sorted(visit.id for visit in route_plan.visits)
+    max_capacity = max(vehicle.capacity for vehicle in route_plan.vehicles)
+    for stop in aggregation.route_plan.visits:
+        members = aggregation.visits_of_stop[stop.id]
+        assert len({(visit.location.latitude, visit.location.longitude) for visit in members}) == 1
+        assert stop.demand == sum(visit.demand for visit in members) <= max_capacity
+        assert stop.service_duration == sum((visit.service_duration for visit in members), timedelta())
+        assert stop.min_start_time + stop.service_duration <= stop.max_end_time
+
+
+def test_keeps_assigned_visits_apart():
+    route_plan = dense_plan(Random(1))
+    route_plan.assign_routes({'0': [route_plan.visits[10].id, route_plan.visits[11].id]})
+    aggregation = VisitAggregation(route_plan)
+
+    assert [visit.id for visit in aggregation.route_plan.vehicles[0].visits] == \
+        [route_plan.visits[10].id, route_plan.visits[11].id]
+    assert aggregation.visits_of_stop[route_plan.visits[10].id] == [route_plan.visits[10]]
+
+
+def test_expand():
+    random = Random(2)
+    route_plan = dense_plan(random)
+    aggregation = VisitAggregation(route_plan)
+    solution = aggregation.route_plan
+    solution.assign_routes(random_routes(solution, random))
+    solution.score = HardSoftScore.ZERO
+
+    expanded = aggregation.expand(solution)
+
+    assert expanded is not route_plan and all(vehicle.visits == [] for vehicle in route_plan.vehicles)
+    for vehicle, stops in zip(expanded.vehicles, solution.vehicles):
+        assert [visit.id for visit in vehicle.visits] == \
+            [visit.id for stop in stops.visits for visit in aggregation.visits_of_stop[stop.id]]
+        # A stop that is on time has every one of its visits on time
+        for stop in stops.visits:
+            if not stop.is_service_finished_after_max_end_time():
+                assert not any(visit.is_service_finished_after_max_end_time() for visit in vehicle.visits
+                               if visit.id in {member.id for member in aggregation.visits_of_stop[stop.id]})
+    routes = {vehicle.id: [visit.id for visit in vehicle.visits] for vehicle in expanded.vehicles}
+    assert expanded.score == VectorizedScorer(route_plan).score_all([routes])[0]['score']
+    assert expanded.total_driving_time_seconds == solution.total_driving_time_seconds
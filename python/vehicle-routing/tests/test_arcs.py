@@ -0,0 +1,49 @@
+from vehicle_routing.domain import *
+from vehicle_routing.arcs import ArcCompatibility
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.solver import init_nearby_visits
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('dataset', list(DemoData))
+def test_incompatible_arcs_are_always_late(dataset):
+    route_plan = generate_demo_data(dataset)
+    table = ArcCompatibility(route_plan).table(block_size=7)
+    random = np.random.default_rng(0)
+
+    origins, destinations = np.nonzero(~table)
+    assert len(origins) > 0
+    for index in random.choice(len(origins), size=min(50, len(origins)), replace=False).tolist():
+        origin, destination = route_plan.visits[origins[index]], route_plan.visits[destinations[index]]
+        # Even the vehicle that gets to the origin first is late at the destination
+        for vehicle in route_plan.vehicles:
+            route_plan.assign_routes({vehicle.id: [origin.id, destination.id]})
+            assert destination.is_service_finished_after_max_end_time()
+
+
+def test_table_matches_between_and_pruned_share():
+    route_plan = generate_demo_data(DemoData.FIRENZE)
+    arcs = ArcCompatibility(route_plan)
+    table = arcs.table()
+    origins, destinations = np.indices(table.shape).reshape(2, -1)
+
+    assert (arcs.between(origins, destinations) == table.ravel()).all()
+    off_diagonal = ~np.eye(len(table), dtype=bool)
+    assert arcs.pruned_share(block_size=10) == pytest.approx(1 - table[off_diagonal].mean())
+    assert 0 < arcs.pruned_share() < 1
+
+
+def test_nearby_visits_can_precede():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    table = ArcCompatibility(route_plan).table()
+    index_by_id = {visit.id: index for index, visit in enumerate(route_plan.visits)}
+
+    pruned_share = init_nearby_visits(route_plan, nearby_visit_count=20)
+
+    assert 0 < pruned_share < 1
+    for index, visit in enumerate(route_plan.visits):
+        assert all(table[index_by_id[nearby_id], index] for nearby_id in visit.nearby_visit_ids)
+    assert sum(map(len, (visit.nearby_visit_ids for visit in route_plan.visits))) == \
+        round(len(route_plan.visits) * 20 * (1 - pruned_share))
@@ -0,0 +1,68 @@
+from timefold.solver import SolverFactory
+from timefold.solver.config import TerminationConfig, Duration
+from timefold.solver.test import ConstraintVerifier
+from dataclasses import replace
+
+from vehicle_routing.domain import *
+from vehicle_routing.core import CoreRoutePlan, CoreVehicle, CoreVisit
+from vehicle_routing.constraints import define_core_constraints
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.solver import core_solver_config
+from vehicle_routing.scorer import VectorizedScorer
+from vehicle_routing.rest_api import to_core_route_plan, from_core_route_plan
+
+from test_scorer import random_routes
+from random import Random
+import pytest
+
+core_constraint_verifier = ConstraintVerifier.build(define_core_constraints, CoreRoutePlan, CoreVehicle, CoreVisit)
+
+
+@pytest.mark.parametrize('dataset', list(DemoData))
+def test_core_constraints_match_constraints_on_random_plans(dataset):
+    random = Random(dataset.value.seed)
+    route_plan = generate_demo_data(dataset)
+    # Depart at odd times, so lateness is not a whole number of minutes
+    for vehicle in route_plan.vehicles:
+        vehicle.departure_time += timedelta(seconds=random.randint(0, 3_600))
+
+    scorer = VectorizedScorer(route_plan)
+
+    for _ in range(10):
+        assignment = random_routes(route_plan, random)
+        route_plan.assign_routes(assignment)
+        core_constraint_verifier.verify_that().given_solution(to_core_route_plan(route_plan)).scores(
+            scorer.score_all([assignment])[0]['score'])
+
+
+def test_round_trip():
+    route_plan = generate_demo_data(DemoData.FIRENZE)
+    route_plan.assign_routes(random_routes(route_plan, Random(1)))
+    core_route_plan = to_core_route_plan(route_plan)
+
+    # One location per row of the driving time matrix, shared by the vehicles and visits there
+    locations = ([visit.location for visit in core_route_plan.visits] +
+                 [vehicle.home_location for vehicle in core_route_plan.vehicles])
+    assert len({id(location) for location in locations}) == len({location.index for location in locations})
+    assert core_route_plan.visits[0].location.index == route_plan.visits[0].location.index
+
+    core_route_plan.score = HardSoftScore.of(-1, -2)
+    result = from_core_route_plan(route_plan, core_route_plan)
+
+    assert result is not route_plan and result.visits[0] is not route_plan.visits[0]
+    assert result.score == HardSoftScore.of(-1, -2) and route_plan.score is None
+    assert result.model_dump(exclude={'score'}) == route_plan.model_dump(exclude={'score'})
+
+
+def test_solve_core_route_plan():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    solver = SolverFactory.create(replace(core_solver_config,
+                                          termination_config=TerminationConfig(
+                                              spent_limit=Duration(seconds=2)))).build_solver()
+
+    solution = from_core_route_plan(route_plan, solver.solve(to_core_route_plan(route_plan)))
+
+    assert solution.score is not None
+    assert sum(len(vehicle.visits) for vehicle in solution.vehicles) == len(solution.visits)
+    assert all(vehicle.visits == [] for vehicle in route_plan.vehicles)
+    assert solution.total_driving_time_seconds == -solution.score.soft_score
@@ -0,0 +1,68 @@
+from vehicle_routing.demo_data import *
+from vehicle_routing.solver import solver_config
+from vehicle_routing.rest_api import app
+
+from timefold.solver import SolverFactory
+from timefold.solver.config import TerminationConfig, Duration
+from fastapi.testclient import TestClient
+from dataclasses import replace
+import pytest
+
+client = TestClient(app)
+
+
+def plan_values(route_plan: VehicleRoutePlan):
+    return ([(vehicle.id, vehicle.capacity, vehicle.home_location.latitude, vehicle.home_location.longitude,
+              vehicle.departure_time) for vehicle in route_plan.vehicles],
+            [(visit.id, visit.name, visit.location.latitude, visit.location.longitude, visit.demand,
+              visit.min_start_time, visit.max_end_time, visit.service_duration) for visit in route_plan.visits])
+
+
+def test_large_demo_data_is_deterministic():
+    properties = replace(LargeDemoData.VISITS_1K.value, visit_count=200, vehicle_count=20)
+    first = generate_large_demo_data(properties)
+    assert plan_values(first) == plan_values(generate_large_demo_data(properties))
+    assert plan_values(first) != plan_values(generate_large_demo_data(replace(properties, seed=properties.seed + 1)))
+
+
+@pytest.mark.parametrize('demo_data', list(LargeDemoData))
+def test_large_demo_data_values(demo_data: LargeDemoData):
+    properties = demo_data.value
+    route_plan = generate_large_demo_data(demo_data, driving_time_matrix=False)
+    assert len(route_plan.vehicles) == properties.vehicle_count
+    assert len(route_plan.visits) == properties.visit_count
+    assert len({visit.id for visit in route_plan.visits}) == properties.visit_count
+
+    south_west, north_east = properties.south_west_corner, properties.north_east_corner
+    for vehicle in route_plan.vehicles:
+        assert properties.min_vehicle_capacity <= vehicle.capacity <= properties.max_vehicle_capacity
+        assert vehicle.departure_time.time() == properties.vehicle_start_time
+    for visit in route_plan.visits:
+        assert south_west.latitude <= visit.location.latitude <= north_east.latitude
+        assert south_west.longitude <= visit.location.longitude <= north_east.longitude
+        assert properties.min_demand <= visit.demand <= properties.max_demand
+        assert (visit.min_start_time.time(), visit.max_end_time.time()) in {
+            (MORNING_WINDOW_START, MORNING_WINDOW_END),
+            (AFTERNOON_WINDOW_START, AFTERNOON_WINDOW_END),
+        }
+        assert visit.service_duration in {timedelta(minutes=minutes) for minutes in SERVICE_DURATION_MINUTES}
+
+
+def test_large_demo_data_solves():
+    route_plan = generate_large_demo_data(replace(LargeDemoData.VISITS_1K.value, visit_count=30, vehicle_count=5),
+                                          day=date(2024, 1, 2))
+    solver = SolverFactory.create(replace(solver_config,
+                                          termination_config=TerminationConfig(spent_limit=Duration(seconds=10)))
+                                  ).build_solver()
+    solution = solver.solve(route_plan)
+    assert sum(len(vehicle.visits) for vehicle in solution.vehicles) == len(route_plan.visits)
+    assert solution.score.is_feasible
+
+
+def test_large_demo_data_endpoint():
+    response = client.get("/demo-data/VISITS_1K?date=2024-01-02")
+    assert response.status_code == 200
+    route_plan_json = response.json()
+    assert len(route_plan_json['visits']) == LargeDemoData.VISITS_1K.value.visit_count
+    assert route_plan_json['vehicles'][0]['departureTime'].startswith('2024-01-02T')
+    assert client.get("/demo-data/UNKNOWN").status_code == 404
@@ -0,0 +1,144 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.driving_time import MatrixFileDrivingTimeProvider
+
+from pytest import raises
+import numpy as np
+
+
+def euclidean_driving_time(from_location: Location, to_location: Location) -> int:
+    return Location(latitude=from_location.latitude,
+                    longitude=from_location.longitude).driving_time_to(
+        Location(latitude=to_location.latitude, longitude=to_location.longitude))
+
+
+def test_driving_time_matrix_matches_formula():
+    route_plan = generate_demo_data(DemoData.FIRENZE)
+    locations = ([vehicle.home_location for vehicle in route_plan.vehicles] +
+                 [visit.location for visit in route_plan.visits])
+
+    for from_location in locations:
+        assert from_location.index is not None
+        for to_location in locations:
+            assert (from_location.driving_time_to(to_location) ==
+                    euclidean_driving_time(from_location, to_location))
+
+
+def test_co_located_locations_share_an_index():
+    vehicle = Vehicle(id="1", capacity=10, home_location=Location(latitude=0, longitude=0),
+                      departure_time=datetime(2020, 1, 1))
+    visits = [Visit(id=str(i), name=str(i), location=Location(latitude=3, longitude=4), demand=1,
+                    min_start_time=datetime(2020, 1, 1), max_end_time=datetime(2020, 1, 2),
+                    service_duration=timedelta(minutes=10))
+              for i in range(2)]
+    VehicleRoutePlan(name="test",
+                     south_west_corner=Location(latitude=0, longitude=0),
+                     north_east_corner=Location(latitude=3, longitude=4),
+                     vehicles=[vehicle],
+                     visits=visits)
+
+    assert vehicle.home_location.index == 0
+    assert visits[0].location.index == visits[1].location.index == 1
+    assert vehicle.home_location.driving_time_matrix is visits[0].location.driving_time_matrix
+    assert vehicle.home_location.driving_time_matrix.size == 2
+    assert vehicle.home_location.driving_time_to(visits[0].location) == 20_000
+    assert visits[0].location.driving_time_to(visits[1].location) == 0
+
+
+def test_cumulative_demand_and_driving_time():
+    vehicle = Vehicle(id="1", capacity=100, home_location=Location(latitude=0, longitude=0),
+                      departure_time=datetime(2020, 1, 1))
+    visit1 = Visit(id="2", name="John", location=Location(latitude=3, longitude=4), demand=80,
+                   min_start_time=datetime(2020, 1, 1), max_end_time=datetime(2020, 1, 2),
+                   service_duration=timedelta(hours=1))
+    visit2 = Visit(id="3", name="Paul", location=Location(latitude=-1, longitude=1), demand=40,
+                   min_start_time=datetime(2020, 1, 1), max_end_time=datetime(2020, 1, 2),
+                   service_duration=timedelta(hours=1))
+    vehicle.visits = [visit1, visit2]
+    visit1.vehicle = vehicle
+    visit2.vehicle = vehicle
+    visit2.previous_visit = visit1
+    visit1.update_arrival_time()
+    visit2.update_arrival_time()
+
+    assert visit1.cumulative_demand == 80
+    assert visit2.cumulative_demand == 120
+    assert visit1.cumulative_driving_time_seconds == 20_000
+    assert visit2.cumulative_driving_time_seconds == 20_000 + 20_000
+    assert vehicle.calculate_total_demand() == 120
+    assert vehicle.calculate_total_driving_time_seconds() == 20_000 + 20_000 + 5_657
+
+
+def test_matrix_file_driving_time_provider(tmp_path):
+    matrix = np.array([[0, 10, 20],
+                       [11, 0, 30],
+                       [21, 31, 0]], dtype=np.int32)
+    npy_path = tmp_path / 'matrix.npy'
+    np.save(npy_path, matrix)
+    raw_path = tmp_path / 'matrix.bin'
+    matrix.astype('<i4').tofile(raw_path)
+
+    depot = Location(latitude=0, longitude=0, id='depot')
+    customer = Location(latitude=1, longitude=1, id='customer')
+    by_id = MatrixFileDrivingTimeProvider(npy_path, location_ids=['customer', 'unused', 'depot'])
+    init_driving_time_matrix([depot, customer], by_id)
+    assert depot.driving_time_to(customer) == 21
+    assert customer.driving_time_to(depot) == 20
+    # Route plans index the file's rows directly instead of copying them
+    assert (depot.index, customer.index) == (2, 0)
+    other_customer = Location(latitude=2, longitude=2, id='customer')
+    init_driving_time_matrix([other_customer], by_id)
+    assert other_customer.driving_time_matrix is depot.driving_time_matrix is by_id.shared_matrix
+
+    depot = Location(latitude=0, longitude=0)
+    customer = Location(latitude=1, longitude=1)
+    by_coordinates = MatrixFileDrivingTimeProvider(raw_path, coordinates=[(5, 5), (1, 1), (0, 0)])
+    init_driving_time_matrix([depot, customer], by_coordinates)
+    assert depot.driving_time_to(customer) == 31
+    assert customer.driving_time_to(depot) == 30
+
+
+def test_use_known_driving_times(tmp_path):
+    npy_path = tmp_path / 'matrix.npy'
+    np.save(npy_path, np.array([[0, 10, 20],
+                                [11, 0, 30],
+                                [21, 31, 0]], dtype=np.int32))
+    by_id = MatrixFileDrivingTimeProvider(npy_path, location_ids=['customer', 'unused', 'depot'])
+    route_plan = VehicleRoutePlan.model_validate({
+        'name': 'matrix file',
+        'south_west_corner': Location(latitude=0, longitude=0),
+        'north_east_corner': Location(latitude=1, longitude=1),
+        'vehicles': [Vehicle(id='1', capacity=10, home_location=Location(latitude=0, longitude=0, id='depot'),
+                             departure_time=datetime(2024, 1, 1, 8))],
+        'visits': [],
+    }, context={'driving_time_provider': by_id})
+    depot = route_plan.vehicles[0].home_location
+
+    customer = Location(latitude=1, longitude=1, id='customer')
+    route_plan.use_known_driving_times(customer, by_id)
+    assert customer.index == 0 and customer.driving_time_matrix is depot.driving_time_matrix
+    assert depot.driving_time_to(customer) == 21
+    with raises(ValueError):
+        route_plan.use_known_driving_times(Location(latitude=1, longitude=1, id='unknown'), by_id)
+
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    new_location = Location(latitude=40, longitude=-75)
+    route_plan.use_known_driving_times(new_location, EuclideanDrivingTimeProvider())
+    assert new_location.driving_time_matrix is None
+    visit_location = route_plan.visits[0].location
+    assert visit_location.driving_time_to(new_location) == euclidean_driving_time(visit_location, new_location)
+
+
+def test_assign_routes():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    vehicle = route_plan.vehicles[0]
+    first, second = route_plan.visits[:2]
+
+    route_plan.assign_routes({vehicle.id: [second.id, first.id]})
+
+    assert vehicle.visits == [second, first]
+    assert second.vehicle is vehicle and second.previous_visit is None and second.next_visit is first
+    assert first.vehicle is vehicle and first.previous_visit is second and first.next_visit is None
+    assert first.cumulative_demand == first.demand + second.demand
+    assert all(len(other.visits) == 0 for other in route_plan.vehicles[1:])
+    assert route_plan.visits[2].vehicle is None and route_plan.visits[2].arrival_time is None
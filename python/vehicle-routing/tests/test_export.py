@@ -0,0 +1,55 @@
+from vehicle_routing.demo_data import *
+from vehicle_routing.rest_api import app, update_route, data_sets
+
+from fastapi.testclient import TestClient
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def route_plan() -> VehicleRoutePlan:
+    route_plan = generate_demo_data(DemoData.HARTFORT)
+    route_plan.assign_routes({'0': ['0', '1', '2'], '1': ['3']})
+    update_route('export', route_plan)
+    yield route_plan
+    del data_sets['export']
+
+
+def assert_matches(table: 'pa.Table', route_plan: VehicleRoutePlan):
+    rows = table.to_pylist()
+    assert len(rows) == len(route_plan.visits)
+    assert [(row['visit_id'], row['vehicle_id'], row['sequence']) for row in rows[:4]] == \
+        [('0', '0', 0), ('1', '0', 1), ('2', '0', 2), ('3', '1', 0)]
+    visit_by_id = {visit.id: visit for visit in route_plan.visits}
+    for row in rows:
+        visit = visit_by_id[row['visit_id']]
+        assert row['arrival_time'] == visit.arrival_time
+        assert row['start_service_time'] == visit.start_service_time
+        assert row['departure_time'] == visit.departure_time
+        assert (row['driving_time_seconds_from_previous_standstill'] ==
+                visit.driving_time_seconds_from_previous_standstill)
+        assert row['demand'] == visit.demand
+    assert rows[4]['vehicle_id'] is None and rows[4]['sequence'] is None
+
+
+def test_export_parquet(route_plan):
+    response = client.get("/route-plans/export/export?format=parquet")
+
+    assert response.status_code == 200
+    assert_matches(pq.read_table(pa.BufferReader(response.content)), route_plan)
+
+
+def test_export_arrow(route_plan):
+    response = client.get("/route-plans/export/export?format=arrow")
+
+    assert response.status_code == 200
+    assert_matches(pa.ipc.open_stream(response.content).read_all(), route_plan)
+
+
+def test_export_unknown_format(route_plan):
+    assert client.get("/route-plans/export/export?format=csv").status_code == 422
+    assert client.get("/route-plans/unknown/export").status_code == 404
@@ -28,3 +28,50 @@ def test_feasible():
 
     client.delete(f"/route-plans/{job_id}")
     fail('solution is not feasible')
+
+
+def test_feasible_compact():
+    demo_data_response = client.get("/demo-data/PHILADELPHIA")
+    job_id_response = client.post("/route-plans?compact=true", json=demo_data_response.json())
+    assert job_id_response.status_code == 200
+    job_id = job_id_response.text[1:-1]
+    # Problem changes are only supported by the solver manager of the pydantic domain
+    assert client.delete(f"/route-plans/{job_id}/visits/0").status_code == 409
+
+    ATTEMPTS = 1_000
+    for _ in range(ATTEMPTS):
+        sleep(0.1)
+        route_plan_json = client.get(f"/route-plans/{job_id}").json()
+        timetable = json_to_vehicle_route_plan(route_plan_json)
+        if timetable.score is not None and timetable.score.is_feasible:
+            assert route_plan_json['solverStatus'] == 'SOLVING_ACTIVE'
+            assert client.delete(f"/route-plans/{job_id}").status_code == 200
+            return
+
+    client.delete(f"/route-plans/{job_id}")
+    fail('solution is not feasible')
+
+
+def test_feasible_aggregated():
+    demo_data_json = client.get("/demo-data/PHILADELPHIA").json()
+    # Put the visits into 10 buildings
+    for index, visit in enumerate(demo_data_json['visits']):
+        visit['location'] = demo_data_json['visits'][index % 10]['location']
+    job_id_response = client.post("/route-plans?aggregate=true", json=demo_data_json)
+    assert job_id_response.status_code == 200
+    job_id = job_id_response.text[1:-1]
+
+    ATTEMPTS = 1_000
+    for _ in range(ATTEMPTS):
+        sleep(0.1)
+        route_plan_json = client.get(f"/route-plans/{job_id}").json()
+        timetable = json_to_vehicle_route_plan(route_plan_json)
+        if timetable.score is not None and timetable.score.is_feasible:
+            # Every visit is served on its own again
+            assert sorted(visit.id for vehicle in timetable.vehicles for visit in vehicle.visits) == \
+                sorted(visit['id'] for visit in demo_data_json['visits'])
+            assert client.delete(f"/route-plans/{job_id}").status_code == 200
+            return
+
+    client.delete(f"/route-plans/{job_id}")
+    fail('solution is not feasible')
@@ -0,0 +1,68 @@
+from vehicle_routing.rest_api import app
+from vehicle_routing.driving_time import MatrixFileDrivingTimeProvider, register_driving_time_provider
+
+from fastapi.testclient import TestClient
+from time import sleep
+from pytest import fail
+import numpy as np
+
+client = TestClient(app)
+
+
+def wait_for(job_id: str, condition) -> dict:
+    for _ in range(300):
+        sleep(0.1)
+        route_plan_json = client.get(f"/route-plans/{job_id}").json()
+        if route_plan_json.get('score') is not None and condition(route_plan_json):
+            return route_plan_json
+    client.delete(f"/route-plans/{job_id}")
+    fail('the route plan never reached the expected state')
+
+
+def test_add_and_remove_visits_while_solving():
+    demo_data_json = client.get("/demo-data/HARTFORT").json()
+    job_id = client.post("/route-plans", json=demo_data_json).text[1:-1]
+    wait_for(job_id, lambda route_plan_json: True)
+
+    new_visit_json = dict(demo_data_json['visits'][0], id='new', name='New Visit')
+    assert client.post(f"/route-plans/{job_id}/visits", json=new_visit_json).status_code == 200
+    route_plan_json = wait_for(job_id, lambda route_plan_json: any('new' in vehicle['visits']
+                                                                   for vehicle in route_plan_json['vehicles']))
+    new_visit = next(visit for visit in route_plan_json['visits'] if visit['id'] == 'new')
+    assert new_visit['location'] == demo_data_json['visits'][0]['location']
+    assert len(route_plan_json['visits']) == len(demo_data_json['visits']) + 1
+    # The best solution has the visit now, so adding it again is a conflict
+    assert client.post(f"/route-plans/{job_id}/visits", json=new_visit_json).status_code == 409
+
+    assert client.delete(f"/route-plans/{job_id}/visits/0").status_code == 200
+    route_plan_json = wait_for(job_id, lambda route_plan_json: all(visit['id'] != '0'
+                                                                   for visit in route_plan_json['visits']))
+    assert all('0' not in vehicle['visits'] for vehicle in route_plan_json['vehicles'])
+    assert sorted(visit['id'] for visit in route_plan_json['visits']) == \
+        sorted([visit['id'] for visit in demo_data_json['visits'] if visit['id'] != '0'] + ['new'])
+
+    assert client.delete(f"/route-plans/{job_id}/visits/unknown").status_code == 404
+    client.delete(f"/route-plans/{job_id}")
+
+
+def test_add_visit_at_unknown_location(tmp_path):
+    demo_data_json = client.get("/demo-data/HARTFORT").json()
+    locations = ([vehicle['homeLocation'] for vehicle in demo_data_json['vehicles']] +
+                 [visit['location'] for visit in demo_data_json['visits']])
+    coordinates = list(dict.fromkeys((location[0], location[1]) for location in locations))
+    matrix_path = tmp_path / 'matrix.npy'
+    np.save(matrix_path, np.full((len(coordinates), len(coordinates)), 60, dtype=np.int32))
+    register_driving_time_provider('test-live-dispatch',
+                                   MatrixFileDrivingTimeProvider(matrix_path, coordinates=coordinates))
+    job_id = client.post("/route-plans?drivingTimeProvider=test-live-dispatch", json=demo_data_json).text[1:-1]
+    wait_for(job_id, lambda route_plan_json: True)
+
+    new_visit_json = dict(demo_data_json['visits'][0], id='new', name='New Visit', location=[0.0, 0.0])
+    response = client.post(f"/route-plans/{job_id}/visits", json=new_visit_json)
+    assert response.status_code == 400
+    assert 'not in the driving time matrix' in response.json()['detail']
+    client.delete(f"/route-plans/{job_id}")
+
+
+def test_unknown_route_plan():
+    assert client.delete("/route-plans/unknown/visits/0").status_code == 404
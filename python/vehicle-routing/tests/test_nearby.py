@@ -0,0 +1,61 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.nearby import GridIndex
+from vehicle_routing.solver import init_nearby_visits, accept_nearby_list_change, accept_nearby_list_swap
+
+from types import SimpleNamespace
+import numpy as np
+
+
+def brute_force_k_nearest(coordinates: np.ndarray, k: int) -> np.ndarray:
+    distances = np.linalg.norm(coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :], axis=-1)
+    np.fill_diagonal(distances, np.inf)
+    return np.argsort(distances, axis=1, kind='stable')[:, :k]
+
+
+def test_k_nearest_matches_brute_force():
+    random = np.random.default_rng(0)
+    coordinates = np.concatenate([random.uniform((43.7, 11.1), (43.8, 11.3), size=(400, 2)),
+                                  random.normal((43.75, 11.2), 0.001, size=(100, 2))])
+    index = GridIndex(coordinates)
+    expected = brute_force_k_nearest(coordinates, 10)
+    actual = index.k_nearest(10)
+
+    expected_distances = np.linalg.norm(coordinates[expected] - coordinates[:, np.newaxis, :], axis=-1)
+    actual_distances = np.linalg.norm(coordinates[actual] - coordinates[:, np.newaxis, :], axis=-1)
+    assert np.allclose(actual_distances, expected_distances)
+    assert not np.any(actual == np.arange(len(coordinates))[:, np.newaxis])
+
+
+def test_k_nearest_with_fewer_points_than_k():
+    index = GridIndex(np.array([[0.0, 0.0], [0.0, 1.0], [0.0, 3.0]]))
+    assert index.k_nearest(5).tolist() == [[1, 2], [0, 2], [1, 0]]
+
+
+def list_change_move(visit: Visit, destination: Vehicle, destination_index: int) -> SimpleNamespace:
+    # The getters of the solver's ListChangeMove that the filter reads
+    return SimpleNamespace(getMovedValue=lambda: visit,
+                           getSourceEntity=lambda: visit.vehicle,
+                           getSourceIndex=lambda: visit.vehicle.visits.index(visit),
+                           getDestinationEntity=lambda: destination,
+                           getDestinationIndex=lambda: destination_index)
+
+
+def test_nearby_move_filters():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    init_nearby_visits(route_plan, nearby_visit_count=5)
+    visit = route_plan.visits[0]
+    nearby = [other for other in route_plan.visits if other.id in visit.nearby_visit_ids]
+    far = [other for other in route_plan.visits if other is not visit and other.id not in visit.nearby_visit_ids]
+    vehicle = route_plan.vehicles[0]
+    route_plan.assign_routes({vehicle.id: [visit.id, far[0].id, nearby[0].id, far[1].id]})
+
+    assert accept_nearby_list_change(None, list_change_move(visit, vehicle, 0))
+    # Taken out of the route first, so it lands after the visit at index 2 of the current route
+    assert accept_nearby_list_change(None, list_change_move(visit, vehicle, 2))
+    assert not accept_nearby_list_change(None, list_change_move(visit, vehicle, 1))
+    assert not accept_nearby_list_change(None, list_change_move(visit, vehicle, 3))
+    assert accept_nearby_list_change(None, SimpleNamespace())
+
+    assert accept_nearby_list_swap(None, SimpleNamespace(getLeftValue=lambda: visit, getRightValue=lambda: nearby[0]))
+    assert not accept_nearby_list_swap(None, SimpleNamespace(getLeftValue=lambda: visit, getRightValue=lambda: far[0]))
@@ -0,0 +1,35 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.partition import kmeans, partition_route_plan
+
+import numpy as np
+
+
+def test_kmeans_separates_distant_groups():
+    random = np.random.default_rng(0)
+    centers = np.array([[0, 0], [10, 0], [0, 10]])
+    coordinates = np.concatenate([center + random.normal(scale=0.5, size=(50, 2)) for center in centers])
+
+    labels, centroids = kmeans(coordinates, 3)
+
+    for group in range(3):
+        assert len(set(labels[group * 50:(group + 1) * 50])) == 1
+    assert len(set(labels)) == 3
+    assert np.allclose(np.sort(centroids, axis=0), np.sort(centers, axis=0), atol=0.5)
+
+
+def test_partitions_cover_the_plan():
+    route_plan = generate_demo_data(DemoData.FIRENZE)
+    partitions = partition_route_plan(route_plan, 3)
+
+    assert sorted(visit.id for partition in partitions for visit in partition.visits) == \
+           sorted(visit.id for visit in route_plan.visits)
+    assert sorted(vehicle.id for partition in partitions for vehicle in partition.vehicles) == \
+           sorted(vehicle.id for vehicle in route_plan.vehicles)
+    visit_by_id = {visit.id: visit for visit in route_plan.visits}
+    for partition in partitions:
+        assert len(partition.vehicles) > 0
+        for origin in partition.visits:
+            for destination in partition.visits:
+                assert (origin.location.driving_time_to(destination.location) ==
+                        visit_by_id[origin.id].location.driving_time_to(visit_by_id[destination.id].location))
@@ -0,0 +1,69 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.precheck import precheck, DEMAND_EXCEEDS_CAPACITY, MAX_END_TIME_UNREACHABLE, NO_VEHICLE_MEETS_BOTH
+from vehicle_routing.rest_api import app
+
+from fastapi.testclient import TestClient
+
+# LOCATION_1 to LOCATION_2 is sqrt(3**2 + 4**2) * 4000 == 20_000 seconds of driving time
+LOCATION_1 = Location(latitude=0, longitude=0)
+LOCATION_2 = Location(latitude=3, longitude=4)
+
+DEPARTURE_TIME = datetime(2020, 1, 1)
+
+
+def visit(visit_id: str, location: Location, demand: int, max_end_time: datetime) -> Visit:
+    return Visit(id=visit_id, name=visit_id, location=location, demand=demand,
+                 min_start_time=DEPARTURE_TIME, max_end_time=max_end_time,
+                 service_duration=timedelta(hours=1))
+
+
+def test_demo_data_passes():
+    report = precheck(generate_demo_data(DemoData.PHILADELPHIA))
+
+    assert report.feasible
+    assert report.unservable_visits == []
+    assert report.capacity_shortfall == 0
+    assert 1 <= report.minimum_vehicle_count <= report.vehicle_count
+
+
+def test_unservable_visits_and_capacity_shortfall():
+    near_vehicle = Vehicle(id="near", capacity=10, home_location=LOCATION_2, departure_time=DEPARTURE_TIME)
+    far_vehicle = Vehicle(id="far", capacity=50, home_location=LOCATION_1, departure_time=DEPARTURE_TIME)
+    route_plan = VehicleRoutePlan(
+        name="test",
+        south_west_corner=LOCATION_1,
+        north_east_corner=LOCATION_2,
+        vehicles=[near_vehicle, far_vehicle],
+        visits=[
+            visit("fine", LOCATION_2, 5, DEPARTURE_TIME + timedelta(hours=2)),
+            visit("too big", LOCATION_1, 60, DEPARTURE_TIME + timedelta(days=1)),
+            visit("too late", LOCATION_1, 1, DEPARTURE_TIME + timedelta(minutes=30)),
+            # Only the far vehicle has the capacity, but it needs 20_000 seconds to get there
+            visit("far and big", LOCATION_2, 20, DEPARTURE_TIME + timedelta(hours=2)),
+        ])
+
+    report = precheck(route_plan)
+
+    assert not report.feasible
+    assert {unservable.visit_id: unservable.reasons for unservable in report.unservable_visits} == {
+        "too big": [DEMAND_EXCEEDS_CAPACITY],
+        "too late": [MAX_END_TIME_UNREACHABLE],
+        "far and big": [NO_VEHICLE_MEETS_BOTH],
+    }
+    assert report.unservable_visits[1].earliest_service_end_time == DEPARTURE_TIME + timedelta(hours=1)
+    assert report.total_demand == 86
+    assert report.total_capacity == 60
+    assert report.capacity_shortfall == 26
+    assert report.minimum_vehicle_count is None
+
+
+def test_precheck_endpoint():
+    client = TestClient(app)
+    demo_data_json = client.get("/demo-data/FIRENZE").json()
+
+    response = client.post("/route-plans/precheck", json=demo_data_json)
+
+    assert response.status_code == 200
+    assert response.json()['feasible']
+    assert response.json()['unservableVisits'] == []
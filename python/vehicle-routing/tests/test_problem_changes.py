@@ -0,0 +1,31 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.solver import solver_config
+from vehicle_routing.problem_changes import RemoveVisitProblemChange
+
+from timefold.solver import SolverFactory
+from timefold.solver.config import EnvironmentMode, TerminationConfig, Duration
+from dataclasses import replace
+
+
+def test_remove_visit_updates_arrival_times():
+    # FULL_ASSERT fails the solve if the removal leaves shadow variables stale
+    solver = SolverFactory.create(replace(solver_config,
+                                          environment_mode=EnvironmentMode.FULL_ASSERT,
+                                          termination_config=TerminationConfig(spent_limit=Duration(seconds=3)))
+                                  ).build_solver()
+    removed_visit_ids = []
+
+    def remove_second_visit_of_longest_route(event):
+        if not removed_visit_ids:
+            vehicle = max(event.new_best_solution.vehicles, key=lambda vehicle: len(vehicle.visits))
+            removed_visit_ids.append(vehicle.visits[1].id)
+            solver.add_problem_change(RemoveVisitProblemChange(removed_visit_ids[0]))
+
+    solver.add_event_listener(remove_second_visit_of_longest_route)
+    solution = solver.solve(generate_demo_data(DemoData.PHILADELPHIA))
+
+    assert all(visit.id not in removed_visit_ids for visit in solution.visits)
+    arrival_times = {visit.id: visit.arrival_time for visit in solution.visits}
+    solution.assign_routes({vehicle.id: [visit.id for visit in vehicle.visits] for vehicle in solution.vehicles})
+    assert arrival_times == {visit.id: visit.arrival_time for visit in solution.visits}
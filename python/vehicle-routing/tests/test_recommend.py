@@ -0,0 +1,74 @@
+from vehicle_routing.demo_data import *
+from vehicle_routing.recommend import recommend_insertions
+from vehicle_routing.rest_api import app, update_route, data_sets
+from vehicle_routing.scorer import VectorizedScorer
+
+from fastapi.testclient import TestClient
+from random import Random
+import pytest
+
+from test_scorer import random_routes
+
+client = TestClient(app)
+
+
+def routes_of(route_plan: VehicleRoutePlan) -> dict[str, list[str]]:
+    return {vehicle.id: [visit.id for visit in vehicle.visits] for vehicle in route_plan.vehicles}
+
+
+@pytest.mark.parametrize('dataset', list(DemoData))
+def test_score_diffs_match_scorer(dataset):
+    route_plan = generate_demo_data(dataset)
+    new_visit = route_plan.visits.pop()
+    route_plan.assign_routes(random_routes(route_plan, Random(dataset.value.seed)))
+    routes = routes_of(route_plan)
+
+    recommendations = recommend_insertions(route_plan, new_visit, count=10_000)
+
+    route_plan.visits.append(new_visit)
+    scorer = VectorizedScorer(route_plan)
+    candidates = []
+    for recommendation in recommendations:
+        candidate = {vehicle_id: list(visit_ids) for vehicle_id, visit_ids in routes.items()}
+        candidate[recommendation.vehicle_id].insert(recommendation.index, new_visit.id)
+        candidates.append(candidate)
+    # Capacity excess, late minutes and driving time of every candidate, minus those of the current routes
+    penalty_diffs = scorer.penalties([routes] + candidates)
+    penalty_diffs = penalty_diffs[1:] - penalty_diffs[0]
+    for recommendation, (capacity, lateness, driving_time) in zip(recommendations, penalty_diffs.tolist()):
+        assert recommendation.score_diff == HardSoftScore.of(-capacity - lateness, -driving_time)
+    assert [recommendation.score_diff for recommendation in recommendations] == \
+        sorted((recommendation.score_diff for recommendation in recommendations), reverse=True)
+
+
+def test_served_visits_and_out_of_service_vehicles_are_skipped():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    new_visit = route_plan.visits.pop()
+    route_plan.assign_routes(random_routes(route_plan, Random(0)))
+    route_plan.vehicles[0].out_of_service = True
+    for vehicle in route_plan.vehicles[1:]:
+        vehicle.served_visit_count = len(vehicle.visits)
+        vehicle.init_pinned_visit_count()
+
+    recommendations = recommend_insertions(route_plan, new_visit, count=10_000)
+
+    assert {(recommendation.vehicle_id, recommendation.index) for recommendation in recommendations} <= \
+        {(vehicle.id, len(vehicle.visits)) for vehicle in route_plan.vehicles[1:]}
+
+
+def test_recommend_endpoint():
+    route_plan = generate_demo_data(DemoData.HARTFORT)
+    new_visit = route_plan.visits.pop()
+    route_plan.assign_routes(random_routes(route_plan, Random(1)))
+    update_route('recommend', route_plan)
+
+    new_visit_json = new_visit.model_dump(mode='json', by_alias=True, exclude_none=True)
+    response = client.post("/route-plans/recommend/recommend?count=3", json=new_visit_json)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert set(response.json()[0]) == {'vehicleId', 'index', 'arrivalTime', 'scoreDiff'}
+    existing_visit_json = route_plan.visits[0].model_dump(mode='json', by_alias=True, exclude_none=True)
+    assert client.post("/route-plans/recommend/recommend", json=existing_visit_json).status_code == 409
+    assert client.post("/route-plans/unknown/recommend", json=new_visit_json).status_code == 404
+    del data_sets['recommend']
@@ -0,0 +1,66 @@
+from vehicle_routing.domain import *
+from vehicle_routing.replan import prepare_replan
+from vehicle_routing.rest_api import app, json_to_vehicle_route_plan
+
+from fastapi.testclient import TestClient
+from time import sleep
+from pytest import fail, raises
+
+client = TestClient(app)
+
+
+def partly_served_route_plan_json() -> dict:
+    """HARTFORT with the visits dealt out to the vehicles in turn and the first two of every route served."""
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/HARTFORT").json())
+    vehicle_count = len(route_plan.vehicles)
+    route_plan.assign_routes({vehicle.id: [visit.id for visit in route_plan.visits[i::vehicle_count]]
+                              for i, vehicle in enumerate(route_plan.vehicles)})
+    route_plan_json = route_plan.model_dump(mode='json', by_alias=True, exclude_none=True)
+    for vehicle_json in route_plan_json['vehicles']:
+        vehicle_json['servedVisitCount'] = 2
+    route_plan_json['vehicles'][0]['outOfService'] = True
+    return route_plan_json
+
+
+def test_prepare_replan():
+    route_plan_json = partly_served_route_plan_json()
+    route_plan = prepare_replan(json_to_vehicle_route_plan(partly_served_route_plan_json()))
+
+    broken_down, *others = route_plan.vehicles
+    assert [visit.id for visit in broken_down.visits] == route_plan_json['vehicles'][0]['visits'][:2]
+    assert broken_down.pinned_visit_count == 0
+    for vehicle, vehicle_json in zip(others, route_plan_json['vehicles'][1:]):
+        assert [visit.id for visit in vehicle.visits] == vehicle_json['visits']
+        assert vehicle.pinned_visit_count == 2
+    unserved_visit_count = len(route_plan_json['vehicles'][0]['visits']) - 2
+    assert sum(visit.vehicle is None for visit in route_plan.visits) == unserved_visit_count
+
+    route_plan_json['vehicles'][1]['servedVisitCount'] = 100
+    with raises(ValueError):
+        prepare_replan(json_to_vehicle_route_plan(route_plan_json))
+
+
+def test_replan_keeps_served_visits():
+    route_plan_json = partly_served_route_plan_json()
+    job_id = client.post("/route-plans/replan", json=partly_served_route_plan_json()).text[1:-1]
+    for _ in range(300):
+        sleep(0.1)
+        solution_json = client.get(f"/route-plans/{job_id}").json()
+        if all(visit.get('vehicle') is not None for visit in solution_json['visits']):
+            break
+    else:
+        client.delete(f"/route-plans/{job_id}")
+        fail('the unserved visits of the vehicle that broke down were never reassigned')
+    client.delete(f"/route-plans/{job_id}")
+
+    broken_down, *others = solution_json['vehicles']
+    assert broken_down['visits'] == route_plan_json['vehicles'][0]['visits'][:2]
+    for vehicle_json, original_json in zip(others, route_plan_json['vehicles'][1:]):
+        assert vehicle_json['visits'][:2] == original_json['visits'][:2]
+        assert vehicle_json['servedVisitCount'] == 2
+
+
+def test_replan_with_too_many_served_visits():
+    route_plan_json = partly_served_route_plan_json()
+    route_plan_json['vehicles'][1]['servedVisitCount'] = 100
+    assert client.post("/route-plans/replan", json=route_plan_json).status_code == 400
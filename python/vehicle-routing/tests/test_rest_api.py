@@ -0,0 +1,102 @@
+from vehicle_routing.rest_api import (app, json_to_vehicle_route_plan, update_route, data_sets,
+                                      restrict_to_nearby_visits, solve_partitioned_and_refine)
+from vehicle_routing import rest_api
+from timefold.solver import SolverStatus
+
+from fastapi.testclient import TestClient
+import logging
+
+client = TestClient(app)
+
+
+def test_route_plan_json_snapshot():
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/FIRENZE").json())
+    route_plan.assign_routes({vehicle.id: [visit.id for visit in route_plan.visits[i::len(route_plan.vehicles)]]
+                              for i, vehicle in enumerate(route_plan.vehicles)})
+    update_route('snapshot', route_plan)
+
+    response = client.get("/route-plans/snapshot")
+
+    assert response.status_code == 200
+    assert response.json() == route_plan.model_copy(update={'solver_status': SolverStatus.NOT_SOLVING,
+                                                            'version': 1}).model_dump(
+        mode='json', by_alias=True, exclude_none=True)
+    assert response.json()['vehicles'][0]['totalDemand'] > 0
+
+    update_route('snapshot', json_to_vehicle_route_plan(client.get("/demo-data/FIRENZE").json()))
+    assert client.get("/route-plans/snapshot").json()['vehicles'][0]['totalDemand'] == 0
+    del data_sets['snapshot']
+
+
+def test_route_plan_diff():
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/FIRENZE").json())
+    update_route('diff', route_plan)
+    version = client.get("/route-plans/diff").json()['version']
+
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/FIRENZE").json())
+    route_plan.assign_routes({'0': ['0', '1']})
+    update_route('diff', route_plan)
+    diff = client.get(f"/route-plans/diff?since={version}").json()
+
+    assert diff['version'] == version + 1
+    assert [vehicle['id'] for vehicle in diff['vehicles']] == ['0']
+    assert diff['vehicles'][0]['visits'] == ['0', '1']
+    assert [visit['id'] for visit in diff['visits']] == ['0', '1']
+    assert diff['removedVisitIds'] == []
+    assert client.get(f"/route-plans/diff?since={version + 1}").json()['vehicles'] == []
+    assert client.get(f"/route-plans/diff?since={version + 2}").status_code == 400
+    del data_sets['diff']
+
+
+def test_partitioned_solve_publishes_a_copy(monkeypatch):
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/FIRENZE").json())
+    update_route('partitioned', route_plan)
+    published_while_solving = []
+
+    def solve_partitioned(merged, partitions, use_warm_start):
+        published_while_solving.append(data_sets['partitioned'])
+        merged.assign_routes({'0': ['0', '1']})
+        return merged
+
+    monkeypatch.setattr(rest_api, 'solve_partitioned', solve_partitioned)
+    solve_partitioned_and_refine('partitioned', route_plan, 2, False)
+
+    assert len(published_while_solving) == 1 and published_while_solving[0] is route_plan
+    assert all(vehicle.visits == [] for vehicle in route_plan.vehicles)
+    assert [visit.id for visit in data_sets['partitioned'].vehicles[0].visits] == ['0', '1']
+    del data_sets['partitioned']
+
+
+def test_what_if_routes():
+    route_plan_json = client.get("/demo-data/PHILADELPHIA").json()
+    route_plan_json['candidates'] = [
+        {},
+        {'0': ['0', '1'], '1': ['2']},
+    ]
+
+    response = client.put("/route-plans/what-if", json=route_plan_json)
+
+    assert response.status_code == 200
+    empty, candidate = response.json()
+    assert empty == {'score': '0hard/0soft',
+                     'constraints': {'vehicleCapacity': '0hard/0soft',
+                                     'serviceFinishedAfterMaxEndTime': '0hard/0soft',
+                                     'minimizeTravelTime': '0hard/0soft'}}
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/PHILADELPHIA").json())
+    route_plan.assign_routes({'0': ['0', '1'], '1': ['2']})
+    assert candidate['constraints']['minimizeTravelTime'] == f'0hard/{-route_plan.total_driving_time_seconds}soft'
+
+    route_plan_json = client.get("/demo-data/PHILADELPHIA").json()
+    route_plan_json['candidates'] = [{'0': ['unknown']}]
+    assert client.put("/route-plans/what-if", json=route_plan_json).status_code == 400
+
+
+def test_pruned_share_is_logged(caplog):
+    route_plan = json_to_vehicle_route_plan(client.get("/demo-data/PHILADELPHIA").json())
+
+    with caplog.at_level(logging.INFO, logger='vehicle_routing.rest_api'):
+        pruned_share = restrict_to_nearby_visits('pruned', route_plan)
+
+    assert 0 < pruned_share < 1
+    assert f'Route plan (pruned): {pruned_share:.1%} of the nearest visits are pruned' in caplog.text
+    assert all(visit.nearby_visit_ids is not None for visit in route_plan.visits)
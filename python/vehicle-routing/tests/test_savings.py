@@ -0,0 +1,37 @@
+from vehicle_routing.domain import *
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.savings import build_savings_routes, warm_start
+
+import pytest
+
+
+@pytest.mark.parametrize('dataset', list(DemoData))
+def test_savings_routes_are_feasible(dataset):
+    route_plan = warm_start(generate_demo_data(dataset))
+
+    assigned = [visit.id for vehicle in route_plan.vehicles for visit in vehicle.visits]
+    assert len(assigned) == len(set(assigned)) > 0
+    for vehicle in route_plan.vehicles:
+        assert vehicle.calculate_total_demand() <= vehicle.capacity
+        for visit in vehicle.visits:
+            assert not visit.is_service_finished_after_max_end_time()
+
+
+def test_savings_joins_visits_on_the_way():
+    departure_time = datetime(2020, 1, 1, 8)
+    vehicle = Vehicle(id='1', capacity=10, home_location=Location(latitude=0, longitude=0),
+                      departure_time=departure_time)
+    visits = [Visit(id=str(i), name=str(i), location=Location(latitude=i, longitude=0), demand=1,
+                    min_start_time=departure_time, max_end_time=departure_time + timedelta(days=1),
+                    service_duration=timedelta(minutes=10))
+              for i in (1, 2, 3)]
+    route_plan = VehicleRoutePlan(name='test',
+                                  south_west_corner=Location(latitude=0, longitude=0),
+                                  north_east_corner=Location(latitude=3, longitude=0),
+                                  vehicles=[vehicle],
+                                  visits=visits)
+
+    routes = build_savings_routes(route_plan)
+
+    assert len(routes['1']) == 3
+    assert routes['1'] in (['1', '2', '3'], ['3', '2', '1'])
@@ -0,0 +1,51 @@
+from timefold.solver.test import ConstraintVerifier
+from timefold.solver.score import HardSoftScore
+
+from vehicle_routing.domain import *
+from vehicle_routing.constraints import define_constraints
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.scorer import VectorizedScorer
+
+from random import Random
+import pytest
+
+constraint_verifier = ConstraintVerifier.build(define_constraints, VehicleRoutePlan, Vehicle, Visit)
+
+
+def random_routes(route_plan: VehicleRoutePlan, random: Random) -> dict[str, list[str]]:
+    visit_ids = [visit.id for visit in route_plan.visits]
+    random.shuffle(visit_ids)
+    # Leave some visits unassigned and some vehicles without a route
+    visit_ids = visit_ids[:random.randint(0, len(visit_ids))]
+    cuts = sorted(random.randint(0, len(visit_ids)) for _ in range(len(route_plan.vehicles) - 1))
+    bounds = [0] + cuts + [len(visit_ids)]
+    return {vehicle.id: visit_ids[bounds[i]:bounds[i + 1]] for i, vehicle in enumerate(route_plan.vehicles)}
+
+
+@pytest.mark.parametrize('dataset', list(DemoData))
+def test_matches_constraint_verifier_on_random_plans(dataset):
+    random = Random(dataset.value.seed)
+    route_plan = generate_demo_data(dataset)
+    # Depart at odd times, so lateness is not a whole number of minutes
+    for vehicle in route_plan.vehicles:
+        vehicle.departure_time += timedelta(seconds=random.randint(0, 3_600), microseconds=random.randint(0, 999))
+    scorer = VectorizedScorer(route_plan)
+
+    assignments = [random_routes(route_plan, random) for _ in range(20)]
+    scores = scorer.score_all(assignments)
+
+    assert any(not score['score'].is_feasible for score in scores)
+    for assignment, score in zip(assignments, scores):
+        route_plan.assign_routes(assignment)
+        constraint_verifier.verify_that().given_solution(route_plan).scores(score['score'])
+
+
+def test_rejects_invalid_assignments():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    scorer = VectorizedScorer(route_plan)
+
+    with pytest.raises(ValueError, match='unknown vehicle'):
+        scorer.score_all([{'unknown': []}])
+    with pytest.raises(ValueError, match='more than once'):
+        scorer.score_all([{'0': ['1'], '1': ['1']}])
+    assert scorer.score_all([{}])[0]['score'] == HardSoftScore.ZERO
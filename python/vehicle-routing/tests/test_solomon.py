@@ -0,0 +1,66 @@
+from vehicle_routing.domain import *
+from vehicle_routing.solomon import SECONDS_PER_UNIT, load_instance, read_best_known, route_plan_distance
+
+import pytest
+
+INSTANCE = """SMALL1
+
+VEHICLE
+NUMBER     CAPACITY
+   2          30
+
+CUSTOMER
+CUST NO.  XCOORD.   YCOORD.    DEMAND   READY TIME  DUE DATE   SERVICE   TIME
+
+    0      40         50          0          0       1236          0
+    1      45         68         10        912        967         90
+    2      43         66         10         65        146         90
+    3      40         53         20          0       1200         10
+"""
+
+
+def test_load_instance(tmp_path):
+    path = tmp_path / 'small1.txt'
+    path.write_text(INSTANCE)
+    start = datetime(2024, 1, 1)
+
+    route_plan = load_instance(path, start)
+
+    assert route_plan.name == 'SMALL1'
+    assert [vehicle.capacity for vehicle in route_plan.vehicles] == [30, 30]
+    assert all(vehicle.departure_time == start for vehicle in route_plan.vehicles)
+    assert [visit.id for visit in route_plan.visits] == ['1', '2', '3']
+    first = route_plan.visits[0]
+    assert first.demand == 10
+    assert first.min_start_time == start + timedelta(minutes=912)
+    # Service must start by the due date, so it must end by the due date plus the service time
+    assert first.max_end_time == start + timedelta(minutes=967 + 90)
+    assert first.service_duration == timedelta(minutes=90)
+    depot = route_plan.vehicles[0].home_location
+    assert depot.driving_time_to(route_plan.visits[2].location) == 3 * SECONDS_PER_UNIT
+    assert depot.driving_time_to(first.location) == round((5 ** 2 + 18 ** 2) ** 0.5 * SECONDS_PER_UNIT)
+
+    route_plan.assign_routes({'0': ['3'], '1': ['2', '1']})
+    assert route_plan_distance(route_plan) == pytest.approx(
+        2 * 3 + (3 ** 2 + 16 ** 2) ** 0.5 + (2 ** 2 + 2 ** 2) ** 0.5 + (5 ** 2 + 18 ** 2) ** 0.5, abs=0.05)
+
+
+def test_load_instance_rejects_other_formats(tmp_path):
+    path = tmp_path / 'broken.txt'
+    path.write_text(INSTANCE.replace('VEHICLE', 'VEHICLES'))
+    with pytest.raises(ValueError, match='no VEHICLE and CUSTOMER sections'):
+        load_instance(path)
+
+    path.write_text(INSTANCE.replace('    3      40         53         20', '    3      40         53'))
+    with pytest.raises(ValueError, match='rows of 7 numbers'):
+        load_instance(path)
+
+
+def test_read_best_known(tmp_path):
+    path = tmp_path / 'best_known.csv'
+    path.write_text('instance,vehicles,distance\nsmall1,1,42.5\nC1_2_1,20,2698.6\n')
+
+    best_known = read_best_known(path)
+
+    assert best_known['SMALL1'].vehicle_count == 1
+    assert best_known['C1_2_1'].distance == 2698.6
@@ -0,0 +1,31 @@
+from vehicle_routing.demo_data import DemoData, generate_demo_data
+from vehicle_routing.versions import RoutePlanVersions
+
+
+def test_diff_since_version():
+    route_plan = generate_demo_data(DemoData.PHILADELPHIA)
+    versions = RoutePlanVersions()
+    assert versions.update(route_plan) == 1
+
+    everything = versions.diff(0)
+    assert len(everything.vehicles) == len(route_plan.vehicles)
+    assert len(everything.visits) == len(route_plan.visits)
+
+    route_plan.assign_routes({'0': ['0', '1'], '1': ['2']})
+    assert versions.update(route_plan) == 2
+    diff = versions.diff(1)
+    assert [vehicle.id for vehicle in diff.vehicles] == ['0', '1']
+    assert [visit.id for visit in diff.visits] == ['0', '1', '2']
+
+    # Swapping the first two visits changes every arrival time on the route, but not the other vehicle
+    route_plan.assign_routes({'0': ['1', '0'], '1': ['2']})
+    versions.update(route_plan)
+    assert [vehicle.id for vehicle in versions.diff(2).vehicles] == ['0']
+    assert [vehicle.id for vehicle in versions.diff(1).vehicles] == ['0', '1']
+
+    removed = route_plan.visits.pop()
+    versions.update(route_plan)
+    diff = versions.diff(3)
+    assert diff.vehicles == [] and diff.visits == []
+    assert diff.removed_visit_ids == [removed.id]
+    assert versions.diff(4).removed_visit_ids == []